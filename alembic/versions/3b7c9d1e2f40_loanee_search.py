@@ -0,0 +1,71 @@
+"""loanee_search
+
+Revision ID: 3b7c9d1e2f40
+Revises: 8d1e2c3f4a5b
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7c9d1e2f40"
+down_revision: Union[str, None] = "8d1e2c3f4a5b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPR = (
+    "to_tsvector('simple'::regconfig, "
+    "coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || "
+    "coalesce(phone_number, '') || ' ' || coalesce(address, ''))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm for fuzzy/substring matching, btree_gin so GIN indexes can lead with organization_id.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    op.add_column(
+        "loanees",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPR, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_loanees_org_search_vector",
+        "loanees",
+        ["organization_id", "search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_loanees_org_full_name_trgm",
+        "loanees",
+        ["organization_id", "full_name"],
+        postgresql_using="gin",
+        postgresql_ops={"full_name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_loanees_org_phone_number_trgm",
+        "loanees",
+        ["organization_id", "phone_number"],
+        postgresql_using="gin",
+        postgresql_ops={"phone_number": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_loanees_org_phone_number_trgm", table_name="loanees")
+    op.drop_index("ix_loanees_org_full_name_trgm", table_name="loanees")
+    op.drop_index("ix_loanees_org_search_vector", table_name="loanees")
+    op.drop_column("loanees", "search_vector")
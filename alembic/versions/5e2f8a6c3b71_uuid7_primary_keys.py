@@ -0,0 +1,58 @@
+"""uuid7_primary_keys
+
+Revision ID: 5e2f8a6c3b71
+Revises: a4c1e7b92d10
+Create Date: 2026-10-19 13:00:00.000000
+
+New rows get time-ordered UUIDv7 keys (generated in Python by app.db.models.ids.uuid7, and
+by `uuid_generate_v7()` as a server default for rows inserted from raw SQL). The column type
+is unchanged, so existing UUIDv4 rows stay valid and no data is rewritten.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2f8a6c3b71"
+down_revision: Union[str, None] = "a4c1e7b92d10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("organizations", "loanees", "loans", "loan_documents", "payments", "audit_logs")
+
+# Overlays the 48-bit Unix ms timestamp on a random v4 UUID and flips the version nibble
+# from 4 to 7 (bits 52 and 53); needs only core gen_random_uuid() (Postgres 13+).
+UUID_GENERATE_V7 = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    placing substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid
+$$ LANGUAGE sql VOLATILE;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(UUID_GENERATE_V7)
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT uuid_generate_v7()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
@@ -0,0 +1,54 @@
+"""loan_instalments
+
+Revision ID: 7c4d2a9e1f58
+Revises: 5e2f8a6c3b71
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4d2a9e1f58"
+down_revision: Union[str, None] = "5e2f8a6c3b71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "loan_instalments",
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("uuid_generate_v7()"), nullable=False),
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("loan_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("sequence", sa.Integer(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("principal", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("interest", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("fees", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("balance_after", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["loan_id"], ["loans.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("loan_id", "sequence", name="uq_loan_instalments_loan_sequence"),
+    )
+    op.create_index(
+        "ix_loan_instalments_org_due_date",
+        "loan_instalments",
+        ["organization_id", "due_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_loan_instalments_org_due_date", table_name="loan_instalments")
+    op.drop_table("loan_instalments")
@@ -0,0 +1,82 @@
+"""portfolio_snapshots
+
+Revision ID: 9a6e3f1c2b84
+Revises: 7c4d2a9e1f58
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a6e3f1c2b84"
+down_revision: Union[str, None] = "7c4d2a9e1f58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DAILY_COUNTS = (
+    "loans_count",
+    "open_loans_count",
+    "defaulted_count",
+    "disbursed_count",
+    "collected_count",
+    "new_defaults_count",
+)
+DAILY_AMOUNTS = (
+    "outstanding_amount",
+    "defaulted_amount",
+    "disbursed_amount",
+    "collected_amount",
+)
+AGEING_BUCKETS = ("current", "past_due_1_30", "past_due_31_60", "past_due_61_90", "past_due_90_plus")
+
+
+def _count(name: str) -> sa.Column:
+    return sa.Column(name, sa.Integer(), server_default="0", nullable=False)
+
+
+def _amount(name: str) -> sa.Column:
+    return sa.Column(name, sa.Numeric(precision=14, scale=2), server_default="0", nullable=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bucket_columns = []
+    for bucket in AGEING_BUCKETS:
+        bucket_columns += [_count(f"{bucket}_count"), _amount(f"{bucket}_amount")]
+    op.create_table(
+        "portfolio_daily_snapshots",
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        *[_count(c) for c in DAILY_COUNTS],
+        *[_amount(c) for c in DAILY_AMOUNTS],
+        *bucket_columns,
+        sa.Column("refreshed_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("organization_id", "snapshot_date"),
+    )
+    op.create_table(
+        "portfolio_cohort_snapshots",
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("cohort_month", sa.Date(), nullable=False),
+        _count("loans_count"),
+        _amount("principal_amount"),
+        _count("paid_count"),
+        _count("defaulted_count"),
+        _amount("defaulted_amount"),
+        sa.Column("refreshed_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("organization_id", "snapshot_date", "cohort_month"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("portfolio_cohort_snapshots")
+    op.drop_table("portfolio_daily_snapshots")
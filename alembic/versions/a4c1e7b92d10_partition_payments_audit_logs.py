@@ -0,0 +1,146 @@
+"""partition_payments_audit_logs
+
+Revision ID: a4c1e7b92d10
+Revises: 3b7c9d1e2f40
+Create Date: 2026-10-19 11:00:00.000000
+
+Converts the append-only `payments` and `audit_logs` tables into tables range-partitioned
+by month on `created_at`. The primary key becomes (id, created_at) because Postgres requires
+the partition key in every unique constraint. The redundant `ix_*_id` indexes are dropped and
+the single-column `organization_id` indexes are replaced by (organization_id, created_at).
+Partitions are created from the oldest existing row up to three months ahead, plus a
+DEFAULT partition; `app.db.partitions` keeps creating them afterwards.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c1e7b92d10"
+down_revision: Union[str, None] = "3b7c9d1e2f40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PAYMENTS_COLUMNS = """
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    id UUID NOT NULL,
+    organization_id UUID NOT NULL REFERENCES organizations (id) ON DELETE RESTRICT,
+    loan_id UUID NOT NULL REFERENCES loans (id) ON DELETE CASCADE,
+    amount NUMERIC(12, 2) NOT NULL,
+    reference VARCHAR,
+    source VARCHAR NOT NULL
+"""
+
+AUDIT_LOGS_COLUMNS = """
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    id UUID NOT NULL,
+    organization_id UUID NOT NULL REFERENCES organizations (id) ON DELETE RESTRICT,
+    loan_id UUID REFERENCES loans (id) ON DELETE CASCADE,
+    action VARCHAR NOT NULL,
+    from_status loan_status,
+    to_status loan_status,
+    message TEXT
+"""
+
+TABLES = {
+    "payments": {
+        "columns": PAYMENTS_COLUMNS,
+        "column_names": "created_at, updated_at, id, organization_id, loan_id, amount, reference, source",
+        "old_indexes": [
+            "ix_payments_id",
+            "ix_payments_loan_id",
+            "ix_payments_organization_id",
+            "ix_payments_reference",
+        ],
+        "new_indexes": {
+            "ix_payments_loan_id": "(loan_id)",
+            "ix_payments_org_created_at": "(organization_id, created_at)",
+            "ix_payments_reference": "(reference)",
+        },
+        "legacy_indexes": {
+            "ix_payments_id": "(id)",
+            "ix_payments_loan_id": "(loan_id)",
+            "ix_payments_organization_id": "(organization_id)",
+            "ix_payments_reference": "(reference)",
+        },
+    },
+    "audit_logs": {
+        "columns": AUDIT_LOGS_COLUMNS,
+        "column_names": "created_at, updated_at, id, organization_id, loan_id, action, from_status, to_status, message",
+        "old_indexes": [
+            "ix_audit_logs_id",
+            "ix_audit_logs_loan_id",
+            "ix_audit_logs_organization_id",
+        ],
+        "new_indexes": {
+            "ix_audit_logs_loan_id": "(loan_id)",
+            "ix_audit_logs_org_created_at": "(organization_id, created_at)",
+        },
+        "legacy_indexes": {
+            "ix_audit_logs_id": "(id)",
+            "ix_audit_logs_loan_id": "(loan_id)",
+            "ix_audit_logs_organization_id": "(organization_id)",
+        },
+    },
+}
+
+# Creates one partition per month from the oldest legacy row (or the current month) up to
+# three months ahead. Mirrors app.db.partitions.ensure_partitions naming: <table>_pYYYY_MM.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month date := date_trunc('month', coalesce((SELECT min(created_at) FROM {table}_legacy), now()))::date;
+    last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_p' || to_char(month, 'YYYY_MM'),
+            month,
+            (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, spec in TABLES.items():
+        for index in spec["old_indexes"]:
+            op.execute(f"DROP INDEX IF EXISTS {index}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        op.execute(f"ALTER TABLE {table}_legacy RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey")
+
+        op.execute(
+            f"CREATE TABLE {table} ({spec['columns']}, PRIMARY KEY (id, created_at)) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        op.execute(CREATE_MONTHLY_PARTITIONS.format(table=table))
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        for name, columns in spec["new_indexes"].items():
+            op.execute(f"CREATE INDEX {name} ON {table} {columns}")
+
+        cols = spec["column_names"]
+        op.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {table}_legacy")
+        op.execute(f"DROP TABLE {table}_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, spec in TABLES.items():
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        op.execute(f"ALTER TABLE {table}_partitioned RENAME CONSTRAINT {table}_pkey TO {table}_partitioned_pkey")
+        for name in spec["new_indexes"]:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.execute(f"CREATE TABLE {table} ({spec['columns']}, PRIMARY KEY (id))")
+        cols = spec["column_names"]
+        op.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {table}_partitioned")
+        op.execute(f"DROP TABLE {table}_partitioned CASCADE")
+        for name, columns in spec["legacy_indexes"].items():
+            op.execute(f"CREATE INDEX {name} ON {table} {columns}")
@@ -0,0 +1,67 @@
+"""listing_created_at_indexes
+
+Revision ID: a9d3e5f7c218
+Revises: f4c2a8d6b135
+Create Date: 2026-10-19 22:00:00.000000
+
+Listings are ordered newest-first by (created_at DESC, id DESC) rather than id alone: rows
+created before 5e2f8a6c3b71 keep random UUIDv4 keys, which mostly sort above the UUIDv7 keys
+of newer rows, so id order put new rows below legacy ones. The (…, id) composites from
+e3b9f5a1c724 are replaced by (…, created_at, id) ones serving the new order; id stays last
+as the tie-breaker for rows created in the same transaction.
+
+Built CONCURRENTLY before the old indexes are dropped, as in e3b9f5a1c724.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d3e5f7c218"
+down_revision: Union[str, None] = "f4c2a8d6b135"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_INDEXES = {
+    "ix_loanees_org_created_at_id": "loanees (organization_id, created_at, id)",
+    "ix_loans_org_created_at_id": "loans (organization_id, created_at, id)",
+    "ix_loans_loanee_org_created_at_id": "loans (loanee_id, organization_id, created_at, id)",
+    "ix_loan_documents_loanee_org_created_at_id": "loan_documents (loanee_id, organization_id, created_at, id)",
+    "ix_loan_documents_loan_org_created_at_id": "loan_documents (loan_id, organization_id, created_at, id)",
+}
+
+REPLACED_INDEXES = {
+    "ix_loanees_org_id": "loanees (organization_id, id)",
+    "ix_loans_org_id": "loans (organization_id, id)",
+    "ix_loans_loanee_org_id": "loans (loanee_id, organization_id, id)",
+    "ix_loan_documents_loanee_org_id": "loan_documents (loanee_id, organization_id, id)",
+    "ix_loan_documents_loan_org_id": "loan_documents (loan_id, organization_id, id)",
+}
+
+
+def _build(indexes: dict[str, str]) -> None:
+    for name, definition in indexes.items():
+        # A previous failed concurrent build leaves an INVALID index behind.
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {definition}")
+
+
+def _drop(indexes: dict[str, str]) -> None:
+    for name in indexes:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        _build(NEW_INDEXES)
+        _drop(REPLACED_INDEXES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        _build(REPLACED_INDEXES)
+        _drop(NEW_INDEXES)
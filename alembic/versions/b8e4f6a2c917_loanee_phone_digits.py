@@ -0,0 +1,54 @@
+"""loanee_phone_digits
+
+Revision ID: b8e4f6a2c917
+Revises: a9d3e5f7c218
+Create Date: 2026-10-19 23:00:00.000000
+
+Phone numbers are stored free-form (`0803-123-4567`, `+234 803 123 4567`), so a substring
+match on `phone_number` missed most partial-number searches. `phone_digits` is a generated
+column holding only the digits, and the trigram index moves from `phone_number` to it.
+
+The indexes are built and dropped CONCURRENTLY, as in e3b9f5a1c724.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e4f6a2c917"
+down_revision: Union[str, None] = "a9d3e5f7c218"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PHONE_DIGITS_EXPR = "regexp_replace(coalesce(phone_number, ''), '\\D', '', 'g')"
+
+NEW_INDEX = ("ix_loanees_org_phone_digits_trgm", "loanees USING gin (organization_id, phone_digits gin_trgm_ops)")
+REPLACED_INDEX = ("ix_loanees_org_phone_number_trgm", "loanees USING gin (organization_id, phone_number gin_trgm_ops)")
+
+
+def _build(name: str, definition: str) -> None:
+    # A previous failed concurrent build leaves an INVALID index behind.
+    op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {definition}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "loanees",
+        sa.Column("phone_digits", sa.Text(), sa.Computed(PHONE_DIGITS_EXPR, persisted=True), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        _build(*NEW_INDEX)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {REPLACED_INDEX[0]}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        _build(*REPLACED_INDEX)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NEW_INDEX[0]}")
+    op.drop_column("loanees", "phone_digits")
@@ -0,0 +1,67 @@
+"""loanee_org_email_unique
+
+Revision ID: d7a2c4e6f183
+Revises: b2d8e4f6a913
+Create Date: 2026-10-19 18:00:00.000000
+
+Makes a loanee's email unique per organization, case-insensitively, so loanee resolution
+can be a single `INSERT ... ON CONFLICT (organization_id, lower(email))` statement.
+
+Existing duplicates are merged first: the earliest-created loanee of each
+(organization_id, lower(email)) group is kept, the others' loans and documents are moved
+onto it, and the duplicates are deleted. The index is then built CONCURRENTLY so writes to
+`loanees` are not blocked while it builds. If a new duplicate slips in between the two
+steps the build fails; re-running the migration merges it and retries.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a2c4e6f183"
+down_revision: Union[str, None] = "b2d8e4f6a913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "uq_loanees_org_email_lower"
+
+MERGE_DUPLICATES = [
+    """
+    CREATE TEMP TABLE loanee_duplicates ON COMMIT DROP AS
+    SELECT id, keep_id
+    FROM (
+        SELECT
+            id,
+            first_value(id) OVER (
+                PARTITION BY organization_id, lower(email) ORDER BY created_at, id
+            ) AS keep_id
+        FROM loanees
+        WHERE email IS NOT NULL
+    ) AS ranked
+    WHERE id <> keep_id
+    """,
+    "UPDATE loans SET loanee_id = d.keep_id FROM loanee_duplicates AS d WHERE loans.loanee_id = d.id",
+    "UPDATE loan_documents SET loanee_id = d.keep_id FROM loanee_duplicates AS d WHERE loan_documents.loanee_id = d.id",
+    "DELETE FROM loanees USING loanee_duplicates AS d WHERE loanees.id = d.id",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in MERGE_DUPLICATES:
+        op.execute(statement)
+    # Commit the merge, then build the index outside a transaction (required for CONCURRENTLY).
+    with op.get_context().autocommit_block():
+        # A previous failed concurrent build leaves an INVALID index behind.
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+        op.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY {INDEX_NAME} ON loanees (organization_id, lower(email))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
@@ -0,0 +1,81 @@
+"""index_audit
+
+Revision ID: e3b9f5a1c724
+Revises: d7a2c4e6f183
+Create Date: 2026-10-19 19:00:00.000000
+
+Replaces the indexes created by `index=True` in the initial schema with ones shaped like the
+queries in app/db/crud:
+
+- `ix_<table>_id` duplicated the primary key index and is dropped everywhere.
+- Tenant listings (WHERE organization_id ORDER BY id DESC) get (organization_id, id), which
+  also makes the single-column organization_id indexes redundant.
+- Child listings (loans of a loanee, documents of a loanee/loan) get (fk, organization_id, id).
+  They lead with the FK column rather than the tenant so the same index serves Postgres's
+  FK checks and ON DELETE actions, which look rows up by that column alone.
+- `ix_loans_due_date` is a prefix of `ix_loans_due_date_status`; `ix_loanees_email` is
+  unused since email lookups go through `uq_loanees_org_email_lower`.
+
+New indexes are built before the old ones are dropped, all CONCURRENTLY, so neither reads nor
+writes are blocked. `payments`/`audit_logs` were already cleaned up in a4c1e7b92d10.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3b9f5a1c724"
+down_revision: Union[str, None] = "d7a2c4e6f183"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_INDEXES = {
+    "ix_loanees_org_id": "loanees (organization_id, id)",
+    "ix_loans_org_id": "loans (organization_id, id)",
+    "ix_loans_loanee_org_id": "loans (loanee_id, organization_id, id)",
+    "ix_loan_documents_loanee_org_id": "loan_documents (loanee_id, organization_id, id)",
+    "ix_loan_documents_loan_org_id": "loan_documents (loan_id, organization_id, id)",
+}
+
+REDUNDANT_INDEXES = {
+    "ix_organizations_id": "organizations (id)",
+    "ix_loanees_id": "loanees (id)",
+    "ix_loanees_organization_id": "loanees (organization_id)",
+    "ix_loanees_email": "loanees (email)",
+    "ix_loans_id": "loans (id)",
+    "ix_loans_organization_id": "loans (organization_id)",
+    "ix_loans_loanee_id": "loans (loanee_id)",
+    "ix_loans_due_date": "loans (due_date)",
+    "ix_loan_documents_id": "loan_documents (id)",
+    "ix_loan_documents_organization_id": "loan_documents (organization_id)",
+    "ix_loan_documents_loanee_id": "loan_documents (loanee_id)",
+    "ix_loan_documents_loan_id": "loan_documents (loan_id)",
+}
+
+
+def _build(indexes: dict[str, str]) -> None:
+    for name, definition in indexes.items():
+        # A previous failed concurrent build leaves an INVALID index behind.
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {definition}")
+
+
+def _drop(indexes: dict[str, str]) -> None:
+    for name in indexes:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        _build(NEW_INDEXES)
+        _drop(REDUNDANT_INDEXES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        _build(REDUNDANT_INDEXES)
+        _drop(NEW_INDEXES)
@@ -0,0 +1,138 @@
+"""direct_debit_tables
+
+Revision ID: f4c2a8d6b135
+Revises: e3b9f5a1c724
+Create Date: 2026-10-19 21:00:00.000000
+
+Creates the direct-debit tables (`direct_debit_mandates`, `recurring_debit_schedules`,
+`debit_schedule_items`), which no earlier migration did, UUID-keyed like the rest of the
+schema. Schedule items carry per-item retry scheduling: `next_attempt_at` with a partial
+index covering only items the scheduler may pick, the `debit_items_dead_letter` view of
+items whose retries are exhausted, and the `claimed_at` column used to release claims left
+in `processing` by a crashed scheduler.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c2a8d6b135"
+down_revision: Union[str, None] = "e3b9f5a1c724"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DEAD_LETTER_VIEW = """
+CREATE OR REPLACE VIEW debit_items_dead_letter AS
+SELECT
+    i.id,
+    i.schedule_id,
+    s.organization_id,
+    s.loan_id,
+    i.due_date,
+    i.amount,
+    i.attempts,
+    i.last_error,
+    i.provider_txn_ref,
+    i.updated_at AS dead_since
+FROM debit_schedule_items AS i
+JOIN recurring_debit_schedules AS s ON s.id = i.schedule_id
+WHERE i.status = 'dead'
+"""
+
+
+def _id_column() -> sa.Column:
+    return sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("uuid_generate_v7()"), nullable=False)
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "direct_debit_mandates",
+        _id_column(),
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("loanee_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("provider", sa.String(), nullable=False),
+        sa.Column("mandate_reference", sa.String(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["loanee_id"], ["loanees.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("mandate_reference"),
+    )
+    op.create_index(
+        "ix_direct_debit_mandates_loanee_org", "direct_debit_mandates", ["loanee_id", "organization_id"]
+    )
+
+    op.create_table(
+        "recurring_debit_schedules",
+        _id_column(),
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("loan_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("mandate_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("schedule_type", sa.String(), nullable=False),
+        sa.Column("number_of_debits", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("amount_per_debit", sa.Numeric(12, 2), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["loan_id"], ["loans.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["mandate_id"], ["direct_debit_mandates.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_recurring_debit_schedules_loan_id", "recurring_debit_schedules", ["loan_id"])
+    op.create_index("ix_recurring_debit_schedules_mandate_id", "recurring_debit_schedules", ["mandate_id"])
+
+    op.create_table(
+        "debit_schedule_items",
+        _id_column(),
+        sa.Column("schedule_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=False),
+        sa.Column("provider_txn_ref", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("claimed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["schedule_id"], ["recurring_debit_schedules.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+    op.create_index("ix_debit_schedule_items_schedule_id", "debit_schedule_items", ["schedule_id"])
+    op.create_index("ix_debit_schedule_items_provider_txn_ref", "debit_schedule_items", ["provider_txn_ref"])
+    op.create_index("ix_debit_items_due_date_status", "debit_schedule_items", ["due_date", "status"])
+    op.create_index(
+        "ix_debit_items_next_attempt_at_eligible",
+        "debit_schedule_items",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status IN ('pending', 'failed')"),
+    )
+    op.create_index(
+        "ix_debit_items_claimed_at_processing",
+        "debit_schedule_items",
+        ["claimed_at"],
+        postgresql_where=sa.text("status = 'processing'"),
+    )
+    op.execute(DEAD_LETTER_VIEW)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP VIEW IF EXISTS debit_items_dead_letter")
+    op.drop_table("debit_schedule_items")
+    op.drop_table("recurring_debit_schedules")
+    op.drop_table("direct_debit_mandates")
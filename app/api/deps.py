@@ -1,11 +1,18 @@
-from app.db.session import SessionLocal
+from uuid import UUID
+
+from app.db.session import SessionLocal, open_read_session
+from app.core import rate_limit
+from app.core.conditional import if_none_match, request_etag
+from app.core.config import settings
+from app.core.middleware import add_response_headers
 from app.core.token import verify_access_token
 from app.db.models.organization import Organization
 from app.core.supabase_auth import SupabasePrincipal, supabase_jwt_verifier
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.db.crud.organization import get_organization
+from app.db.data_version import get_data_version
 
 security = HTTPBearer()
 
@@ -18,20 +25,116 @@ def get_db():
         db.close()
 
 
-def get_current_organization(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> Organization:
-    token = credentials.credentials
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token = verify_access_token(token, credentials_exception)
-    organization = get_organization(db, token.id)
-    if not organization:
+
+def get_current_organization_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UUID:
+    """The organization id from a valid access token, without touching the database."""
+    credentials_exception = _credentials_exception()
+    token = verify_access_token(credentials.credentials, credentials_exception)
+    try:
+        return UUID(token.id)
+    except ValueError:
         raise credentials_exception
 
+
+def _load_organization(db: Session, organization_id: UUID) -> Organization:
+    organization = get_organization(db, organization_id)
+    if not organization:
+        raise _credentials_exception()
+    return organization
+
+
+def get_current_organization(
+    organization_id: UUID = Depends(get_current_organization_id),
+    db: Session = Depends(get_db),
+) -> Organization:
+    organization = _load_organization(db, organization_id)
+    # Lets the session pin this organization's reads to the primary after it commits.
+    db.info["organization_id"] = organization.id
     return organization
+
+
+def get_read_db(organization_id: UUID = Depends(get_current_organization_id)):
+    """Session for read-only routes: a healthy replica, or the primary for read-your-writes."""
+    db = open_read_session(organization_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_current_read_organization(
+    organization_id: UUID = Depends(get_current_organization_id),
+    db: Session = Depends(get_read_db),
+) -> Organization:
+    """The current organization, loaded on the read session so read-only routes never use the primary."""
+    return _load_organization(db, organization_id)
+
+
+def _enforce_rate_limit(request: Request, key: str, *, capacity: int, refill_per_second: float) -> None:
+    if not settings.rate_limit_enabled:
+        return
+    route = request.scope.get("route")
+    cost = (getattr(route, "openapi_extra", None) or {}).get(rate_limit.RATE_LIMIT_COST_KEY, 1)
+    result = rate_limit.hit(key, capacity=capacity, refill_per_second=refill_per_second, cost=cost)
+    if result is None:
+        return
+    add_response_headers(request, result.headers())
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(result.retry_after)},
+        )
+
+
+def limit_by_organization(
+    request: Request,
+    organization_id: UUID = Depends(get_current_organization_id),
+) -> None:
+    """Token-bucket limit shared by all of an organization's requests."""
+    _enforce_rate_limit(
+        request,
+        f"org:{organization_id}",
+        capacity=settings.rate_limit_capacity,
+        refill_per_second=settings.rate_limit_refill_per_second,
+    )
+
+
+def limit_by_client_ip(request: Request) -> None:
+    """Stricter limit for unauthenticated routes such as login, keyed by client address."""
+    client = request.client.host if request.client else "unknown"
+    _enforce_rate_limit(
+        request,
+        f"ip:{client}",
+        capacity=settings.auth_rate_limit_capacity,
+        refill_per_second=settings.auth_rate_limit_refill_per_second,
+    )
+
+
+def not_modified_since_last_change(
+    request: Request,
+    organization_id: UUID = Depends(get_current_organization_id),
+) -> None:
+    """Answer 304 before the route queries anything when the client's ETag is still current.
+
+    The ETag covers the organization's data version, so any committed write to its rows
+    changes it; otherwise the ETag and `Cache-Control` are added to the route's response.
+    """
+    if not settings.conditional_get_enabled:
+        return
+    version = get_data_version(organization_id)
+    if version is None:
+        return
+    etag = request_etag(request, version)
+    # Clients may keep the response but must revalidate it before each use.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match(request, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    add_response_headers(request, headers)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import (
+    get_current_organization,
+    get_current_read_organization,
+    get_db,
+    get_read_db,
+    limit_by_organization,
+)
+from app.core.rate_limit import rate_limit_cost
+from app.core.serialization import models_response
+from app.db.schemas.analytics import (
+    AgeingBucket,
+    AgeingResponse,
+    CohortPoint,
+    CohortResponse,
+    CollectionsPoint,
+    DailyPortfolioPoint,
+)
+from app.services.analytics_service import AnalyticsService, refresh_snapshots, utc_today
+
+
+MAX_RANGE_DAYS = 366
+AGEING_BUCKETS = ("current", "past_due_1_30", "past_due_31_60", "past_due_61_90", "past_due_90_plus")
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+    dependencies=[Depends(limit_by_organization)],
+)
+
+
+def _date_range(date_from: Optional[date], date_to: Optional[date]) -> tuple[date, date]:
+    date_to = date_to or utc_today()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must not exceed {MAX_RANGE_DAYS} days",
+        )
+    return date_from, date_to
+
+
+@router.get("/portfolio", response_model=list[DailyPortfolioPoint])
+def portfolio_endpoint(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> list[DailyPortfolioPoint]:
+    """Daily portfolio size, outstanding balance and defaults (defaults to the last 30 days)."""
+    date_from, date_to = _date_range(date_from, date_to)
+    rows = AnalyticsService(db).daily(organization_id=organization.id, date_from=date_from, date_to=date_to)
+    return models_response(rows, DailyPortfolioPoint)
+
+
+@router.get("/collections", response_model=list[CollectionsPoint])
+def collections_endpoint(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> list[CollectionsPoint]:
+    """Amounts collected and disbursed per day."""
+    date_from, date_to = _date_range(date_from, date_to)
+    rows = AnalyticsService(db).daily(organization_id=organization.id, date_from=date_from, date_to=date_to)
+    return models_response(rows, CollectionsPoint)
+
+
+@router.get("/ageing", response_model=AgeingResponse)
+def ageing_endpoint(
+    as_of: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> AgeingResponse:
+    """Open loans bucketed by days past due_date, from the latest snapshot on or before `as_of`."""
+    row = AnalyticsService(db).latest_daily(organization_id=organization.id, as_of=as_of or utc_today())
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No snapshot available yet")
+    return AgeingResponse(
+        snapshot_date=row.snapshot_date,
+        refreshed_at=row.refreshed_at,
+        buckets=[
+            AgeingBucket(
+                bucket=name,
+                count=getattr(row, f"{name}_count"),
+                amount=getattr(row, f"{name}_amount"),
+            )
+            for name in AGEING_BUCKETS
+        ],
+    )
+
+
+@router.get("/cohorts", response_model=CohortResponse)
+def cohorts_endpoint(
+    as_of: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> CohortResponse:
+    """Default rate per monthly origination cohort."""
+    rows = AnalyticsService(db).cohorts(organization_id=organization.id, as_of=as_of or utc_today())
+    if not rows:
+        return CohortResponse()
+    return CohortResponse(
+        snapshot_date=rows[0].snapshot_date,
+        cohorts=[
+            CohortPoint(
+                cohort_month=r.cohort_month,
+                loans_count=r.loans_count,
+                principal_amount=r.principal_amount,
+                paid_count=r.paid_count,
+                defaulted_count=r.defaulted_count,
+                defaulted_amount=r.defaulted_amount,
+                default_rate=(r.defaulted_count / r.loans_count) if r.loans_count else 0.0,
+            )
+            for r in rows
+        ],
+    )
+
+
+@router.post("/snapshots/refresh", status_code=status.HTTP_204_NO_CONTENT, openapi_extra=rate_limit_cost(10))
+def refresh_snapshots_endpoint(
+    db: Session = Depends(get_db),
+    organization=Depends(get_current_organization),
+) -> Response:
+    """Recompute today's snapshot for the current organization."""
+    refresh_snapshots(db, day=utc_today(), organization_id=organization.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
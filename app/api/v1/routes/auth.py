@@ -3,7 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_organization
+from app.api.deps import get_current_organization, get_db, limit_by_client_ip
 from app.db.schemas.organization import OrganizationCreate, OrganizationLogin, OrganizationResponse
 from app.services.auth_service import AuthService
 
@@ -11,13 +11,18 @@ from app.services.auth_service import AuthService
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/signup", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/signup",
+    response_model=OrganizationResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_client_ip)],
+)
 async def signup(payload: OrganizationCreate, db: Session = Depends(get_db)) -> OrganizationResponse:
     auth_service = AuthService(db=db)
     return auth_service.register_organization(organization=payload)
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(limit_by_client_ip)])
 async def login(payload: OrganizationLogin, db: Session = Depends(get_db)):
     auth_service = AuthService(db=db)
     return auth_service.authenticate_organization(email=payload.email, password=payload.password)
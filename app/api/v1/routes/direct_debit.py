@@ -1,46 +1,120 @@
 from __future__ import annotations
 
 from datetime import date
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, require_roles
-from app.db.crud.loan import get_loan
-from app.db.models.loan import DirectDebitMandate, Loanee
-from app.db.schemas.loan import LoanResponse
-from app.integrations.mono import create_mandate_link
+from app.api.deps import get_current_organization, get_db, limit_by_organization
+from app.core.config import settings
+from app.db.crud.loanee import get_loanee
+from app.db.models.debit import ScheduleItemStatus
+from app.db.models.loan import DirectDebitMandate, Loan
+from app.db.models.organization import Organization
+from app.integrations.mono import MonoError, MonoUnavailableError, create_mandate_link
 from app.services.direct_debit_service import DirectDebitService
 
 
-router = APIRouter(prefix="/dd", tags=["direct-debit"], dependencies=[Depends(require_roles("admin", "staff"))])
+router = APIRouter(prefix="/dd", tags=["direct-debit"], dependencies=[Depends(limit_by_organization)])
 
 
 @router.post("/mono/mandates/start")
-async def start_mono_mandate(loanee_id: int, db: Session = Depends(get_db)) -> dict:
-    loanee: Loanee = db.query(Loanee).get(loanee_id)
+async def start_mono_mandate(
+    loanee_id: UUID,
+    db: Session = Depends(get_db),
+    organization: Organization = Depends(get_current_organization),
+) -> dict:
+    loanee = get_loanee(db, organization_id=organization.id, loanee_id=loanee_id)
     if not loanee:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Loanee not found")
     if not loanee.email:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Loanee requires email for Mono mandate")
-    link = await create_mandate_link(customer_email=loanee.email, customer_name=loanee.full_name)
+    try:
+        link = await create_mandate_link(customer_email=loanee.email, customer_name=loanee.full_name)
+    except MonoUnavailableError as exc:
+        # Circuit open or no capacity: answer now rather than holding the request on Mono.
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(settings.mono_breaker_cooldown_seconds)},
+        ) from exc
+    except MonoError as exc:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Mono request failed") from exc
     return {"link": link}
 
 
+@router.post("/mandates", status_code=status.HTTP_201_CREATED)
+def register_mandate(
+    loanee_id: UUID,
+    mandate_reference: str,
+    db: Session = Depends(get_db),
+    organization: Organization = Depends(get_current_organization),
+) -> dict:
+    """Record a mandate the loanee approved through the Mono link."""
+    loanee = get_loanee(db, organization_id=organization.id, loanee_id=loanee_id)
+    if not loanee:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Loanee not found")
+    if db.query(DirectDebitMandate.id).filter(DirectDebitMandate.mandate_reference == mandate_reference).first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Mandate already registered")
+    mandate = DirectDebitMandate(
+        organization_id=organization.id,
+        loanee_id=loanee.id,
+        provider="mono",
+        mandate_reference=mandate_reference,
+        active=True,
+    )
+    db.add(mandate)
+    db.commit()
+    return {"mandate_id": mandate.id}
+
+
 @router.post("/schedules")
 def create_debit_schedule(
-    loan_id: int,
-    mandate_id: int,
+    loan_id: UUID,
+    mandate_id: UUID,
     number_of_debits: int = 1,
     first_due_date: date | None = None,
     db: Session = Depends(get_db),
+    organization: Organization = Depends(get_current_organization),
 ):
-    loan = get_loan(db, loan_id)
+    loan = db.query(Loan).filter(Loan.organization_id == organization.id, Loan.id == loan_id).first()
     if not loan:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found")
-    mandate = db.query(DirectDebitMandate).get(mandate_id)
+    mandate = (
+        db.query(DirectDebitMandate)
+        .filter(DirectDebitMandate.organization_id == organization.id)
+        .filter(DirectDebitMandate.id == mandate_id)
+        .filter(DirectDebitMandate.loanee_id == loan.loanee_id)
+        .filter(DirectDebitMandate.active.is_(True))
+        .first()
+    )
     if not mandate:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mandate not found")
     service = DirectDebitService(db)
     sched = service.create_schedule(loan=loan, mandate=mandate, number_of_debits=number_of_debits, first_due_date=first_due_date)
     return {"schedule_id": sched.id}
+
+
+@router.get("/items/dead-letter")
+def list_dead_letter_items(
+    limit: int = 100,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+    organization: Organization = Depends(get_current_organization),
+) -> list[dict]:
+    return DirectDebitService(db).dead_letter_items(organization_id=organization.id, limit=limit, offset=offset)
+
+
+@router.post("/items/{item_id}/requeue")
+def requeue_dead_item(
+    item_id: UUID,
+    db: Session = Depends(get_db),
+    organization: Organization = Depends(get_current_organization),
+) -> dict:
+    service = DirectDebitService(db)
+    item = service.get_item(organization_id=organization.id, item_id=item_id)
+    if not item or item.status != ScheduleItemStatus.dead:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dead item not found")
+    item = service.requeue_item(item=item)
+    return {"id": item.id, "status": item.status, "next_attempt_at": item.next_attempt_at}
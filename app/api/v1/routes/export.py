@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.api.deps import get_current_organization, limit_by_organization
+from app.core.config import settings
+from app.core.rate_limit import rate_limit_cost
+from app.db.schemas.export import (
+    ExportDataset,
+    ExportFormat,
+    ExportJobRequest,
+    ExportJobResponse,
+    LoaneeExportFilters,
+    LoanExportFilters,
+    PaymentExportFilters,
+)
+from app.integrations.supabase_storage import create_signed_url
+from app.services.export_service import (
+    MEDIA_TYPES,
+    create_export_job,
+    export_filename,
+    get_export_job,
+    parse_filters,
+    stream_export,
+)
+
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["exports"],
+    dependencies=[Depends(get_current_organization), Depends(limit_by_organization)],
+)
+
+
+def _streaming_export(dataset: ExportDataset, fmt: ExportFormat, organization_id, filters) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(dataset=dataset, organization_id=organization_id, filters=filters, fmt=fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(dataset, fmt)}"'},
+    )
+
+
+@router.get("/loans", openapi_extra=rate_limit_cost(20))
+def export_loans_endpoint(
+    format: ExportFormat = ExportFormat.csv,
+    filters: LoanExportFilters = Depends(),
+    organization=Depends(get_current_organization),
+) -> StreamingResponse:
+    return _streaming_export(ExportDataset.loans, format, organization.id, filters)
+
+
+@router.get("/loanees", openapi_extra=rate_limit_cost(20))
+def export_loanees_endpoint(
+    format: ExportFormat = ExportFormat.csv,
+    filters: LoaneeExportFilters = Depends(),
+    organization=Depends(get_current_organization),
+) -> StreamingResponse:
+    return _streaming_export(ExportDataset.loanees, format, organization.id, filters)
+
+
+@router.get("/payments", openapi_extra=rate_limit_cost(20))
+def export_payments_endpoint(
+    format: ExportFormat = ExportFormat.csv,
+    filters: PaymentExportFilters = Depends(),
+    organization=Depends(get_current_organization),
+) -> StreamingResponse:
+    return _streaming_export(ExportDataset.payments, format, organization.id, filters)
+
+
+@router.post(
+    "/jobs",
+    response_model=ExportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=rate_limit_cost(10),
+)
+def create_export_job_endpoint(
+    payload: ExportJobRequest,
+    organization=Depends(get_current_organization),
+) -> ExportJobResponse:
+    """Queue an export that is written to storage in the background, for very large tenants."""
+    from app.tasks.export import export_dataset
+
+    try:
+        filters = parse_filters(payload.dataset, payload.filters)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors())
+    job_id = create_export_job(organization_id=organization.id, dataset=payload.dataset, fmt=payload.format)
+    export_dataset.delay(
+        job_id,
+        str(organization.id),
+        payload.dataset.value,
+        payload.format.value,
+        filters.model_dump(mode="json"),
+    )
+    return ExportJobResponse(job_id=job_id, status="queued", dataset=payload.dataset, format=payload.format)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job_endpoint(
+    job_id: str,
+    expires_in: int = 300,
+    organization=Depends(get_current_organization),
+) -> ExportJobResponse:
+    job = get_export_job(job_id)
+    if not job or job.get("organization_id") != str(organization.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    download_url = None
+    if job["status"] == "done":
+        download_url = await create_signed_url(
+            bucket=settings.supabase_storage_bucket,
+            object_path=job["object_path"],
+            expires_in=expires_in,
+        )
+    return ExportJobResponse(
+        job_id=job_id,
+        status=job["status"],
+        dataset=ExportDataset(job["dataset"]),
+        format=ExportFormat(job["format"]),
+        rows=int(job["rows"]) if job.get("rows") else None,
+        download_url=download_url,
+        error=job.get("error"),
+    )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import ORJSONResponse
+
+from app.core.health import health_checker
+from app.core.runtime import threadpool_monitor
+
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def liveness() -> dict:
+    """The process is up and its event loop is responsive. Checks no dependencies."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(request: Request) -> ORJSONResponse:
+    """200 when warmup has finished and Postgres/Redis (and optionally storage) answer in time, else 503.
+
+    Probe results are cached briefly (see app/core/health.py); `checked_seconds_ago` says how old they are.
+    """
+    results, age = await health_checker.check()
+    started = getattr(request.app.state, "ready", False)
+    ready = started and all(result.ok for result in results.values())
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "unavailable",
+            "started": started,
+            "checked_seconds_ago": round(age, 1),
+            "checks": {name: result.as_dict() for name, result in results.items()},
+        },
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.get("/runtime")
+async def runtime_metrics() -> dict:
+    """Threadpool and database pool usage of the worker process that answers (current and peak)."""
+    return threadpool_monitor.snapshot()
@@ -1,14 +1,21 @@
 from __future__ import annotations
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_organization, get_db
+from app.api.deps import (
+    get_current_organization,
+    get_current_read_organization,
+    get_db,
+    get_read_db,
+    limit_by_organization,
+    not_modified_since_last_change,
+)
 from app.db.crud.document import (
     create_document,
-    get_document_for_loan,
-    list_documents_for_loan,
+    find_loan_document,
+    list_documents_for_existing_loan,
     list_documents_for_loanee_email,
 )
 from app.db.crud.loan import (
@@ -19,8 +26,10 @@ from app.db.crud.loan import (
 )
 from app.db.crud.loan import list_loans_for_organization_email
 from app.db.crud.loanee import get_loanee, list_loans_for_loanee_email
-from app.db.models.loan import LoanStatus
+from app.db.models.loan import Loan, LoanStatus
 from app.core.config import settings
+from app.core.rate_limit import rate_limit_cost
+from app.core.serialization import encode_models, models_response, raw_json_response
 from app.db.schemas.loan import (
     LoanCreate,
     LoanDocumentResponse,
@@ -30,6 +39,14 @@ from app.db.schemas.loan import (
     LoaneeResponse,
     SignedUrlResponse,
 )
+from app.db.schemas.schedule import (
+    BulkScheduleRequest,
+    BulkScheduleResponse,
+    InstalmentResponse,
+    ScheduleOptions,
+    ScheduleQuoteRequest,
+    ScheduleResponse,
+)
 from app.exceptions.loan_exceptions import InvalidLoanTransitionError
 from app.integrations.supabase_storage import (
     create_signed_url,
@@ -37,16 +54,23 @@ from app.integrations.supabase_storage import (
     upload_object,
 )
 from app.services.loan_service import LoanService
+from app.services.schedule_service import (
+    Instalment,
+    RepaymentScheduleService,
+    ScheduleTerms,
+    build_schedule,
+    from_cents,
+    to_cents,
+)
 from typing import Optional
 from datetime import date, datetime
 from app.core.redis import get_redis
-import json
 
 
 router = APIRouter(
     prefix="/loans",
     tags=["loans"],
-    dependencies=[Depends(get_current_organization)],
+    dependencies=[Depends(limit_by_organization)],
 )
 
 
@@ -67,7 +91,7 @@ def create_new_loan(
     return create_loan(db, payload, total_payable=total_payable, organization=organization)
 
 
-@router.post("/{loan_id}/transition", response_model=LoanResponse)
+@router.post("/{loan_id}/transition", response_model=LoanResponse, dependencies=[Depends(get_current_organization)])
 def transition_loan_status(
     loan_id: int,
     payload: LoanStatusTransitionRequest,
@@ -90,7 +114,7 @@ def transition_loan_status(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/", response_model=list[LoanResponse])
+@router.get("/", response_model=list[LoanResponse], dependencies=[Depends(not_modified_since_last_change)])
 def list_loans_endpoint(
     status: Optional[LoanStatus] = None,
     due_from: Optional[date] = None,
@@ -98,12 +122,12 @@ def list_loans_endpoint(
     loan_term_weeks: Optional[int] = None,
     loanee_email: Optional[str] = None,
     payment_due: Optional[bool] = None,
-    limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    limit: int = Query(50, ge=1, le=settings.max_page_size),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoanResponse]:
-    return list_loans(
+    items = list_loans(
         db,
         organization_id=str(organization.id),
         status=status,
@@ -115,54 +139,53 @@ def list_loans_endpoint(
         limit=limit,
         offset=offset,
     )
+    return models_response(items, LoanResponse)
 
 
 @router.get("/by-loanee", response_model=list[LoanResponse])
 def list_loans_by_loanee_email_endpoint(
     email: str,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoanResponse]:
-    return list_loans_for_loanee_email(db, organization_id=organization.id, email=email)
+    items = list_loans_for_loanee_email(db, organization_id=organization.id, email=email)
+    return models_response(items, LoanResponse)
 
 
-@router.get("/by-organization", response_model=list[LoanResponse])
+@router.get(
+    "/by-organization", response_model=list[LoanResponse], dependencies=[Depends(get_current_read_organization)]
+)
 def list_loans_by_organization_email_endpoint(
     email: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> list[LoanResponse]:
-    return list_loans_for_organization_email(db, organization_email=email)
+    return models_response(list_loans_for_organization_email(db, organization_email=email), LoanResponse)
 
 
-@router.get("/by-organization-id", response_model=list[LoanResponse])
+@router.get(
+    "/by-organization-id", response_model=list[LoanResponse], dependencies=[Depends(get_current_read_organization)]
+)
 def list_loans_by_organization_id_endpoint(
     organization_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> list[LoanResponse]:
-    return list_loans_for_organization_id(db, organization_id=str(organization_id))
-
-
-@router.get("/{loan_id}", response_model=LoanResponse)
-def get_loan_endpoint(loan_id: UUID, db: Session = Depends(get_db)) -> LoanResponse:
-    loan = get_loan(db, loan_id)
-    if not loan:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found"
-        )
-    return loan
+    return models_response(
+        list_loans_for_organization_id(db, organization_id=str(organization_id)), LoanResponse
+    )
 
 
 @router.get("/due-today", response_model=list[LoanResponse])
 def due_today_endpoint(
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoanResponse]:
     today = date.today()
     cache_key = f"due_today:{organization.id}:{today.isoformat()}"
     r = get_redis()
     cached = r.get(cache_key)
     if cached:
-        return [LoanResponse(**obj) for obj in json.loads(cached)]
+        # Cached value is the encoded response body; serve it without re-validating.
+        return raw_json_response(cached)
     items = list_loans(
         db,
         organization_id=str(organization.id),
@@ -172,15 +195,143 @@ def due_today_endpoint(
         limit=500,
         offset=0,
     )
-    payload = [LoanResponse.from_orm(x).dict() for x in items]
-    r.setex(cache_key, 60, json.dumps(payload))
-    return items
+    body = encode_models(items, LoanResponse)
+    r.setex(cache_key, 60, body)
+    return raw_json_response(body)
+
+
+def _schedule_response(loan_id: UUID | None, schedule: list[Instalment]) -> ScheduleResponse:
+    return ScheduleResponse(
+        loan_id=loan_id,
+        total_principal=from_cents(sum(i.principal_cents for i in schedule)),
+        total_interest=from_cents(sum(i.interest_cents for i in schedule)),
+        total_fees=from_cents(sum(i.fees_cents for i in schedule)),
+        total_amount=from_cents(sum(i.amount_cents for i in schedule)),
+        instalments=[
+            InstalmentResponse(
+                sequence=i.sequence,
+                due_date=i.due_date,
+                principal=from_cents(i.principal_cents),
+                interest=from_cents(i.interest_cents),
+                fees=from_cents(i.fees_cents),
+                amount=from_cents(i.amount_cents),
+                balance_after=from_cents(i.balance_after_cents),
+            )
+            for i in schedule
+        ],
+    )
+
+
+@router.post(
+    "/schedules/quote", response_model=ScheduleResponse, dependencies=[Depends(get_current_read_organization)]
+)
+def quote_schedule_endpoint(payload: ScheduleQuoteRequest) -> ScheduleResponse:
+    """Preview a repayment schedule for arbitrary terms without creating a loan."""
+    terms = ScheduleTerms(
+        principal_cents=to_cents(payload.amount),
+        fees_cents=to_cents(payload.fees),
+        annual_rate=payload.annual_rate,
+        instalments=payload.instalments,
+        frequency=payload.frequency,
+        interest_method=payload.interest_method,
+        start_date=payload.start_date or date.today(),
+    )
+    return _schedule_response(None, build_schedule(terms))
+
+
+@router.post("/schedules/bulk", response_model=BulkScheduleResponse, openapi_extra=rate_limit_cost(20))
+def bulk_generate_schedules_endpoint(
+    payload: BulkScheduleRequest,
+    db: Session = Depends(get_db),
+    organization=Depends(get_current_organization),
+) -> BulkScheduleResponse:
+    """(Re)generate schedules for many loans with the same options in a single transaction."""
+    loans = (
+        db.query(Loan)
+        .filter(Loan.organization_id == organization.id)
+        .filter(Loan.id.in_(payload.loan_ids))
+        .all()
+    )
+    schedules = RepaymentScheduleService(db).generate_for_loans(
+        organization_id=organization.id,
+        loans=loans,
+        frequency=payload.frequency,
+        interest_method=payload.interest_method,
+        annual_rate=payload.annual_rate,
+        instalments=payload.instalments,
+    )
+    return BulkScheduleResponse(
+        loans=len(schedules),
+        instalments=sum(len(s) for s in schedules.values()),
+        missing_loan_ids=[i for i in payload.loan_ids if i not in schedules],
+    )
+
+
+@router.get("/{loan_id}", response_model=LoanResponse, dependencies=[Depends(not_modified_since_last_change)])
+def get_loan_endpoint(
+    loan_id: UUID,
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> LoanResponse:
+    loan = get_loan(db, loan_id)
+    if not loan or loan.organization_id != organization.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found"
+        )
+    return loan
+
+
+@router.post("/{loan_id}/schedule", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
+def create_schedule_endpoint(
+    loan_id: UUID,
+    payload: ScheduleOptions,
+    db: Session = Depends(get_db),
+    organization=Depends(get_current_organization),
+) -> ScheduleResponse:
+    """Generate and store the loan's repayment schedule, replacing any existing one."""
+    loan = get_loan(db, loan_id)
+    if not loan or loan.organization_id != organization.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found"
+        )
+    service = RepaymentScheduleService(db)
+    schedule = service.generate_for_loans(
+        organization_id=organization.id,
+        loans=[loan],
+        frequency=payload.frequency,
+        interest_method=payload.interest_method,
+        annual_rate=payload.annual_rate,
+        instalments=payload.instalments,
+    )[loan_id]
+    return _schedule_response(loan_id, schedule)
+
+
+@router.get("/{loan_id}/schedule", response_model=ScheduleResponse)
+def get_schedule_endpoint(
+    loan_id: UUID,
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> ScheduleResponse:
+    rows = RepaymentScheduleService(db).list_instalments(organization_id=organization.id, loan_id=loan_id)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No schedule for this loan"
+        )
+    return ScheduleResponse(
+        loan_id=loan_id,
+        total_principal=sum(r.principal for r in rows),
+        total_interest=sum(r.interest for r in rows),
+        total_fees=sum(r.fees for r in rows),
+        total_amount=sum(r.amount for r in rows),
+        instalments=rows,
+    )
 
 
 @router.post(
     "/{loan_id}/documents/upload",
     response_model=LoanDocumentResponse,
     status_code=status.HTTP_201_CREATED,
+    openapi_extra=rate_limit_cost(5),
 )
 async def upload_document_endpoint(
     document_type: str,
@@ -220,6 +371,9 @@ async def upload_document_endpoint(
         content_type=file.content_type,
     )
 
+    # Mark loan as having document uploaded; saved by the same commit as the document row.
+    loan.is_document_uploaded = True
+    db.add(loan)
     doc = create_document(
         db,
         organization_id=organization.id,
@@ -232,35 +386,31 @@ async def upload_document_endpoint(
         size_bytes=len(content),
         checksum=checksum,
     )
-    # Mark loan as having document uploaded
-    loan.is_document_uploaded = True
-    db.add(loan)
-    db.commit()
-
     return doc
 
 
 @router.get("/{loan_id}/documents", response_model=list[LoanDocumentResponse])
 def list_documents_endpoint(
     loan_id: UUID,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoanDocumentResponse]:
-    loan = get_loan(db, loan_id)
-    if not loan:
+    docs = list_documents_for_existing_loan(db, organization_id=organization.id, loan_id=loan_id)
+    if docs is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found"
         )
-    return list_documents_for_loan(db, organization_id=organization.id, loan_id=loan_id)
+    return models_response(docs, LoanDocumentResponse)
 
 
 @router.get("/documents/by-loanee", response_model=list[LoanDocumentResponse])
 def list_documents_by_loanee_email_endpoint(
     email: str,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoanDocumentResponse]:
-    return list_documents_for_loanee_email(db, organization_id=organization.id, email=email)
+    docs = list_documents_for_loanee_email(db, organization_id=organization.id, email=email)
+    return models_response(docs, LoanDocumentResponse)
 
 @router.get(
     "/{loan_id}/documents/{document_id}/signed-url", response_model=SignedUrlResponse
@@ -269,17 +419,16 @@ async def get_document_signed_url_endpoint(
     loan_id: UUID,
     document_id: UUID,
     expires_in: int = 60,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> SignedUrlResponse:
-    loan = get_loan(db, loan_id)
-    if not loan:
+    loan_exists, doc = find_loan_document(
+        db, organization_id=organization.id, loan_id=loan_id, document_id=document_id
+    )
+    if not loan_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found"
         )
-    doc = get_document_for_loan(
-        db, organization_id=organization.id, loan_id=loan_id, document_id=document_id
-    )
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
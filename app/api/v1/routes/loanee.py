@@ -3,12 +3,21 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from fastapi import UploadFile, File
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_organization, get_db
+from app.api.deps import (
+    get_current_organization,
+    get_current_read_organization,
+    get_db,
+    get_read_db,
+    limit_by_organization,
+    not_modified_since_last_change,
+)
 from app.core.config import settings
+from app.core.rate_limit import rate_limit_cost
+from app.core.serialization import models_response
 from app.db.crud.document import (
     create_document,
     get_document,
@@ -19,16 +28,20 @@ from app.db.crud.loanee import (
     delete_loanee,
     get_loanee,
     list_loanees,
+    list_loanees_with_loan_totals,
     list_loanees_with_loans,
     list_loans_for_loanee,
     update_loanee,
+    upsert_loanees,
 )
 from app.db.schemas.loan import (
     LoanDocumentResponse,
     LoanResponse,
+    LoaneeBulkUpsertRequest,
     LoaneeCreate,
     LoaneeResponse,
     LoaneeUpdate,
+    LoaneeWithLoanTotalsResponse,
     LoaneeWithLoansResponse,
     SignedUrlResponse,
 )
@@ -40,7 +53,9 @@ from app.integrations.supabase_storage import (
 
 
 router = APIRouter(
-    prefix="/loanees", tags=["loanees"], dependencies=[Depends(get_current_organization)]
+    prefix="/loanees",
+    tags=["loanees"],
+    dependencies=[Depends(limit_by_organization)],
 )
 
 
@@ -59,33 +74,84 @@ def create_loanee_endpoint(
     return LoaneeResponse.from_orm(loanee)
 
 
-@router.get("/", response_model=list[LoaneeResponse])
-def list_loanees_endpoint(
-    limit: int = 100,
-    offset: int = 0,
+@router.post("/bulk", response_model=list[LoaneeResponse], openapi_extra=rate_limit_cost(10))
+def upsert_loanees_endpoint(
+    payload: LoaneeBulkUpsertRequest,
     db: Session = Depends(get_db),
     organization=Depends(get_current_organization),
 ) -> list[LoaneeResponse]:
-    return list_loanees(db, organization_id=organization.id, limit=limit, offset=offset)
+    """Create loanees whose email is new and return existing ones for known emails, in request order."""
+    loanees = upsert_loanees(db, organization_id=organization.id, payloads=payload.loanees)
+    response = models_response(loanees, LoaneeResponse)
+    db.commit()
+    return response
+
+
+@router.get("/", response_model=list[LoaneeResponse], dependencies=[Depends(not_modified_since_last_change)])
+def list_loanees_endpoint(
+    limit: int = Query(100, ge=1, le=settings.max_page_size),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> list[LoaneeResponse]:
+    items = list_loanees(db, organization_id=organization.id, limit=limit, offset=offset)
+    return models_response(items, LoaneeResponse)
 
 
-@router.get("/with-loans", response_model=list[LoaneeWithLoansResponse])
+@router.get(
+    "/with-loans",
+    response_model=list[LoaneeWithLoansResponse],
+    dependencies=[Depends(not_modified_since_last_change)],
+)
 def list_loanees_with_loans_endpoint(
-    limit: int = 100,
-    offset: int = 0,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    limit: int = Query(100, ge=1, le=settings.max_page_size),
+    offset: int = Query(0, ge=0),
+    loans_per_loanee: int | None = Query(None, ge=1, le=100, description="Only the newest N loans of each loanee"),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoaneeWithLoansResponse]:
-    return list_loanees_with_loans(
-        db, organization_id=organization.id, limit=limit, offset=offset
+    items = list_loanees_with_loans(
+        db,
+        organization_id=organization.id,
+        limit=limit,
+        offset=offset,
+        loans_per_loanee=loans_per_loanee,
     )
+    return models_response(items, LoaneeWithLoansResponse)
 
 
-@router.get("/{loanee_id}", response_model=LoaneeResponse)
+@router.get(
+    "/with-loan-totals",
+    response_model=list[LoaneeWithLoanTotalsResponse],
+    dependencies=[Depends(not_modified_since_last_change)],
+)
+def list_loanees_with_loan_totals_endpoint(
+    limit: int = Query(100, ge=1, le=settings.max_page_size),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> list[LoaneeWithLoanTotalsResponse]:
+    """Loanees with their loan count and outstanding total instead of the loans themselves."""
+    rows = list_loanees_with_loan_totals(
+        db, organization_id=organization.id, limit=limit, offset=offset
+    )
+    items = [
+        {
+            **{field: getattr(loanee, field) for field in LoaneeResponse.model_fields},
+            "loans_count": loans_count,
+            "open_loans_count": open_loans_count,
+            "outstanding_amount": outstanding_amount,
+        }
+        for loanee, loans_count, open_loans_count, outstanding_amount in rows
+    ]
+    return models_response(items, LoaneeWithLoanTotalsResponse)
+
+
+@router.get("/{loanee_id}", response_model=LoaneeResponse, dependencies=[Depends(not_modified_since_last_change)])
 def get_loanee_endpoint(
     loanee_id: UUID,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> LoaneeResponse:
     loanee = get_loanee(db, organization_id=organization.id, loanee_id=loanee_id)
     if not loanee:
@@ -107,7 +173,13 @@ def update_loanee_endpoint(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Loanee not found"
         )
-    return update_loanee(db, loanee, payload)
+    updated = update_loanee(db, loanee, payload)
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Loanee with this email already exists",
+        )
+    return updated
 
 
 @router.delete(
@@ -130,8 +202,8 @@ def delete_loanee_endpoint(
 @router.get("/{loanee_id}/loans", response_model=list[LoanResponse])
 def list_loanee_loans_endpoint(
     loanee_id: UUID,
-    db: Session = Depends(get_db),
-    organization=Depends(get_current_organization),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
 ) -> list[LoanResponse]:
     # Ensure loanee exists in this org
     loanee = get_loanee(db, organization_id=organization.id, loanee_id=loanee_id)
@@ -139,4 +211,5 @@ def list_loanee_loans_endpoint(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Loanee not found"
         )
-    return list_loans_for_loanee(db, organization_id=organization.id, loanee_id=loanee_id)
+    items = list_loans_for_loanee(db, organization_id=organization.id, loanee_id=loanee_id)
+    return models_response(items, LoanResponse)
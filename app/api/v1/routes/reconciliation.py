@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_organization, get_db, limit_by_organization
+from app.core.rate_limit import rate_limit_cost
+from app.db.schemas.reconciliation import ReconciliationReport
+from app.services.reconciliation_service import ReconciliationService, parse_statement_csv
+
+
+router = APIRouter(
+    prefix="/reconciliation",
+    tags=["reconciliation"],
+    dependencies=[Depends(get_current_organization), Depends(limit_by_organization)],
+)
+
+
+@router.post("/statements", response_model=ReconciliationReport, openapi_extra=rate_limit_cost(50))
+def reconcile_statement_endpoint(
+    file: UploadFile = File(...),
+    post: bool = False,
+    db: Session = Depends(get_db),
+    organization=Depends(get_current_organization),
+) -> ReconciliationReport:
+    """Match a bank statement CSV against open loans.
+
+    Runs as a dry run by default and only returns the match report; pass `post=true`
+    to record confirmed matches as payments and mark their loans paid.
+    """
+    service = ReconciliationService(db)
+    try:
+        result = service.reconcile(
+            organization_id=organization.id,
+            lines=parse_statement_csv(file.file),
+        )
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not parse statement: {e}",
+        )
+    if post:
+        service.post_matches(organization_id=organization.id, result=result)
+    return result
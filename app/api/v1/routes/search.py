@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_read_organization, get_read_db, limit_by_organization
+from app.core.rate_limit import rate_limit_cost
+from app.db.crud.search import search_loanees, search_loans
+from app.db.schemas.search import SearchResponse
+
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+    dependencies=[Depends(limit_by_organization)],
+)
+
+
+@router.get("", response_model=SearchResponse, openapi_extra=rate_limit_cost(2))
+def search_endpoint(
+    q: str = Query(..., min_length=2, max_length=200),
+    scope: Literal["all", "loanees", "loans"] = "all",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    organization=Depends(get_current_read_organization),
+) -> SearchResponse:
+    """Ranked fuzzy search over loanee name, email, phone and address, and their loans."""
+    loanees = []
+    loans = []
+    if scope in ("all", "loanees"):
+        loanees = [
+            {"rank": rank, "loanee": loanee}
+            for loanee, rank in search_loanees(
+                db, organization_id=organization.id, q=q, limit=limit, offset=offset
+            )
+        ]
+    if scope in ("all", "loans"):
+        loans = [
+            {"rank": rank, "loan": loan}
+            for loan, rank in search_loans(
+                db, organization_id=organization.id, q=q, limit=limit, offset=offset
+            )
+        ]
+    return SearchResponse.model_validate({"query": q, "loanees": loanees, "loans": loans})
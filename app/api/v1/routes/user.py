@@ -1,14 +1,14 @@
-from app.api.deps import get_current_organization
+from app.api.deps import get_current_read_organization, limit_by_organization, not_modified_since_last_change
 from app.db.schemas.organization import OrganizationResponse
 from fastapi import APIRouter, Depends
 
 router = APIRouter(
     prefix="/organizations",
     tags=["organizations"],
-    dependencies=[Depends(get_current_organization)],
+    dependencies=[Depends(limit_by_organization)],
 )
 
 
-@router.get("/me", response_model=OrganizationResponse)
-def get_organization_profile(organization=Depends(get_current_organization)) -> OrganizationResponse:
+@router.get("/me", response_model=OrganizationResponse, dependencies=[Depends(not_modified_since_last_change)])
+def get_organization_profile(organization=Depends(get_current_read_organization)) -> OrganizationResponse:
     return OrganizationResponse.from_orm(organization)
\ No newline at end of file
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.integrations.mono import WEBHOOK_SECRET_HEADER, verify_webhook_secret
+from app.services.webhook_service import enqueue_webhook
+
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+@router.post("/mono", status_code=status.HTTP_202_ACCEPTED)
+async def mono_webhook_endpoint(request: Request) -> dict:
+    """Receive a Mono event: verify the shared secret, queue the raw body and acknowledge.
+
+    Events are applied asynchronously by `app.tasks.webhooks.apply_mono_webhooks`.
+    """
+    if not verify_webhook_secret(request.headers.get(WEBHOOK_SECRET_HEADER)):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook secret")
+    enqueue_webhook(await request.body())
+    return {"status": "accepted"}
@@ -1,17 +1,93 @@
 from celery import Celery
-import time
-# import app.tasks.email
-
+from celery.schedules import crontab
+from kombu import Queue
 
 from app.core.config import settings
 
 
+# Each queue gets its own worker pool (see docker-compose.yml), so a long export or
+# snapshot rebuild can never hold up the debit run or webhook settlement.
+DEFAULT_QUEUE = "default"
+DEBITS_QUEUE = "debits"
+BULK_QUEUE = "bulk"
+NOTIFICATIONS_QUEUE = "notifications"
+
+
 celery_app = Celery(
     "loan_api",
     broker=settings.redis_url,
     backend=settings.redis_url,
-    include=["app.tasks.email", "app.tasks.debit"],
+    include=[
+        "app.tasks.debit",
+        "app.tasks.export",
+        "app.tasks.maintenance",
+        "app.tasks.analytics",
+        "app.tasks.webhooks",
+        "app.tasks.notifications",
+    ],
 )
 
+celery_app.conf.update(
+    timezone="UTC",
+    task_queues=[
+        Queue(DEFAULT_QUEUE),
+        Queue(DEBITS_QUEUE),
+        Queue(BULK_QUEUE),
+        Queue(NOTIFICATIONS_QUEUE),
+    ],
+    task_default_queue=DEFAULT_QUEUE,
+    task_routes={
+        "app.tasks.debit.*": {"queue": DEBITS_QUEUE},
+        "app.tasks.webhooks.*": {"queue": DEBITS_QUEUE},
+        "app.tasks.export.*": {"queue": BULK_QUEUE},
+        "app.tasks.analytics.*": {"queue": BULK_QUEUE},
+        "app.tasks.maintenance.*": {"queue": BULK_QUEUE},
+        "app.tasks.notifications.*": {"queue": NOTIFICATIONS_QUEUE},
+    },
+    # Acknowledge after the task finishes so a worker dying mid-task hands it to another worker.
+    # Every task is safe to re-run: webhook events are deduplicated, snapshots and partitions
+    # are upserts, exports overwrite their object. Debit items a dead run left in `processing`
+    # are not picked again until `release_stale_claims` hands them back, and the retry then
+    # re-sends the same idempotency key, so Mono never charges the same attempt twice.
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Tasks are long and uneven; reserving only one at a time keeps a worker from sitting
+    # on queued work while it is busy with a slow one.
+    worker_prefetch_multiplier=1,
+    # With acks_late on Redis, a task still unacknowledged after this long is redelivered,
+    # so it must exceed the longest task (large exports).
+    broker_transport_options={"visibility_timeout": settings.celery_visibility_timeout_seconds},
+    result_expires=settings.celery_result_expires_seconds,
+)
 
-
+# `expires` drops runs that could not start before the next one is due (e.g. while
+# workers are down) instead of letting them pile up.
+celery_app.conf.beat_schedule = {
+    "process-due-debits": {
+        "task": "app.tasks.debit.process_due_debits",
+        "schedule": crontab(minute="*/5"),
+        "options": {"expires": 4 * 60},
+    },
+    "apply-mono-webhooks": {
+        "task": "app.tasks.webhooks.apply_mono_webhooks",
+        "schedule": 5.0,
+        "options": {"expires": 5},
+    },
+    "finalize-portfolio-snapshots": {
+        "task": "app.tasks.analytics.finalize_portfolio_snapshots",
+        "schedule": crontab(hour=0, minute=15),
+    },
+    "refresh-portfolio-snapshots": {
+        "task": "app.tasks.analytics.refresh_portfolio_snapshots",
+        "schedule": crontab(minute="*/15"),
+        "options": {"expires": 14 * 60},
+    },
+    "schedule-loan-reminders": {
+        "task": "app.tasks.notifications.schedule_loan_reminders",
+        "schedule": crontab(hour=settings.reminder_send_hour_utc, minute=0),
+    },
+    "ensure-table-partitions": {
+        "task": "app.tasks.maintenance.ensure_table_partitions",
+        "schedule": crontab(hour=1, minute=0),
+    },
+}
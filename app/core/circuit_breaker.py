@@ -0,0 +1,205 @@
+"""Circuit breaker and concurrency limiter for outbound provider calls, shared through Redis.
+
+`CircuitBreaker` counts calls and failures in a tumbling window. Once at least `min_calls`
+have been made and the failure rate reaches `failure_rate`, it trips: calls fail immediately
+for `cooldown_seconds`, then a single half-open probe is let through. A successful probe
+closes the circuit; a failed one re-opens it for another cooldown.
+
+`ConcurrencyLimiter` is a Redis semaphore (sorted set of leases) capping in-flight calls
+across every worker. Leases expire on their own, so a crashed worker cannot leak a slot.
+
+Both fail open when Redis is unavailable: losing the breaker must not stop collections.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from functools import cached_property
+from typing import AsyncIterator
+
+import redis
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+PROBE = "probe"
+TRIPPED = "tripped"
+
+# KEYS: tripped, open, probe. ARGV: probe lease ms.
+_ALLOW_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 'closed' end
+if redis.call('EXISTS', KEYS[2]) == 1 then return 'open' end
+if redis.call('SET', KEYS[3], '1', 'NX', 'PX', ARGV[1]) then return 'probe' end
+return 'open'
+"""
+
+# KEYS: window, tripped, open, probe.
+# ARGV: failed (0/1), is_probe (0/1), window ms, min calls, failure rate, cooldown ms.
+# Returns 'tripped' when this result opened the circuit. While tripped, only the probe's
+# result counts; late results of calls started before the trip are ignored.
+_RECORD_LUA = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    if ARGV[2] ~= '1' then return 'open' end
+    redis.call('DEL', KEYS[4])
+    if ARGV[1] == '1' then
+        redis.call('SET', KEYS[3], '1', 'PX', ARGV[6])
+        return 'tripped'
+    end
+    redis.call('DEL', KEYS[2], KEYS[1])
+    return 'closed'
+end
+local total = redis.call('HINCRBY', KEYS[1], 'total', 1)
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', tonumber(ARGV[1]))
+if total == 1 then redis.call('PEXPIRE', KEYS[1], ARGV[3]) end
+if total >= tonumber(ARGV[4]) and failures / total >= tonumber(ARGV[5]) then
+    redis.call('SET', KEYS[2], '1')
+    redis.call('SET', KEYS[3], '1', 'PX', ARGV[6])
+    redis.call('DEL', KEYS[1])
+    return 'tripped'
+end
+return 'closed'
+"""
+
+# KEYS: lease zset. ARGV: limit, lease ms, token. Scores are lease expiry times (ms).
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate: float,
+        min_calls: int,
+        window_seconds: int,
+        cooldown_seconds: int,
+        probe_timeout_seconds: int = 60,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self._open_until = 0.0
+        prefix = f"cb:{name}"
+        self._window_key = f"{prefix}:window"
+        self._tripped_key = f"{prefix}:tripped"
+        self._open_key = f"{prefix}:open"
+        self._probe_key = f"{prefix}:probe"
+
+    @cached_property
+    def _allow_script(self):
+        return get_redis().register_script(_ALLOW_LUA)
+
+    @cached_property
+    def _record_script(self):
+        return get_redis().register_script(_RECORD_LUA)
+
+    def is_open(self) -> bool:
+        """True while calls are being rejected (does not claim the half-open probe)."""
+        if time.monotonic() < self._open_until:
+            return True
+        try:
+            return bool(get_redis().exists(self._open_key))
+        except redis.RedisError:
+            return False
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError if calls are blocked; return True if this call is the half-open probe."""
+        # Remember an open circuit for a second so a failing run does not query Redis per item.
+        if time.monotonic() < self._open_until:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            state = self._allow_script(
+                keys=[self._tripped_key, self._open_key, self._probe_key],
+                args=[self.probe_timeout_seconds * 1000],
+            ).decode()
+        except redis.RedisError as exc:
+            logger.warning("Circuit breaker %s unavailable, allowing call: %s", self.name, exc)
+            return False
+        if state == OPEN:
+            self._open_until = time.monotonic() + 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        return state == PROBE
+
+    def record(self, *, failed: bool, probe: bool = False) -> None:
+        try:
+            state = self._record_script(
+                keys=[self._window_key, self._tripped_key, self._open_key, self._probe_key],
+                args=[
+                    int(failed),
+                    int(probe),
+                    self.window_seconds * 1000,
+                    self.min_calls,
+                    self.failure_rate,
+                    self.cooldown_seconds * 1000,
+                ],
+            ).decode()
+        except redis.RedisError as exc:
+            logger.warning("Circuit breaker %s unavailable, dropping result: %s", self.name, exc)
+            return
+        if state == TRIPPED:
+            logger.warning("%s circuit opened for %ss", self.name, self.cooldown_seconds)
+            self._open_until = time.monotonic() + 1
+        elif probe and state == CLOSED:
+            logger.info("%s circuit closed after a successful probe", self.name)
+            self._open_until = 0.0
+
+
+class ConcurrencyLimiter:
+    def __init__(self, name: str, *, limit: int, lease_seconds: int, max_wait_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._key = f"sem:{name}"
+
+    @cached_property
+    def _acquire_script(self):
+        return get_redis().register_script(_ACQUIRE_LUA)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of `limit` global slots; raises TimeoutError after `max_wait_seconds`."""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.max_wait_seconds
+        acquired = False
+        try:
+            while True:
+                if self._acquire_script(keys=[self._key], args=[self.limit, self.lease_seconds * 1000, token]):
+                    acquired = True
+                    break
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"No free {self.name} slot within {self.max_wait_seconds}s")
+                await asyncio.sleep(0.05)
+        except redis.RedisError as exc:
+            logger.warning("Concurrency limiter %s unavailable, proceeding: %s", self.name, exc)
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    get_redis().zrem(self._key, token)
+                except redis.RedisError:
+                    pass
@@ -0,0 +1,212 @@
+"""Response compression (zstd, brotli, gzip) negotiated from `Accept-Encoding`.
+
+Pure ASGI middleware, so streamed responses (exports) are compressed chunk by chunk as they
+are produced instead of being buffered: each chunk is flushed so the client can decode what
+it has received so far. Single-body responses smaller than `compression_minimum_size` are
+sent as-is, since compressing them saves fewer bytes than the headers and CPU cost.
+
+brotli and zstd need the `brotli` / `zstandard` packages (in requirements.txt); an
+encoding whose package is missing is simply not offered. See scripts/bench_compression.py
+for the CPU-vs-bytes trade-off of each level.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+
+_COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+}
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far in a decodable form, keeping the stream open."""
+
+    def finish(self) -> bytes: ...
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        # wbits=31: zlib stream with a gzip header and trailer.
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_codecs() -> dict[str, Callable[[], Compressor]]:
+    """Compressor factories for each encoding this process can produce, at the configured levels."""
+    codecs: dict[str, Callable[[], Compressor]] = {"gzip": lambda: _Gzip(settings.compression_gzip_level)}
+    if brotli is not None:
+        codecs["br"] = lambda: _Brotli(settings.compression_brotli_quality)
+    if zstandard is not None:
+        codecs["zstd"] = lambda: _Zstd(settings.compression_zstd_level)
+    return codecs
+
+
+def negotiate(accept_encoding: str, preference: list[str]) -> str | None:
+    """Pick the encoding from `preference` with the highest q-value in `Accept-Encoding`.
+
+    Ties go to the earlier entry in `preference`. `*` covers encodings not listed; q=0 refuses.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in preference:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return content_type.startswith("text/") or content_type in _COMPRESSIBLE_TYPES or content_type.endswith("+json")
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """Compress text/JSON responses with the best encoding the client accepts."""
+
+    def __init__(self, app: ASGIApp, *, minimum_size: int | None = None, encodings: list[str] | None = None):
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size if minimum_size is None else minimum_size
+        self.codecs = available_codecs()
+        preference = encodings or [e.strip() for e in settings.compression_encodings.split(",") if e.strip()]
+        self.preference = [e for e in preference if e in self.codecs]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not _compressible(headers)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether to compress.
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(scope=start)
+                _add_vary(headers)
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = self.codecs[encoding]()
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    # Length of a stream is unknown up front; the server falls back to chunking.
+                    del headers["Content-Length"]
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+
+            chunk = compressor.compress(body) + (compressor.flush() if more_body else compressor.finish())
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
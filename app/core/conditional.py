@@ -0,0 +1,33 @@
+"""Weak ETags and `If-None-Match` matching for conditional GETs (RFC 9110 section 13.1.2)."""
+from __future__ import annotations
+
+import hashlib
+
+from starlette.requests import Request
+
+
+def weak_etag(*parts: object) -> str:
+    digest = hashlib.blake2b("\x1f".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def request_etag(request: Request, version: str) -> str:
+    """ETag for this GET: the data version plus everything that selects the representation.
+
+    The app version is included so a deploy that changes a response shape invalidates it.
+    """
+    query = sorted(request.query_params.multi_items())
+    return weak_etag(version, request.app.version, request.url.path, query)
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True if the request's `If-None-Match` lists `etag` (weak comparison) or is `*`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
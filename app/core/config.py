@@ -11,6 +11,27 @@ class Settings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: str
     database_url: str | None = None
+    # Engine pool per worker process, for the primary and each replica: size it to cover `threadpool_tokens`
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout_seconds: float = 30.0
+
+    # Server runtime (app/server.py, docs/server_runtime.md)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 1
+    server_backlog: int = 2048
+    server_keepalive_seconds: int = 5
+    server_limit_concurrency: int | None = None
+    server_forwarded_allow_ips: str = "127.0.0.1"
+    # anyio threadpool tokens per worker: how many sync (`def`) routes can run at once
+    threadpool_tokens: int = 40
+    threadpool_sample_seconds: float = 1.0
+
+    # Read replicas: comma-separated SQLAlchemy URLs used by `get_read_db`
+    database_replica_urls: str | None = None
+    replica_retry_seconds: int = 30
+    read_your_writes_seconds: int = 5
 
     # Supabase Auth
     supabase_url: str | None = None
@@ -18,6 +39,20 @@ class Settings(BaseSettings):
     supabase_service_role_key: str | None = None
     supabase_jwt_audience: str = "authenticated"
 
+    # Google OAuth (optional)
+    google_client_id: str | None = None
+    google_client_secret: str | None = None
+
+    # Startup warmup (app/core/lifespan.py)
+    warmup_enabled: bool = True
+    warmup_db_connections: int = 5
+    warmup_timeout_seconds: float = 10.0
+
+    # Health checks (/health/ready)
+    health_check_timeout_seconds: float = 1.0
+    health_check_cache_seconds: float = 2.0
+    health_check_storage: bool = False
+
     # Supabase Storage
     supabase_storage_bucket: str = "loan-bucket"
 
@@ -30,15 +65,76 @@ class Settings(BaseSettings):
     redis_url: str | None = None
     celery_broker_url: str | None = None
     celery_result_backend: str | None = None
+    celery_visibility_timeout_seconds: int = 6 * 60 * 60
+    celery_result_expires_seconds: int = 24 * 60 * 60
 
     # CORS
     cors_allow_origins: str | None = None
+
+    # Rate limiting (token bucket per organization, or per client IP on auth routes)
+    rate_limit_enabled: bool = True
+    rate_limit_capacity: int = 120
+    rate_limit_refill_per_second: float = 2.0
+    auth_rate_limit_capacity: int = 10
+    auth_rate_limit_refill_per_second: float = 0.2
+    max_page_size: int = 500
+
+    # Conditional GETs: weak ETags from per-organization data versions (app/db/data_version.py)
+    conditional_get_enabled: bool = True
+
+    # Response compression (app/core/compression.py); encodings in server preference order
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_encodings: str = "zstd,br,gzip"
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
     
 
     # Mono Direct Debit
     mono_base_url: str | None = None
     mono_secret_key: str | None = None
     mono_public_key: str | None = None
+    # Shared secret Mono sends in the `mono-webhook-secret` header
+    mono_webhook_secret: str | None = None
+    webhook_stream_maxlen: int = 100_000
+    # Per-item retry policy for failed debits (exponential backoff with jitter)
+    debit_max_attempts: int = 5
+    debit_retry_base_seconds: int = 15 * 60
+    debit_retry_max_seconds: int = 24 * 60 * 60
+    # Items left in `processing` this long are handed back to the scheduler; must exceed a full
+    # batch of charges (100 items at `mono_timeout_seconds` each, worst case)
+    debit_claim_timeout_seconds: int = 60 * 60
+    # Mono call protection: per-request timeout, global concurrency/rate caps, circuit breaker
+    mono_timeout_seconds: float = 15.0
+    mono_max_concurrency: int = 10
+    mono_requests_per_second: float = 20.0
+    mono_max_wait_seconds: float = 5.0
+    mono_breaker_failure_rate: float = 0.5
+    mono_breaker_min_calls: int = 10
+    mono_breaker_window_seconds: int = 60
+    mono_breaker_cooldown_seconds: int = 30
+
+    # Repayment reminders (app/services/reminder_service.py)
+    reminder_days_before: list[int] = [3, 1, 0]
+    reminder_send_hour_utc: int = 7
+    reminder_batch_size: int = 500
+    reminder_currency: str = "NGN"
+    notification_rate_per_second: float = 50.0
+    notification_email_backend: str = "file"  # file | smtp
+    notification_sms_backend: str = "file"  # file | http
+    notification_file_dir: str = "var/notifications"
+    notification_email_from: str = "no-reply@localhost"
+    smtp_host: str = "localhost"
+    smtp_port: int = 1025
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_use_tls: bool = False
+    smtp_timeout_seconds: float = 10.0
+    sms_api_url: str | None = None
+    sms_api_key: str | None = None
+    sms_sender_id: str | None = None
+    sms_timeout_seconds: float = 10.0
     class Config:
         env_file=".env"
         
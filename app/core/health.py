@@ -0,0 +1,154 @@
+"""Dependency probes for the readiness endpoint.
+
+Each probe has a hard timeout (`health_check_timeout_seconds`) and its result is cached
+for `health_check_cache_seconds`, so load balancers polling several times a second cost
+one `SELECT 1` and one PING per interval per process. Only one round of probes runs at a
+time; callers arriving meanwhile get the previous result rather than queueing more
+threads behind a database that is already struggling.
+
+A database whose connection pool is fully checked out is reported as failing even if
+`SELECT 1` would eventually succeed: requests on that pod are already waiting for a
+connection, so it should stop receiving traffic. `SELECT 1` itself runs on a dedicated
+one-connection engine bounded by the probe timeout, so a probe never queues for the
+application pool.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.session import DATABASE_URL, engine
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    ok: bool
+    latency_ms: float
+    error: str | None = None
+    details: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        data: dict = {"status": "ok" if self.ok else "error", "latency_ms": round(self.latency_ms, 1)}
+        if self.error:
+            data["error"] = self.error
+        data.update(self.details)
+        return data
+
+
+def _pool_details() -> dict:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    # QueuePool has no public getter for max_overflow; -1 means unbounded.
+    max_overflow = getattr(pool, "_max_overflow", -1)
+    if max_overflow < 0:
+        return {"pool_checked_out": pool.checkedout()}
+    return {"pool_checked_out": pool.checkedout(), "pool_capacity": pool.size() + max_overflow}
+
+
+@lru_cache(maxsize=1)
+def _probe_engine() -> Engine:
+    """A one-connection engine for `SELECT 1`, separate from the application pool.
+
+    `asyncio.wait_for` cannot cancel the worker thread, so the thread itself must give up
+    within the probe timeout: checkout, connect and the query are all bounded by it, and a
+    probe never waits behind request traffic for `database_pool_timeout_seconds`.
+    """
+    timeout = settings.health_check_timeout_seconds
+    return create_engine(
+        DATABASE_URL,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=timeout,
+        pool_pre_ping=True,
+        connect_args={
+            "connect_timeout": max(1, math.ceil(timeout)),
+            "options": f"-c statement_timeout={int(timeout * 1000)}",
+        },
+    )
+
+
+def _check_database() -> dict:
+    details = _pool_details()
+    if "pool_capacity" in details and details["pool_checked_out"] >= details["pool_capacity"]:
+        raise RuntimeError("connection pool exhausted")
+    with _probe_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return details
+
+
+def _check_redis() -> dict:
+    get_redis().ping()
+    return {}
+
+
+async def _check_storage() -> dict:
+    if not settings.supabase_url:
+        raise RuntimeError("SUPABASE_URL not configured")
+    async with httpx.AsyncClient(timeout=settings.health_check_timeout_seconds) as client:
+        resp = await client.get(f"{settings.supabase_url.rstrip('/')}/storage/v1/version")
+    if resp.status_code >= 500:
+        raise RuntimeError(f"storage returned {resp.status_code}")
+    return {}
+
+
+def _probes() -> dict[str, Callable[[], Awaitable[dict]]]:
+    probes: dict[str, Callable[[], Awaitable[dict]]] = {
+        "database": lambda: run_in_threadpool(_check_database),
+        "redis": lambda: run_in_threadpool(_check_redis),
+    }
+    if settings.health_check_storage:
+        probes["storage"] = _check_storage
+    return probes
+
+
+async def _run(probe: Callable[[], Awaitable[dict]]) -> CheckResult:
+    started = time.perf_counter()
+    try:
+        details = await asyncio.wait_for(probe(), timeout=settings.health_check_timeout_seconds)
+    except asyncio.TimeoutError:
+        return CheckResult(
+            ok=False,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            error=f"timed out after {settings.health_check_timeout_seconds}s",
+        )
+    except Exception as exc:  # noqa: BLE001 - any failure means not ready
+        message = (str(exc).splitlines() or [repr(exc)])[0][:200]
+        return CheckResult(ok=False, latency_ms=(time.perf_counter() - started) * 1000, error=message)
+    return CheckResult(ok=True, latency_ms=(time.perf_counter() - started) * 1000, details=details)
+
+
+class HealthChecker:
+    def __init__(self) -> None:
+        self._results: dict[str, CheckResult] = {}
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> tuple[dict[str, CheckResult], float]:
+        """Return (results, age in seconds), re-probing when the cache is stale."""
+        stale = time.monotonic() - self._checked_at >= settings.health_check_cache_seconds
+        if stale and not self._lock.locked():
+            async with self._lock:
+                probes = _probes()
+                results = await asyncio.gather(*(_run(probe) for probe in probes.values()))
+                self._results = dict(zip(probes, results))
+                self._checked_at = time.monotonic()
+        elif not self._results:
+            # The very first round is still running: wait for it rather than report nothing.
+            async with self._lock:
+                pass
+        return self._results, time.monotonic() - self._checked_at
+
+
+health_checker = HealthChecker()
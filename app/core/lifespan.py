@@ -0,0 +1,87 @@
+"""Application lifespan: warm connections up before taking traffic, release them on shutdown.
+
+Warmup runs before the app reports ready (`app.state.ready`), so the first requests on a
+new pod do not pay for TCP/TLS handshakes, Postgres authentication or a JWKS fetch. Each
+step is bounded by `warmup_timeout_seconds` and only logged on failure: a dependency that
+is down is reported by the readiness check, not by a crash loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.runtime import configure_threadpool, threadpool_monitor
+from app.core.supabase_auth import supabase_jwt_verifier
+from app.db.session import engine
+from app.integrations.supabase_storage import preload_client
+
+logger = logging.getLogger(__name__)
+
+
+def _open_db_connections() -> None:
+    # Check out several connections at once so the pool keeps that many open and idle.
+    count = min(settings.warmup_db_connections, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _open_redis() -> None:
+    get_redis().ping()
+
+
+async def _step(name: str, func: Callable[[], Awaitable[None]]) -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(func(), timeout=settings.warmup_timeout_seconds)
+    except Exception as exc:  # noqa: BLE001 - warmup is best effort
+        logger.warning("Warmup step %s failed: %r", name, exc)
+        return
+    logger.info("Warmup step %s took %.0f ms", name, (time.perf_counter() - started) * 1000)
+
+
+async def warmup() -> None:
+    steps: dict[str, Callable[[], Awaitable[None]]] = {
+        "database": lambda: run_in_threadpool(_open_db_connections),
+        "redis": lambda: run_in_threadpool(_open_redis),
+    }
+    if settings.supabase_url and settings.supabase_anon_key:
+        steps["jwks"] = supabase_jwt_verifier.prefetch_jwks
+        steps["storage"] = lambda: run_in_threadpool(preload_client)
+    await asyncio.gather(*(_step(name, func) for name, func in steps.items()))
+
+
+def _shutdown() -> None:
+    for name, close in (("database", engine.dispose), ("redis", lambda: get_redis().connection_pool.disconnect())):
+        try:
+            close()
+        except Exception as exc:  # noqa: BLE001 - shutting down anyway
+            logger.warning("Closing %s connections failed: %r", name, exc)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = False
+    configure_threadpool()
+    threadpool_monitor.start()
+    if settings.warmup_enabled:
+        await warmup()
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await threadpool_monitor.stop()
+        await run_in_threadpool(_shutdown)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+_STATE_KEY = "response_headers"
+
+
+def add_response_headers(request: Request, headers: dict[str, str]) -> None:
+    """Queue headers to be added to whatever response this request ends up with.
+
+    Setting headers on an injected `Response` only works when the route returns a plain
+    object; routes that return a Response directly (and error responses) would drop them.
+    """
+    queued = getattr(request.state, _STATE_KEY, None)
+    if queued is None:
+        queued = {}
+        setattr(request.state, _STATE_KEY, queued)
+    queued.update(headers)
+
+
+class ResponseHeadersMiddleware:
+    """Pure ASGI middleware that applies headers queued with `add_response_headers`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                queued = scope.get("state", {}).get(_STATE_KEY)
+                if queued:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in queued.items():
+                        headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
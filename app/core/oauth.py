@@ -1,17 +1,32 @@
-from authlib.integrations.starlette_client import OAuth
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from app.core.config import settings
 
-oauth = OAuth()
+if TYPE_CHECKING:
+    from authlib.integrations.starlette_client import OAuth
+
+
+@lru_cache(maxsize=1)
+def get_oauth() -> "OAuth":
+    """Google OAuth client, built on first use so authlib is only imported when sign-in is used."""
+    if not settings.google_client_id or not settings.google_client_secret:
+        raise RuntimeError("GOOGLE_CLIENT_ID / GOOGLE_CLIENT_SECRET not configured")
 
-oauth.register(
-    name='google',
-    client_id=settings.GOOGLE_CLIENT_ID,
-    client_secret=settings.GOOGLE_CLIENT_SECRET,
-    access_token_url='https://oauth2.googleapis.com/token',
-    authorize_url='https://accounts.google.com/o/oauth2/v2/auth',
-    api_base_url='https://www.googleapis.com/oauth2/v3/',
-    userinfo_endpoint='https://openidconnect.googleapis.com/v1/userinfo',
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={'scope': 'openid email profile'}
-)
+    from authlib.integrations.starlette_client import OAuth
 
+    oauth = OAuth()
+    oauth.register(
+        name='google',
+        client_id=settings.google_client_id,
+        client_secret=settings.google_client_secret,
+        access_token_url='https://oauth2.googleapis.com/token',
+        authorize_url='https://accounts.google.com/o/oauth2/v2/auth',
+        api_base_url='https://www.googleapis.com/oauth2/v3/',
+        userinfo_endpoint='https://openidconnect.googleapis.com/v1/userinfo',
+        server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+        client_kwargs={'scope': 'openid email profile'}
+    )
+    return oauth
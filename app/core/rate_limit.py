@@ -0,0 +1,147 @@
+"""Token-bucket rate limiting backed by an atomic Redis Lua script.
+
+Each bucket holds up to `capacity` tokens and refills continuously at `refill_per_second`.
+A request spends its route's cost (default 1, see `rate_limit_cost`). The script reads,
+refills, spends and writes the bucket in one round trip using Redis' own clock, so every
+API process shares the same limit without races.
+
+The token count of a bucket that was just rejected is also remembered in-process, so a
+client hammering the API is turned away without touching Redis until its bucket could
+afford the request it is making.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import redis
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_COST_KEY = "x-rate-limit-cost"
+_LOCAL_BLOCK_MAX_KEYS = 10_000
+
+# KEYS[1] bucket key; ARGV: capacity, refill tokens/second, cost.
+# Returns {allowed (0/1), tokens left as a string} (Lua numbers would be truncated to integers).
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def rate_limit_cost(cost: int) -> dict:
+    """`openapi_extra` for a route that should spend `cost` tokens per call instead of 1."""
+    return {RATE_LIMIT_COST_KEY: cost}
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the bucket is full again / until this request could succeed.
+    reset: int
+    retry_after: int
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+        }
+
+
+@lru_cache(maxsize=1)
+def _script():
+    return get_redis().register_script(_TOKEN_BUCKET_LUA)
+
+
+# key -> (tokens left when Redis last rejected a request, time.monotonic() then, refill/second).
+_rejected: dict[str, tuple[float, float, float]] = {}
+_rejected_lock = threading.Lock()
+
+
+def _locally_blocked(key: str, *, capacity: int, cost: int) -> RateLimitResult | None:
+    """Reject without Redis if the bucket cannot afford `cost` even with no other spending since.
+
+    Replaying the refill from the last known token count gives an upper bound on the real
+    count (other processes only spend), so a cheap request is never turned away because an
+    expensive one was.
+    """
+    state = _rejected.get(key)
+    if state is None:
+        return None
+    tokens, at, rate = state
+    tokens = min(capacity, tokens + (time.monotonic() - at) * rate)
+    if tokens >= cost:
+        if tokens >= capacity:
+            with _rejected_lock:
+                _rejected.pop(key, None)
+        return None
+    retry_after = math.ceil((cost - tokens) / rate)
+    return RateLimitResult(
+        allowed=False,
+        limit=capacity,
+        remaining=int(tokens),
+        reset=math.ceil((capacity - tokens) / rate),
+        retry_after=retry_after,
+    )
+
+
+def _remember_rejection(key: str, tokens: float, refill_per_second: float) -> None:
+    with _rejected_lock:
+        if len(_rejected) >= _LOCAL_BLOCK_MAX_KEYS:
+            _rejected.clear()
+        _rejected[key] = (tokens, time.monotonic(), refill_per_second)
+
+
+def hit(key: str, *, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult | None:
+    """Spend `cost` tokens from bucket `key`.
+
+    Returns None when Redis is unavailable: the limiter fails open rather than taking the API down.
+    """
+    cost = max(1, min(cost, capacity))
+    local = _locally_blocked(key, capacity=capacity, cost=cost)
+    if local is not None:
+        return local
+    try:
+        allowed, tokens = _script()(keys=[f"rl:{key}"], args=[capacity, refill_per_second, cost])
+    except redis.RedisError as exc:
+        logger.warning("Rate limiter unavailable, allowing request: %s", exc)
+        return None
+    tokens = float(tokens)
+    retry_after = 0 if allowed else math.ceil((cost - tokens) / refill_per_second)
+    if not allowed:
+        _remember_rejection(key, tokens, refill_per_second)
+    return RateLimitResult(
+        allowed=bool(allowed),
+        limit=capacity,
+        remaining=int(tokens),
+        reset=math.ceil((capacity - tokens) / refill_per_second),
+        retry_after=retry_after,
+    )
@@ -0,0 +1,103 @@
+"""Per-process runtime tuning and saturation metrics.
+
+FastAPI runs every plain `def` route in anyio's default thread limiter, so its token count
+caps how many sync requests a worker serves at once. `configure_threadpool` sizes it from
+`threadpool_tokens`; `ThreadpoolMonitor` samples the limiter and the database pool in the
+background so `/health/runtime` can show whether a worker is queueing on either one.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import anyio.to_thread
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def configure_threadpool() -> None:
+    """Apply `threadpool_tokens` to the running event loop's default thread limiter."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_tokens
+
+
+@dataclass
+class _Gauge:
+    current: int = 0
+    peak: int = 0
+
+    def observe(self, value: int) -> None:
+        self.current = value
+        self.peak = max(self.peak, value)
+
+
+class ThreadpoolMonitor:
+    def __init__(self) -> None:
+        self.borrowed = _Gauge()
+        self.waiting = _Gauge()
+        self.db_checked_out = _Gauge()
+        self.samples = 0
+        self.saturated_samples = 0
+        self.started_at = time.monotonic()
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> None:
+        stats = anyio.to_thread.current_default_thread_limiter().statistics()
+        self.borrowed.observe(stats.borrowed_tokens)
+        self.waiting.observe(stats.tasks_waiting)
+        if hasattr(engine.pool, "checkedout"):
+            self.db_checked_out.observe(engine.pool.checkedout())
+        self.samples += 1
+        if stats.tasks_waiting:
+            self.saturated_samples += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception:  # noqa: BLE001 - metrics must never take the worker down
+                logger.debug("Threadpool sample failed", exc_info=True)
+            await asyncio.sleep(settings.threadpool_sample_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        """Current and peak usage since start; `saturated_ratio` is the share of samples with waiters."""
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.monotonic() - self.started_at),
+            "threadpool": {
+                "tokens": limiter.total_tokens,
+                "borrowed": self.borrowed.current,
+                "borrowed_peak": self.borrowed.peak,
+                "waiting": self.waiting.current,
+                "waiting_peak": self.waiting.peak,
+                "saturated_ratio": round(self.saturated_samples / self.samples, 4) if self.samples else 0.0,
+            },
+            "database_pool": {
+                "size": settings.database_pool_size,
+                "max_overflow": settings.database_max_overflow,
+                "checked_out": self.db_checked_out.current,
+                "checked_out_peak": self.db_checked_out.peak,
+            },
+        }
+
+
+threadpool_monitor = ThreadpoolMonitor()
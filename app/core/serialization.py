@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    # Building a TypeAdapter compiles the core schema; do it once per response model.
+    return TypeAdapter(list[model])
+
+
+def encode_models(items: Iterable[Any], model: type[BaseModel]) -> bytes:
+    """Validate ORM objects against `model` and dump them straight to JSON bytes.
+
+    Both steps run in pydantic-core, skipping FastAPI's intermediate `jsonable_encoder`
+    dicts and the stdlib `json.dumps` pass.
+    """
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(items), from_attributes=True))
+
+
+def raw_json_response(content: bytes, *, status_code: int = 200, headers: dict[str, str] | None = None) -> Response:
+    """Return pre-encoded JSON bytes verbatim (e.g. from a cache)."""
+    return Response(content=content, status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def models_response(items: Iterable[Any], model: type[BaseModel], *, status_code: int = 200) -> Response:
+    return raw_json_response(encode_models(items, model), status_code=status_code)
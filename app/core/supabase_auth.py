@@ -46,6 +46,10 @@ class SupabaseJWTVerifier:
             self._jwks_fetched_at = now
             return self._jwks
 
+    async def prefetch_jwks(self) -> None:
+        """Load the signing keys ahead of the first request (called during startup warmup)."""
+        await self._get_jwks()
+
     async def verify(self, token: str) -> SupabasePrincipal:
         if not settings.supabase_url:
             raise RuntimeError("SUPABASE_URL not configured")
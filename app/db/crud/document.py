@@ -1,10 +1,10 @@
 from __future__ import annotations
 from uuid import UUID
 
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
-from app.db.models.loan import LoanDocument
-from app.db.crud.loanee import get_loanee_by_email
+from app.db.models.loan import Loan, LoanDocument, Loanee
 
 
 def create_document(
@@ -42,31 +42,43 @@ def list_documents_for_loanee(db: Session, *, organization_id: UUID, loanee_id:
         db.query(LoanDocument)
         .filter(LoanDocument.organization_id == organization_id)
         .filter(LoanDocument.loanee_id == loanee_id)
-        .order_by(LoanDocument.id.desc())
+        .order_by(LoanDocument.created_at.desc(), LoanDocument.id.desc())
         .all()
     )
     
-def list_documents_for_loan(db: Session, *, organization_id: UUID, loan_id: UUID) -> list[LoanDocument]:
+def list_documents_for_loanee_email(db: Session, *, organization_id: UUID, email: str) -> list[LoanDocument]:
     return (
         db.query(LoanDocument)
+        .join(Loanee, Loanee.id == LoanDocument.loanee_id)
+        .filter(Loanee.organization_id == organization_id)
+        .filter(func.lower(Loanee.email) == email.lower())
         .filter(LoanDocument.organization_id == organization_id)
-        .filter(LoanDocument.loan_id == loan_id)
-        .order_by(LoanDocument.id.desc())
+        .order_by(LoanDocument.created_at.desc(), LoanDocument.id.desc())
         .all()
     )
 
 
-def list_documents_for_loanee_email(db: Session, *, organization_id: UUID, email: str) -> list[LoanDocument]:
-    loanee = get_loanee_by_email(db, organization_id=organization_id, email=email)
-    if not loanee:
-        return []
-    return (
-        db.query(LoanDocument)
-        .filter(LoanDocument.organization_id == organization_id)
-        .filter(LoanDocument.loanee_id == loanee.id)
-        .order_by(LoanDocument.id.desc())
+def list_documents_for_existing_loan(
+    db: Session, *, organization_id: UUID, loan_id: UUID
+) -> list[LoanDocument] | None:
+    """Documents of a loan, or None if the organization has no such loan, in one query.
+
+    Outer-joins documents onto the loan row, so a loan without documents still yields one row.
+    """
+    rows = (
+        db.query(Loan.id, LoanDocument)
+        .outerjoin(
+            LoanDocument,
+            and_(LoanDocument.loan_id == Loan.id, LoanDocument.organization_id == organization_id),
+        )
+        .filter(Loan.organization_id == organization_id)
+        .filter(Loan.id == loan_id)
+        .order_by(LoanDocument.created_at.desc(), LoanDocument.id.desc())
         .all()
     )
+    if not rows:
+        return None
+    return [doc for _, doc in rows if doc is not None]
 
 
 def get_document(db: Session, *, organization_id: UUID, loanee_id: UUID, document_id: UUID) -> LoanDocument | None:
@@ -79,11 +91,24 @@ def get_document(db: Session, *, organization_id: UUID, loanee_id: UUID, documen
     )
 
 
-def get_document_for_loan(db: Session, *, organization_id: UUID, loan_id: UUID, document_id: UUID) -> LoanDocument | None:
-    return (
-        db.query(LoanDocument)
-        .filter(LoanDocument.organization_id == organization_id)
-        .filter(LoanDocument.loan_id == loan_id)
-        .filter(LoanDocument.id == document_id)
+def find_loan_document(
+    db: Session, *, organization_id: UUID, loan_id: UUID, document_id: UUID
+) -> tuple[bool, LoanDocument | None]:
+    """(loan exists, document or None) for a document of a loan, in one query."""
+    row = (
+        db.query(Loan.id, LoanDocument)
+        .outerjoin(
+            LoanDocument,
+            and_(
+                LoanDocument.loan_id == Loan.id,
+                LoanDocument.organization_id == organization_id,
+                LoanDocument.id == document_id,
+            ),
+        )
+        .filter(Loan.organization_id == organization_id)
+        .filter(Loan.id == loan_id)
         .first()
     )
+    if row is None:
+        return False, None
+    return True, row[1]
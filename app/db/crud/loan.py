@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
 from uuid import UUID
 
-from app.db.crud.loanee import create_loanee, get_loanee_by_email
+from app.db.crud.loanee import upsert_loanee
 from app.db.models.loan import Loan, Loanee
 from app.db.models.organization import Organization
 from app.db.schemas.loan import LoanCreate, LoaneeCreate
@@ -15,15 +16,17 @@ from app.db.models.loan import LoanStatus
 
 
 def create_loan(db: Session, loan: LoanCreate, *, total_payable, organization: Organization) -> Loan:
-    payload = LoaneeCreate(
-        full_name=loan.full_name,
-        email=loan.email,
-        phone_number=loan.phone_number,
-        address=loan.address,
+    """Create the loan in one transaction; the borrower is resolved (or created) by one upsert."""
+    loanee = upsert_loanee(
+        db,
+        organization_id=organization.id,
+        payload=LoaneeCreate(
+            full_name=loan.full_name,
+            email=loan.email,
+            phone_number=loan.phone_number,
+            address=loan.address,
+        ),
     )
-    loanee = get_loanee_by_email(db, organization_id=organization.id, email=loan.email)
-    if not loanee:
-        loanee = create_loanee(db, organization=organization, payload=payload)
     db_loan = Loan(
         organization_id=organization.id,
         loanee_id=loanee.id,
@@ -45,7 +48,7 @@ def get_loan(db: Session, loan_id: UUID) -> Loan | None:
     return db.query(Loan).filter(Loan.id == loan_id).first()
 
 
-def list_loans(
+def loans_query(
     db: Session,
     *,
     organization_id: str,
@@ -55,9 +58,8 @@ def list_loans(
     loan_term_weeks: Optional[int] = None,
     loanee_email: Optional[str] = None,
     payment_due: Optional[bool] = None,
-    limit: int = 50,
-    offset: int = 0,
-) -> list[Loan]:
+) -> Query:
+    """Build the filtered (unordered, unpaginated) loan query shared by listings and exports."""
     q = db.query(Loan).filter(Loan.organization_id == organization_id)
     if status is not None:
         q = q.filter(Loan.status == status)
@@ -70,8 +72,39 @@ def list_loans(
     if loan_term_weeks is not None:
         q = q.filter(Loan.loan_term_weeks == loan_term_weeks)
     if loanee_email:
-        q = q.join(Loanee, Loan.loanee_id == Loanee.id).filter(Loanee.email.ilike(loanee_email))
-    return q.order_by(Loan.id.desc()).offset(offset).limit(limit).all()
+        # Same expression and tenant column as uq_loanees_org_email_lower, so the lookup is an index probe.
+        q = (
+            q.join(Loanee, Loan.loanee_id == Loanee.id)
+            .filter(Loanee.organization_id == organization_id)
+            .filter(func.lower(Loanee.email) == loanee_email.lower())
+        )
+    return q
+
+
+def list_loans(
+    db: Session,
+    *,
+    organization_id: str,
+    status: Optional[LoanStatus] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    loan_term_weeks: Optional[int] = None,
+    loanee_email: Optional[str] = None,
+    payment_due: Optional[bool] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[Loan]:
+    q = loans_query(
+        db,
+        organization_id=organization_id,
+        status=status,
+        due_from=due_from,
+        due_to=due_to,
+        loan_term_weeks=loan_term_weeks,
+        loanee_email=loanee_email,
+        payment_due=payment_due,
+    )
+    return q.order_by(Loan.created_at.desc(), Loan.id.desc()).offset(offset).limit(limit).all()
 
 
 def list_loans_for_organization_email(
@@ -87,7 +120,7 @@ def list_loans_for_organization_email(
     return (
         db.query(Loan)
         .filter(Loan.organization_id == org.id)
-        .order_by(Loan.id.desc())
+        .order_by(Loan.created_at.desc(), Loan.id.desc())
         .offset(offset)
         .limit(limit)
         .all()
@@ -104,7 +137,7 @@ def list_loans_for_organization_id(
     return (
         db.query(Loan)
         .filter(Loan.organization_id == organization_id)
-        .order_by(Loan.id.desc())
+        .order_by(Loan.created_at.desc(), Loan.id.desc())
         .offset(offset)
         .limit(limit)
         .all()
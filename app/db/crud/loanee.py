@@ -1,33 +1,100 @@
 from __future__ import annotations
+from decimal import Decimal
 from uuid import UUID
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.db.models.ids import uuid7
 from app.db.models.organization import Organization
-from app.db.models.loan import Loan, Loanee
+from app.db.models.loan import Loan, LoanStatus, Loanee
 from app.db.schemas.loan import LoaneeCreate, LoaneeUpdate
 
 
+# Matches the unique index uq_loanees_org_email_lower.
+_EMAIL_CONFLICT_TARGET = [Loanee.organization_id, func.lower(Loanee.email)]
+_SEARCH_COLUMNS = {"search_vector", "phone_digits"}
+
+
 def _org_id(organization: Organization) -> UUID:
     return organization.id
 
 
+def _loanee_row(organization_id: UUID, payload: LoaneeCreate) -> dict:
+    return {
+        "id": uuid7(),
+        "organization_id": organization_id,
+        "full_name": payload.full_name,
+        "email": payload.email,
+        "phone_number": payload.phone_number,
+        "address": payload.address,
+    }
+
+
+def _email_key(email: str | None) -> str | None:
+    return email.lower() if email is not None else None
+
+
+def _returning_loanees(db: Session, stmt) -> list[Loanee]:
+    # Every column except the deferred search columns, mapped back onto Loanee objects.
+    stmt = stmt.returning(*(c for c in Loanee.__table__.columns if c.name not in _SEARCH_COLUMNS))
+    return list(
+        db.execute(select(Loanee).from_statement(stmt).execution_options(populate_existing=True)).scalars()
+    )
+
+
 def create_loanee(db: Session, *, organization: Organization, payload: LoaneeCreate) -> Loanee | None:
+    """Insert a loanee in one statement; None if the organization already has one with this email."""
     org_id = _org_id(organization)
-    existing_loanee = get_loanee_by_email(db, organization_id=org_id, email=payload.email)
-    if existing_loanee:
-        return None
-    loanee = Loanee(
-        organization_id=org_id,
-        full_name=payload.full_name,
-        email=payload.email,
-        phone_number=payload.phone_number,
-        address=payload.address,
+    stmt = (
+        insert(Loanee)
+        .values(_loanee_row(org_id, payload))
+        .on_conflict_do_nothing(index_elements=_EMAIL_CONFLICT_TARGET)
     )
-    db.add(loanee)
+    created = _returning_loanees(db, stmt)
+    if not created:
+        return None
     db.commit()
-    db.refresh(loanee)
-    return loanee
+    return created[0]
+
+
+def upsert_loanees(db: Session, *, organization_id: UUID, payloads: list[LoaneeCreate]) -> list[Loanee]:
+    """Resolve loanees by email with one INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+    New emails are inserted; for known ones the existing row is returned, with missing phone
+    number or address filled in from the payload. Results follow the order of `payloads`
+    (repeated emails resolve to the same loanee). Safe under concurrency; does not commit.
+    """
+    if not payloads:
+        return []
+    rows: dict[str, dict] = {}
+    keys: list[str] = []
+    for payload in payloads:
+        row = _loanee_row(organization_id, payload)
+        # Without an email there is nothing to match on: every such payload is a new loanee.
+        key = _email_key(payload.email) or str(row["id"])
+        rows.setdefault(key, row)
+        keys.append(key)
+
+    stmt = insert(Loanee).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_EMAIL_CONFLICT_TARGET,
+        set_={
+            "phone_number": func.coalesce(Loanee.phone_number, stmt.excluded.phone_number),
+            "address": func.coalesce(Loanee.address, stmt.excluded.address),
+        },
+    )
+    resolved = {}
+    for loanee in _returning_loanees(db, stmt):
+        resolved[_email_key(loanee.email) or str(loanee.id)] = loanee
+    return [resolved[key] for key in keys]
+
+
+def upsert_loanee(db: Session, *, organization_id: UUID, payload: LoaneeCreate) -> Loanee:
+    return upsert_loanees(db, organization_id=organization_id, payloads=[payload])[0]
 
 
 def list_loanees(db: Session, *, organization_id: UUID, limit: int = 100, offset: int = 0) -> list[Loanee]:
@@ -35,7 +102,7 @@ def list_loanees(db: Session, *, organization_id: UUID, limit: int = 100, offset
     return (
         db.query(Loanee)
         .filter(Loanee.organization_id == org_id)
-        .order_by(Loanee.id.desc())
+        .order_by(Loanee.created_at.desc(), Loanee.id.desc())
         .offset(offset)
         .limit(limit)
         .all()
@@ -56,16 +123,22 @@ def get_loanee_by_email(db: Session, *, organization_id: UUID, email: str) -> Lo
     return (
         db.query(Loanee)
         .filter(Loanee.organization_id == org_id)
-        .filter(Loanee.email == email)
+        .filter(func.lower(Loanee.email) == email.lower())
         .first()
     )
 
-def update_loanee(db: Session, loanee: Loanee, payload: LoaneeUpdate) -> Loanee:
+def update_loanee(db: Session, loanee: Loanee, payload: LoaneeUpdate) -> Loanee | None:
+    """Apply the set fields; None if the new email is already used in the organization."""
     data = payload.dict(exclude_unset=True)
     for key, value in data.items():
         setattr(loanee, key, value)
     db.add(loanee)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # uq_loanees_org_email_lower is the only unique constraint an update can hit.
+        db.rollback()
+        return None
     db.refresh(loanee)
     return loanee
 
@@ -81,26 +154,111 @@ def list_loans_for_loanee(db: Session, *, organization_id: UUID, loanee_id: UUID
         db.query(Loan)
         .filter(Loan.organization_id == org_id)
         .filter(Loan.loanee_id == loanee_id)
-        .order_by(Loan.id.desc())
+        .order_by(Loan.created_at.desc(), Loan.id.desc())
         .all()
     )
 
 
 def list_loans_for_loanee_email(db: Session, *, organization_id: UUID, email: str) -> list[Loan]:
-    loanee = get_loanee_by_email(db, organization_id=organization_id, email=email)
-    if not loanee:
-        return []
-    return list_loans_for_loanee(db, organization_id=organization_id, loanee_id=loanee.id)
-
-
-def list_loanees_with_loans(db: Session, *, organization_id: UUID, limit: int = 100, offset: int = 0) -> list[Loanee]:
-    org_id = organization_id
     return (
-        db.query(Loanee)
-        .options(joinedload(Loanee.loans))
-        .filter(Loanee.organization_id == org_id)
-        .order_by(Loanee.id.desc())
-        .offset(offset)
-        .limit(limit)
+        db.query(Loan)
+        .join(Loanee, Loanee.id == Loan.loanee_id)
+        .filter(Loanee.organization_id == organization_id)
+        .filter(func.lower(Loanee.email) == email.lower())
+        .filter(Loan.organization_id == organization_id)
+        .order_by(Loan.created_at.desc(), Loan.id.desc())
         .all()
     )
+
+
+def _loans_by_loanee(
+    db: Session, *, organization_id: UUID, loanee_ids: list[UUID], per_loanee: int | None
+) -> dict[UUID, list[Loan]]:
+    """Newest-first loans of each loanee in one query; at most `per_loanee` each when given.
+
+    With a cap, a LATERAL subquery reads only the newest `per_loanee` entries of each
+    loanee from ix_loans_loanee_org_created_at_id instead of every loan they ever had.
+    """
+    if not loanee_ids:
+        return {}
+    if per_loanee is None:
+        stmt = (
+            select(Loan)
+            .where(Loan.organization_id == organization_id)
+            .where(Loan.loanee_id.in_(loanee_ids))
+            .order_by(Loan.created_at.desc(), Loan.id.desc())
+        )
+    else:
+        page = select(Loanee.id).where(Loanee.id.in_(loanee_ids)).subquery()
+        newest = (
+            select(Loan)
+            .where(Loan.organization_id == organization_id)
+            .where(Loan.loanee_id == page.c.id)
+            .order_by(Loan.created_at.desc(), Loan.id.desc())
+            .limit(per_loanee)
+            .lateral()
+        )
+        capped = aliased(Loan, newest)
+        stmt = (
+            select(capped)
+            .select_from(page)
+            .join(newest, true())
+            .order_by(capped.created_at.desc(), capped.id.desc())
+        )
+
+    grouped: dict[UUID, list[Loan]] = {}
+    for loan in db.execute(stmt).scalars():
+        grouped.setdefault(loan.loanee_id, []).append(loan)
+    return grouped
+
+
+def list_loanees_with_loans(
+    db: Session,
+    *,
+    organization_id: UUID,
+    limit: int = 100,
+    offset: int = 0,
+    loans_per_loanee: int | None = None,
+) -> list[Loanee]:
+    """A page of loanees with their loans (newest first, optionally capped) in two queries.
+
+    The page is selected on its own so offset/limit count loanees, not loanee x loan rows;
+    the loans are then attached to `Loanee.loans` without marking them as changed.
+    """
+    loanees = list_loanees(db, organization_id=organization_id, limit=limit, offset=offset)
+    loans = _loans_by_loanee(
+        db,
+        organization_id=organization_id,
+        loanee_ids=[loanee.id for loanee in loanees],
+        per_loanee=loans_per_loanee,
+    )
+    for loanee in loanees:
+        set_committed_value(loanee, "loans", loans.get(loanee.id, []))
+    return loanees
+
+
+def list_loanees_with_loan_totals(
+    db: Session, *, organization_id: UUID, limit: int = 100, offset: int = 0
+) -> list[tuple[Loanee, int, int, Decimal]]:
+    """A page of loanees as (loanee, loans_count, open_loans_count, outstanding_amount).
+
+    Outstanding is the total payable of loans not yet paid, as in the portfolio snapshots.
+    The totals are aggregated in Postgres over the page's loanees only.
+    """
+    loanees = list_loanees(db, organization_id=organization_id, limit=limit, offset=offset)
+    if not loanees:
+        return []
+    not_paid = Loan.status != LoanStatus.paid
+    rows = db.execute(
+        select(
+            Loan.loanee_id,
+            func.count(),
+            func.count().filter(not_paid),
+            func.coalesce(func.sum(Loan.total_payable).filter(not_paid), 0),
+        )
+        .where(Loan.organization_id == organization_id)
+        .where(Loan.loanee_id.in_([loanee.id for loanee in loanees]))
+        .group_by(Loan.loanee_id)
+    ).all()
+    totals = {loanee_id: (count, open_count, outstanding) for loanee_id, count, open_count, outstanding in rows}
+    return [(loanee, *totals.get(loanee.id, (0, 0, Decimal("0.00")))) for loanee in loanees]
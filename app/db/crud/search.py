@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+from uuid import UUID
+
+from sqlalchemy import Float, cast, func, or_
+from sqlalchemy.orm import Session
+
+from app.db.models.loan import Loan, Loanee
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Nigerian numbers: +234 803 123 4567 is dialled nationally as 0803 123 4567.
+_COUNTRY_CODE = "234"
+
+
+def _prefix_tsquery(q: str) -> str | None:
+    """Turn free text into a prefix tsquery (`ade:* & bola:*`) so partial words match."""
+    words = _WORD_RE.findall(q.lower())
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+def _national_digits(q: str) -> str:
+    """Digits of a phone query without the country code or trunk prefix.
+
+    Stored numbers may be national (`0803…`) or international (`+234 803…`); both contain
+    the part after the prefix, so that is what a partial number is matched on. Dropping a
+    prefix only widens the match, so short queries keep all their digits.
+    """
+    digits = re.sub(r"\D", "", q)
+    if digits.startswith(_COUNTRY_CODE):
+        national = digits[len(_COUNTRY_CODE):]
+    else:
+        national = digits.removeprefix("0")
+    return national if len(national) >= 3 else digits
+
+
+def _loanee_match(q: str):
+    """Return (predicate, rank) expressions matching `q` against the loanee search indexes.
+
+    Combines the tsvector (full_name, email, phone_number, address) with trigram similarity on
+    `full_name` for typos, and a substring match on the digits of `phone_number` for partial
+    numbers, so separators and the number's format do not matter.
+    """
+    term = q.strip()
+    clauses = [Loanee.full_name.op("%")(term)]
+    rank = func.similarity(Loanee.full_name, term)
+
+    tsquery = _prefix_tsquery(term)
+    if tsquery:
+        ts = func.to_tsquery("simple", tsquery)
+        clauses.append(Loanee.search_vector.op("@@")(ts))
+        rank = func.greatest(rank, func.ts_rank(Loanee.search_vector, ts))
+
+    digits = _national_digits(term)
+    if len(digits) >= 3:
+        clauses.append(Loanee.phone_digits.like(f"%{digits}%"))
+
+    return or_(*clauses), cast(rank, Float)
+
+
+def search_loanees(
+    db: Session,
+    *,
+    organization_id: UUID,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[tuple[Loanee, float]]:
+    predicate, rank = _loanee_match(q)
+    return (
+        db.query(Loanee, rank.label("rank"))
+        .filter(Loanee.organization_id == organization_id)
+        .filter(predicate)
+        .order_by(rank.desc(), Loanee.created_at.desc(), Loanee.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def search_loans(
+    db: Session,
+    *,
+    organization_id: UUID,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[tuple[Loan, float]]:
+    predicate, rank = _loanee_match(q)
+    try:
+        loan_id: UUID | None = UUID(q.strip())
+    except ValueError:
+        loan_id = None
+    if loan_id is not None:
+        predicate = or_(predicate, Loan.id == loan_id)
+    return (
+        db.query(Loan, rank.label("rank"))
+        .join(Loanee, Loan.loanee_id == Loanee.id)
+        .filter(Loan.organization_id == organization_id)
+        .filter(Loanee.organization_id == organization_id)
+        .filter(predicate)
+        .order_by(rank.desc(), Loan.created_at.desc(), Loan.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,87 @@
+"""Per-organization data versions, used to build ETags for conditional GETs.
+
+A version is an opaque token in Redis that changes whenever a transaction that changed the
+organization's rows in a table the ETag routes serve commits (see the session listeners and
+`VERSIONED_TABLES` in app/db/session.py). Writes whose organization is unknown (raw SQL from
+background jobs) change the global version instead, which is part of every organization's
+ETag; statements that matched no rows change nothing.
+
+Tokens are random rather than counters so a version lost with Redis (eviction, restart)
+is never reissued for different data.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Iterable
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_GLOBAL_KEY = "data_version:global"
+# Set for read_your_writes_seconds after a global bump: replicas may still lag behind it.
+_GLOBAL_RECENT_KEY = "data_version:global:recent"
+
+
+def _org_key(organization_id: UUID | str) -> str:
+    return f"data_version:{organization_id}"
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def bump_data_versions(organization_ids: Iterable[UUID | str], *, unscoped: bool = False) -> None:
+    """Give each organization (and, for unscoped writes, everyone) a new data version."""
+    keys = [_org_key(organization_id) for organization_id in organization_ids]
+    if not keys and not unscoped:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, _new_token())
+        if unscoped:
+            pipe.set(_GLOBAL_KEY, _new_token())
+            pipe.setex(_GLOBAL_RECENT_KEY, settings.read_your_writes_seconds, 1)
+        pipe.execute()
+    except Exception:  # noqa: BLE001 - a missed bump only costs a refetch once the key is reset
+        logger.warning("Could not bump data versions", exc_info=True)
+        _forget(keys, unscoped=unscoped)
+
+
+def _forget(keys: list[str], *, unscoped: bool) -> None:
+    # If the new token could not be written, at least make sure the old one is not reused.
+    try:
+        get_redis().delete(*keys, *([_GLOBAL_KEY] if unscoped else []))
+    except Exception:  # noqa: BLE001
+        logger.warning("Could not reset data versions", exc_info=True)
+
+
+def get_data_version(organization_id: UUID | str) -> str | None:
+    """The organization's current version (org and global tokens), or None if unknown.
+
+    Missing tokens are created on read so an empty key never stands for two different states.
+    None means no ETag should be issued: Redis is unavailable, or a recent global write may
+    not have reached the read replicas yet.
+    """
+    org_key = _org_key(organization_id)
+    try:
+        r = get_redis()
+        org_token, global_token, recent = r.mget(org_key, _GLOBAL_KEY, _GLOBAL_RECENT_KEY)
+        if recent and settings.database_replica_urls:
+            return None
+        if org_token is None or global_token is None:
+            pipe = r.pipeline(transaction=False)
+            pipe.set(org_key, _new_token(), nx=True)
+            pipe.set(_GLOBAL_KEY, _new_token(), nx=True)
+            pipe.mget(org_key, _GLOBAL_KEY)
+            org_token, global_token = pipe.execute()[-1]
+    except Exception:  # noqa: BLE001 - serve without an ETag
+        logger.warning("Could not read data version", exc_info=True)
+        return None
+    if org_token is None or global_token is None:
+        return None
+    return f"{org_token.decode()}.{global_token.decode()}"
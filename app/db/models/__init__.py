@@ -2,17 +2,23 @@ from .organization import Organization
 
 from .loan import (
 	AuditLog,
-	# DirectDebitMandate,
+	DirectDebitMandate,
+	InterestMethod,
 	Loan,
 	LoanDocument,
+	LoanInstalment,
 	Loanee,
 	LoanStatus,
 	Payment,
+	RepaymentFrequency,
 )
 
-# from .debit import (
-#     RecurringDebitSchedule,
-#     DebitScheduleItem,
-# )
+from .analytics import PortfolioCohortSnapshot, PortfolioDailySnapshot
+from .webhook import MonoWebhookEvent
+
+from .debit import (
+    RecurringDebitSchedule,
+    DebitScheduleItem,
+)
 
 from .base import Base 
\ No newline at end of file
@@ -0,0 +1,67 @@
+from sqlalchemy import TIMESTAMP, Column, Date, ForeignKey, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.db.models.base import Base
+
+
+class PortfolioDailySnapshot(Base):
+    """Per-organization portfolio aggregates for one day (see app/services/analytics_service.py).
+
+    Flow columns (disbursed, collected, new defaults) cover that day only; stock columns
+    (open, outstanding, ageing buckets) are the state of the book when the row was refreshed.
+    """
+
+    __tablename__ = "portfolio_daily_snapshots"
+
+    organization_id = Column(
+        UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    snapshot_date = Column(Date, primary_key=True)
+
+    loans_count = Column(Integer, nullable=False, default=0)
+    open_loans_count = Column(Integer, nullable=False, default=0)
+    outstanding_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    defaulted_count = Column(Integer, nullable=False, default=0)
+    defaulted_amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    disbursed_count = Column(Integer, nullable=False, default=0)
+    disbursed_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    collected_count = Column(Integer, nullable=False, default=0)
+    collected_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    new_defaults_count = Column(Integer, nullable=False, default=0)
+
+    # Open loans by days past due_date as of snapshot_date.
+    current_count = Column(Integer, nullable=False, default=0)
+    current_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    past_due_1_30_count = Column(Integer, nullable=False, default=0)
+    past_due_1_30_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    past_due_31_60_count = Column(Integer, nullable=False, default=0)
+    past_due_31_60_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    past_due_61_90_count = Column(Integer, nullable=False, default=0)
+    past_due_61_90_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    past_due_90_plus_count = Column(Integer, nullable=False, default=0)
+    past_due_90_plus_amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    refreshed_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+
+class PortfolioCohortSnapshot(Base):
+    """Per-organization outcome of each monthly origination cohort, as of one day."""
+
+    __tablename__ = "portfolio_cohort_snapshots"
+
+    organization_id = Column(
+        UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    snapshot_date = Column(Date, primary_key=True)
+    # First day of the month the loans were created in.
+    cohort_month = Column(Date, primary_key=True)
+
+    loans_count = Column(Integer, nullable=False, default=0)
+    principal_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    paid_count = Column(Integer, nullable=False, default=0)
+    defaulted_count = Column(Integer, nullable=False, default=0)
+    defaulted_amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    refreshed_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
@@ -10,10 +10,14 @@ from sqlalchemy import (
     Enum as SAEnum,
     Index,
     Text,
+    TIMESTAMP,
+    text,
 )
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.db.models.base import Base
+from app.db.models.ids import uuid7
 from app.db.models.mixins import TimestampMixin
 
 
@@ -28,15 +32,19 @@ class ScheduleItemStatus(str):
     paid = "paid"
     failed = "failed"
     canceled = "canceled"
+    # Retries exhausted or a permanent provider error; see the debit_items_dead_letter view.
+    dead = "dead"
 
 
 class RecurringDebitSchedule(Base, TimestampMixin):
     __tablename__ = "recurring_debit_schedules"
 
-    id = Column(Integer, primary_key=True, index=True)
-    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
-    loan_id = Column(Integer, ForeignKey("loans.id", ondelete="CASCADE"), nullable=False, index=True)
-    mandate_id = Column(Integer, ForeignKey("direct_debit_mandates.id", ondelete="RESTRICT"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
+    loan_id = Column(UUID(as_uuid=True), ForeignKey("loans.id", ondelete="CASCADE"), nullable=False, index=True)
+    mandate_id = Column(
+        UUID(as_uuid=True), ForeignKey("direct_debit_mandates.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
 
     schedule_type = Column(String, nullable=False)  # single | multiple
     number_of_debits = Column(Integer, nullable=False, default=1)
@@ -53,16 +61,35 @@ class DebitScheduleItem(Base, TimestampMixin):
 
     __table_args__ = (
         Index("ix_debit_items_due_date_status", "due_date", "status"),
+        # Only items the retry scheduler may pick are indexed.
+        Index(
+            "ix_debit_items_next_attempt_at_eligible",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'failed')"),
+        ),
+        # Claims the reaper may have to release (see `release_stale_claims` in app/tasks/debit.py).
+        Index(
+            "ix_debit_items_claimed_at_processing",
+            "claimed_at",
+            postgresql_where=text("status = 'processing'"),
+        ),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
-    schedule_id = Column(Integer, ForeignKey("recurring_debit_schedules.id", ondelete="CASCADE"), nullable=False, index=True)
-    due_date = Column(Date, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    schedule_id = Column(
+        UUID(as_uuid=True), ForeignKey("recurring_debit_schedules.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    due_date = Column(Date, nullable=False)
     amount = Column(Numeric(12, 2), nullable=False)
     status = Column(String, nullable=False, default=ScheduleItemStatus.pending)
-    idempotency_key = Column(String, nullable=False, unique=True, index=True)
+    idempotency_key = Column(String, nullable=False, unique=True)
     provider_txn_ref = Column(String, nullable=True, index=True)
+    # Attempts with a final outcome; the charge key `<idempotency_key>.<attempts + 1>` only
+    # changes once the current attempt has failed, so re-sending it never charges twice.
     attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    # When a scheduler last moved the item to `processing`.
+    claimed_at = Column(TIMESTAMP(timezone=True), nullable=True)
     last_error = Column(Text, nullable=True)
 
     schedule = relationship("RecurringDebitSchedule", back_populates="items")
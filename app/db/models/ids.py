@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Generate an RFC 9562 UUIDv7: 48-bit Unix ms timestamp, then a counter and random bits.
+
+    Keys generated later sort later, so B-tree inserts append to the right-hand edge of the
+    index instead of landing on random pages. Within one millisecond the 12-bit `rand_a`
+    field is a counter (seeded randomly) so keys from this process stay strictly increasing.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted within this millisecond: borrow the next one.
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return uuid.UUID(int=value)
@@ -1,10 +1,11 @@
 import enum
-import uuid
 from decimal import Decimal
 
 from sqlalchemy import (
+    TIMESTAMP,
     Boolean,
     Column,
+    Computed,
     Date,
     BigInteger,
     Enum,
@@ -14,12 +15,16 @@ from sqlalchemy import (
     Numeric,
     String,
     Text,
+    UniqueConstraint,
+    text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func
 
 from app.db.models.base import Base
+from app.db.models.ids import uuid7
 from app.db.models.mixins import TimestampMixin
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 
 
 class LoanStatus(str, enum.Enum):
@@ -29,25 +34,82 @@ class LoanStatus(str, enum.Enum):
     defaulted = "defaulted"
 
 
+class RepaymentFrequency(str, enum.Enum):
+    weekly = "weekly"
+    monthly = "monthly"
+
+
+class InterestMethod(str, enum.Enum):
+    flat = "flat"
+    reducing_balance = "reducing_balance"
+
+
 class Loanee(Base, TimestampMixin):
     __tablename__ = "loanees"
 
-    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
+    __table_args__ = (
+        # Tenant listings (`list_loanees`, `list_loanees_with_loans`):
+        # WHERE org ORDER BY created_at DESC, id DESC.
+        Index("ix_loanees_org_created_at_id", "organization_id", "created_at", "id"),
+        Index("ix_loanees_org_search_vector", "organization_id", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_loanees_org_full_name_trgm",
+            "organization_id",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_loanees_org_phone_digits_trgm",
+            "organization_id",
+            "phone_digits",
+            postgresql_using="gin",
+            postgresql_ops={"phone_digits": "gin_trgm_ops"},
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
 
     full_name = Column(String, nullable=False)
-    email = Column(String, nullable=True, index=True)
+    email = Column(String, nullable=True)
     phone_number = Column(String, nullable=True)
     address = Column(Text, nullable=True)
+    # Generated by Postgres for full-text search; deferred so normal loads never fetch it.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "to_tsvector('simple'::regconfig, "
+                "coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || "
+                "coalesce(phone_number, '') || ' ' || coalesce(address, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        )
+    )
+    # Digits of phone_number (`0803-123 4567` -> `08031234567`) for partial-number search.
+    phone_digits = deferred(
+        Column(
+            Text,
+            Computed("regexp_replace(coalesce(phone_number, ''), '\\D', '', 'g')", persisted=True),
+            nullable=True,
+        )
+    )
 
     organization = relationship("Organization")
     loans = relationship("Loan", back_populates="loanee", cascade="all, delete-orphan")
     documents = relationship("LoanDocument", back_populates="loanee", cascade="all, delete-orphan")
-    # direct_debit_mandates = relationship(
-    #     "DirectDebitMandate",
-    #     back_populates="loanee",
-    #     cascade="all, delete-orphan",
-    # )
+    direct_debit_mandates = relationship(
+        "DirectDebitMandate",
+        back_populates="loanee",
+        cascade="all, delete-orphan",
+    )
+
+
+# One loanee per email per organization, case-insensitively; the conflict target for
+# `upsert_loanees` (app/db/crud/loanee.py). Declared here because it indexes an expression.
+Index("uq_loanees_org_email_lower", Loanee.organization_id, func.lower(Loanee.email), unique=True)
 
 
 class Loan(Base, TimestampMixin):
@@ -56,18 +118,21 @@ class Loan(Base, TimestampMixin):
     __table_args__ = (
         Index("ix_loans_due_date_status", "due_date", "status"),
         Index("ix_loans_org_due_date_status", "organization_id", "due_date", "status"),
+        Index("ix_loans_org_created_at_id", "organization_id", "created_at", "id"),
+        # Leads with loanee_id so it also serves the FK check when a loanee is deleted.
+        Index("ix_loans_loanee_org_created_at_id", "loanee_id", "organization_id", "created_at", "id"),
     )
 
-    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
-    loanee_id = Column(UUID(as_uuid=True), ForeignKey("loanees.id", ondelete="RESTRICT"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
+    loanee_id = Column(UUID(as_uuid=True), ForeignKey("loanees.id", ondelete="RESTRICT"), nullable=False)
 
     amount = Column(Numeric(12, 2), nullable=False)
     loan_term_weeks = Column(Integer, nullable=False)
     surcharge = Column(Numeric(12, 2), nullable=False, default=Decimal("0.00"))
     penalty = Column(Numeric(12, 2), nullable=False, default=Decimal("0.00"))
 
-    due_date = Column(Date, nullable=False, index=True)
+    due_date = Column(Date, nullable=False)
     status = Column(Enum(LoanStatus, name="loan_status"), nullable=False, default=LoanStatus.not_due)
     auto_debit_enabled = Column(Boolean, nullable=False, default=False)
 
@@ -81,15 +146,53 @@ class Loan(Base, TimestampMixin):
     documents = relationship("LoanDocument", back_populates="loan", cascade="all, delete-orphan")
     payments = relationship("Payment", back_populates="loan", cascade="all, delete-orphan")
     audit_logs = relationship("AuditLog", back_populates="loan", cascade="all, delete-orphan")
+    instalments = relationship(
+        "LoanInstalment",
+        back_populates="loan",
+        cascade="all, delete-orphan",
+        order_by="LoanInstalment.sequence",
+    )
+
+
+class LoanInstalment(Base, TimestampMixin):
+    """One row of a loan's repayment schedule (see app/services/schedule_service.py)."""
+
+    __tablename__ = "loan_instalments"
+
+    __table_args__ = (
+        UniqueConstraint("loan_id", "sequence", name="uq_loan_instalments_loan_sequence"),
+        Index("ix_loan_instalments_org_due_date", "organization_id", "due_date"),
+    )
+
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
+    loan_id = Column(UUID(as_uuid=True), ForeignKey("loans.id", ondelete="CASCADE"), nullable=False)
+
+    sequence = Column(Integer, nullable=False)
+    due_date = Column(Date, nullable=False)
+    principal = Column(Numeric(12, 2), nullable=False)
+    interest = Column(Numeric(12, 2), nullable=False)
+    # Share of the loan's surcharge/penalty (total_payable - amount) collected with this instalment.
+    fees = Column(Numeric(12, 2), nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    balance_after = Column(Numeric(12, 2), nullable=False)
+
+    loan = relationship("Loan", back_populates="instalments")
 
 
 class LoanDocument(Base, TimestampMixin):
     __tablename__ = "loan_documents"
 
-    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
-    loanee_id = Column(UUID(as_uuid=True), ForeignKey("loanees.id", ondelete="CASCADE"), nullable=False, index=True)
-    loan_id = Column(UUID(as_uuid=True), ForeignKey("loans.id", ondelete="SET NULL"), nullable=True, index=True)
+    __table_args__ = (
+        # Lead with the FK column so the same index serves the ON DELETE actions from loanees/loans.
+        Index("ix_loan_documents_loanee_org_created_at_id", "loanee_id", "organization_id", "created_at", "id"),
+        Index("ix_loan_documents_loan_org_created_at_id", "loan_id", "organization_id", "created_at", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
+    loanee_id = Column(UUID(as_uuid=True), ForeignKey("loanees.id", ondelete="CASCADE"), nullable=False)
+    loan_id = Column(UUID(as_uuid=True), ForeignKey("loans.id", ondelete="SET NULL"), nullable=True)
 
     document_type = Column(String, nullable=False)
     # Storage object key/path (not a permanent public URL)
@@ -105,10 +208,19 @@ class LoanDocument(Base, TimestampMixin):
 
 
 class Payment(Base, TimestampMixin):
+    """Append-only; range-partitioned by month on `created_at` (see app/db/partitions.py)."""
+
     __tablename__ = "payments"
 
-    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
+    __table_args__ = (
+        Index("ix_payments_org_created_at", "organization_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    # Part of the primary key because Postgres requires the partition key in unique constraints.
+    created_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False, server_default=func.now())
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
     loan_id = Column(UUID(as_uuid=True), ForeignKey("loans.id", ondelete="CASCADE"), nullable=False, index=True)
 
     amount = Column(Numeric(12, 2), nullable=False)
@@ -119,26 +231,39 @@ class Payment(Base, TimestampMixin):
     organization = relationship("Organization")
 
 
-# class DirectDebitMandate(Base, TimestampMixin):
-#     __tablename__ = "direct_debit_mandates"
+class DirectDebitMandate(Base, TimestampMixin):
+    __tablename__ = "direct_debit_mandates"
 
-#     id = Column(Integer, primary_key=True, index=True)
-#     organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
-#     loanee_id = Column(Integer, ForeignKey("loanees.id", ondelete="CASCADE"), nullable=False, index=True)
+    __table_args__ = (
+        # Leads with the FK column so it also serves the ON DELETE CASCADE from loanees.
+        Index("ix_direct_debit_mandates_loanee_org", "loanee_id", "organization_id"),
+    )
 
-#     provider = Column(String, nullable=False)
-#     mandate_reference = Column(String, nullable=False, unique=True, index=True)
-#     active = Column(Boolean, nullable=False, default=True)
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
+    loanee_id = Column(UUID(as_uuid=True), ForeignKey("loanees.id", ondelete="CASCADE"), nullable=False)
 
-#     # loanee = relationship("Loanee", back_populates="direct_debit_mandates")
-#     organization = relationship("Organization")
+    provider = Column(String, nullable=False)
+    mandate_reference = Column(String, nullable=False, unique=True)
+    active = Column(Boolean, nullable=False, default=True)
+
+    loanee = relationship("Loanee", back_populates="direct_debit_mandates")
+    organization = relationship("Organization")
 
 
 class AuditLog(Base, TimestampMixin):
+    """Append-only; range-partitioned by month on `created_at` (see app/db/partitions.py)."""
+
     __tablename__ = "audit_logs"
 
-    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False, index=True)
+    __table_args__ = (
+        Index("ix_audit_logs_org_created_at", "organization_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
+    created_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False, server_default=func.now())
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="RESTRICT"), nullable=False)
     loan_id = Column(UUID(as_uuid=True), ForeignKey("loans.id", ondelete="CASCADE"), nullable=True, index=True)
 
     action = Column(String, nullable=False)
@@ -1,16 +1,16 @@
-import uuid
 
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.models.base import Base
+from app.db.models.ids import uuid7
 from app.db.models.mixins import TimestampMixin
 
 
 class Organization(Base, TimestampMixin):
     __tablename__ = "organizations"
 
-    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid7, server_default=text("uuid_generate_v7()"), primary_key=True)
     name = Column(String, nullable=False)
     slug = Column(String, nullable=False, unique=True, index=True)
     email = Column(String, nullable=False, unique=True, index=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import TIMESTAMP, Column, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.db.models.base import Base
+
+
+class MonoWebhookEvent(Base):
+    """Every Mono webhook event applied so far; the primary key deduplicates redeliveries."""
+
+    __tablename__ = "mono_webhook_events"
+
+    event_id = Column(String, primary_key=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
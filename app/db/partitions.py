@@ -0,0 +1,204 @@
+"""Monthly range partitions for the append-only `payments` and `audit_logs` tables.
+
+Partitions are named `<table>_pYYYY_MM` and cover [first of month, first of next month).
+`ensure_partitions` keeps a few months of partitions ahead of time so inserts never land in
+the DEFAULT partition (rows that did are moved into their month's partition when it is
+created); `archive_partition` detaches an old month, writes it to a gzipped CSV
+and drops it, so insert and vacuum cost stay flat as history grows.
+
+Usage:
+    python -m app.db.partitions ensure
+    python -m app.db.partitions list payments
+    python -m app.db.partitions detach payments 2025-01
+    python -m app.db.partitions archive payments --before 2025-01 --dir /backups/archive
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.session import engine
+
+
+PARTITIONED_TABLES = ("payments", "audit_logs")
+MONTHS_AHEAD = 3
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_RE = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _check_table(table: str) -> None:
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not a partitioned table")
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def list_partitions(conn: Connection, table: str) -> list[tuple[str, date]]:
+    """Return (partition name, month) for every monthly partition attached to `table`."""
+    _check_table(table)
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    ).scalars()
+    partitions = []
+    for name in rows:
+        m = _PARTITION_RE.match(name)
+        if m and m.group("table") == table:
+            partitions.append((name, date(int(m.group("year")), int(m.group("month")), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _create_partition(conn: Connection, table: str, month: date) -> str:
+    """Create the month's partition, moving any of its rows out of DEFAULT first.
+
+    Postgres refuses CREATE ... PARTITION OF while DEFAULT holds rows in the new range, so
+    such rows (e.g. a created_at set months ahead) would block the month from then on. The
+    partition is built as a plain table, the rows are moved into it and it is attached, all
+    in the caller's transaction.
+    """
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    range_sql = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    stray = conn.execute(
+        text(f'SELECT count(*) FROM "{default}" WHERE created_at >= :start AND created_at < :end'),
+        bounds,
+    ).scalar()
+    if not stray:
+        conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" {range_sql}'))
+        return name
+
+    logger.warning("Moving %d rows of %s out of %s into %s", stray, month.isoformat(), default, name)
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conn.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE created_at >= :start AND created_at < :end RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        bounds,
+    )
+    conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {range_sql}'))
+    return name
+
+
+def ensure_partitions(conn: Connection, table: str, *, months_ahead: int = MONTHS_AHEAD) -> list[str]:
+    """Create missing monthly partitions from the current month up to `months_ahead` months out.
+
+    Logs an error if rows are left in DEFAULT afterwards: they fall outside every month this
+    run covers, so the month they belong to needs a partition created by hand.
+    """
+    _check_table(table)
+    current = date.today().replace(day=1)
+    created = []
+    for n in range(months_ahead + 1):
+        month = _add_months(current, n)
+        name = partition_name(table, month)
+        exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists:
+            continue
+        created.append(_create_partition(conn, table, month))
+
+    default = default_partition_name(table)
+    leftover = conn.execute(text(f'SELECT count(*) FROM "{default}"')).scalar()
+    if leftover:
+        logger.error("%s holds %d rows outside the monthly partitions", default, leftover)
+    return created
+
+
+def detach_partition(conn: Connection, table: str, month: date) -> str:
+    """Detach a month from `table`; the data stays queryable as a standalone table."""
+    _check_table(table)
+    name = partition_name(table, month)
+    conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    return name
+
+
+def archive_partition(conn: Connection, table: str, month: date, directory: str) -> str:
+    """Detach a month, dump it to `<directory>/<partition>.csv.gz` and drop it. Returns the file path."""
+    name = detach_partition(conn, table, month)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.csv.gz")
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(path, "wb") as fh:
+            cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER true)', fh)
+    finally:
+        cursor.close()
+    conn.execute(text(f'DROP TABLE "{name}"'))
+    return path
+
+
+def _parse_month(value: str) -> date:
+    year, month = value.split("-")
+    return date(int(year), int(month), 1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.db.partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ensure = sub.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+
+    lst = sub.add_parser("list", help="list attached monthly partitions")
+    lst.add_argument("table", choices=PARTITIONED_TABLES)
+
+    detach = sub.add_parser("detach", help="detach one month (YYYY-MM)")
+    detach.add_argument("table", choices=PARTITIONED_TABLES)
+    detach.add_argument("month", type=_parse_month)
+
+    archive = sub.add_parser("archive", help="archive and drop every month before YYYY-MM")
+    archive.add_argument("table", choices=PARTITIONED_TABLES)
+    archive.add_argument("--before", type=_parse_month, required=True)
+    archive.add_argument("--dir", required=True)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ensure":
+        with engine.begin() as conn:
+            for table in PARTITIONED_TABLES:
+                for name in ensure_partitions(conn, table, months_ahead=args.months_ahead):
+                    print(f"created {name}")
+    elif args.command == "list":
+        with engine.connect() as conn:
+            for name, month in list_partitions(conn, args.table):
+                print(f"{name}\t{month:%Y-%m}")
+    elif args.command == "detach":
+        with engine.begin() as conn:
+            print(f"detached {detach_partition(conn, args.table, args.month)}")
+    elif args.command == "archive":
+        with engine.connect() as conn:
+            months = [m for _, m in list_partitions(conn, args.table) if m < args.before]
+        # One transaction per month so a failure never leaves more than one partition half-done.
+        for month in months:
+            with engine.begin() as conn:
+                print(f"archived {archive_partition(conn, args.table, month, args.dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class DailyPortfolioPoint(BaseModel):
+    snapshot_date: date
+    loans_count: int
+    open_loans_count: int
+    outstanding_amount: Decimal
+    defaulted_count: int
+    defaulted_amount: Decimal
+    disbursed_count: int
+    disbursed_amount: Decimal
+    collected_count: int
+    collected_amount: Decimal
+    new_defaults_count: int
+    refreshed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CollectionsPoint(BaseModel):
+    snapshot_date: date
+    collected_count: int
+    collected_amount: Decimal
+    disbursed_count: int
+    disbursed_amount: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class AgeingBucket(BaseModel):
+    bucket: str
+    count: int
+    amount: Decimal
+
+
+class AgeingResponse(BaseModel):
+    snapshot_date: date
+    refreshed_at: datetime
+    buckets: list[AgeingBucket]
+
+
+class CohortPoint(BaseModel):
+    cohort_month: date
+    loans_count: int
+    principal_amount: Decimal
+    paid_count: int
+    defaulted_count: int
+    defaulted_amount: Decimal
+    default_rate: float
+
+
+class CohortResponse(BaseModel):
+    snapshot_date: date | None = None
+    cohorts: list[CohortPoint] = []
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import enum
+from datetime import date
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.db.models.loan import LoanStatus
+
+
+class ExportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class ExportDataset(str, enum.Enum):
+    loans = "loans"
+    loanees = "loanees"
+    payments = "payments"
+
+
+class LoanExportFilters(BaseModel):
+    """Same filters as `GET /loans/`, without pagination."""
+
+    status: LoanStatus | None = None
+    due_from: date | None = None
+    due_to: date | None = None
+    loan_term_weeks: int | None = None
+    loanee_email: str | None = None
+    payment_due: bool | None = None
+
+
+class LoaneeExportFilters(BaseModel):
+    email: str | None = None
+
+
+class PaymentExportFilters(BaseModel):
+    loan_id: UUID | None = None
+    created_from: date | None = None
+    created_to: date | None = None
+
+
+class ExportJobRequest(BaseModel):
+    dataset: ExportDataset
+    format: ExportFormat = ExportFormat.csv
+    filters: dict[str, Any] = {}
+
+
+class ExportJobResponse(BaseModel):
+    job_id: str
+    status: str
+    dataset: ExportDataset
+    format: ExportFormat
+    rows: int | None = None
+    download_url: str | None = None
+    error: str | None = None
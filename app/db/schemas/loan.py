@@ -4,7 +4,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.db.models.loan import LoanStatus
 
@@ -16,6 +16,10 @@ class LoaneeCreate(BaseModel):
     address: str | None = None
 
 
+class LoaneeBulkUpsertRequest(BaseModel):
+    loanees: list[LoaneeCreate] = Field(min_length=1, max_length=1000)
+
+
 class LoaneeResponse(BaseModel):
     id: UUID
     full_name: str
@@ -86,6 +90,13 @@ class LoaneeWithLoansResponse(LoaneeResponse):
     loans: list[LoanSummaryResponse] = []
 
 
+class LoaneeWithLoanTotalsResponse(LoaneeResponse):
+    loans_count: int
+    open_loans_count: int
+    # Total payable of loans not yet paid.
+    outstanding_amount: Decimal
+
+
 class LoanDocumentResponse(BaseModel):
     id: UUID
     loanee_id: UUID
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import enum
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class MatchStatus(str, enum.Enum):
+    matched = "matched"
+    amount_mismatch = "amount_mismatch"
+    ambiguous = "ambiguous"
+    duplicate = "duplicate"
+    unmatched = "unmatched"
+    invalid = "invalid"
+
+
+class StatementLineResult(BaseModel):
+    line_number: int
+    reference: str | None = None
+    amount: Decimal | None = None
+    name: str | None = None
+    email: str | None = None
+    status: MatchStatus
+    matched_by: str | None = None
+    loan_id: UUID | None = None
+    loanee_id: UUID | None = None
+    reason: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class ReconciliationReport(BaseModel):
+    total_lines: int
+    matched: int
+    unmatched: int
+    posted: int = 0
+    results: list[StatementLineResult] = []
+
+    class Config:
+        from_attributes = True
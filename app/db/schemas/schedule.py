@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.db.models.loan import InterestMethod, RepaymentFrequency
+
+
+class ScheduleOptions(BaseModel):
+    frequency: RepaymentFrequency = RepaymentFrequency.weekly
+    interest_method: InterestMethod = InterestMethod.flat
+    # Annual interest rate as a fraction, e.g. 0.24 for 24% p.a.
+    annual_rate: Decimal = Field(default=Decimal("0"), ge=0)
+    # Defaults to the loan term expressed in the chosen frequency.
+    instalments: int | None = Field(default=None, ge=1, le=520)
+
+
+class ScheduleQuoteRequest(ScheduleOptions):
+    amount: Decimal = Field(gt=0)
+    fees: Decimal = Field(default=Decimal("0"), ge=0)
+    instalments: int = Field(ge=1, le=520)
+    start_date: date | None = None
+
+
+class BulkScheduleRequest(ScheduleOptions):
+    loan_ids: list[UUID] = Field(min_length=1, max_length=10000)
+
+
+class InstalmentResponse(BaseModel):
+    sequence: int
+    due_date: date
+    principal: Decimal
+    interest: Decimal
+    fees: Decimal
+    amount: Decimal
+    balance_after: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleResponse(BaseModel):
+    loan_id: UUID | None = None
+    total_principal: Decimal
+    total_interest: Decimal
+    total_fees: Decimal
+    total_amount: Decimal
+    instalments: list[InstalmentResponse]
+
+
+class BulkScheduleResponse(BaseModel):
+    loans: int
+    instalments: int
+    missing_loan_ids: list[UUID] = []
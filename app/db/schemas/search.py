@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+from app.db.schemas.loan import LoanResponse, LoaneeResponse
+
+
+class LoaneeSearchHit(BaseModel):
+    rank: float
+    loanee: LoaneeResponse
+
+
+class LoanSearchHit(BaseModel):
+    rank: float
+    loan: LoanResponse
+
+
+class SearchResponse(BaseModel):
+    query: str
+    loanees: list[LoaneeSearchHit] = []
+    loans: list[LoanSearchHit] = []
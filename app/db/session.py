@@ -1,7 +1,24 @@
-from sqlalchemy import create_engine
+from __future__ import annotations
+
+import itertools
+import logging
+import re
+import threading
+import time
+from uuid import UUID
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.data_version import bump_data_versions
+from app.db.models.organization import Organization
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = URL.create(
     "postgresql+psycopg2",
@@ -12,5 +29,171 @@ DATABASE_URL = URL.create(
     database=settings.database_name
 )
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout_seconds,
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+class ReplicaRouter:
+    """Round-robin over replica engines, skipping replicas that recently failed to connect."""
+
+    def __init__(self, engines: list[Engine], *, retry_seconds: int):
+        self._engines = engines
+        self._retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._engines)
+
+    def candidates(self) -> list[Engine]:
+        if not self._engines:
+            return []
+        start = next(self._counter) % len(self._engines)
+        now = time.monotonic()
+        ordered = self._engines[start:] + self._engines[:start]
+        return [e for e in ordered if self._down_until.get(id(e), 0.0) <= now]
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[id(replica)] = time.monotonic() + self._retry_seconds
+
+
+replica_router = ReplicaRouter(
+    [
+        create_engine(
+            url.strip(),
+            pool_pre_ping=True,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout_seconds,
+        )
+        for url in (settings.database_replica_urls or "").split(",")
+        if url.strip()
+    ],
+    retry_seconds=settings.replica_retry_seconds,
+)
+
+
+# Read-your-writes: after an organization commits on the primary, its reads stay on the
+# primary for `read_your_writes_seconds` so replica lag never hides its own writes.
+
+def _pin_key(organization_id: UUID | str) -> str:
+    return f"rw_pin:{organization_id}"
+
+
+def pin_to_primary(organization_id: UUID | str) -> None:
+    if not replica_router:
+        return
+    try:
+        get_redis().setex(_pin_key(organization_id), settings.read_your_writes_seconds, 1)
+    except Exception:  # noqa: BLE001 - pinning is best effort
+        logger.warning("Could not record read-your-writes pin", exc_info=True)
+
+
+def is_pinned_to_primary(organization_id: UUID | str) -> bool:
+    try:
+        return bool(get_redis().exists(_pin_key(organization_id)))
+    except Exception:  # noqa: BLE001 - if Redis is down, prefer consistency
+        return True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_after_commit(session: Session) -> None:
+    organization_id = session.info.get("organization_id")
+    if organization_id is not None:
+        pin_to_primary(organization_id)
+
+
+# Data versions (app/db/data_version.py): record which organizations a transaction wrote to
+# and give them new versions once it commits, invalidating their ETags.
+
+_CHANGED_KEY = "changed_organization_ids"
+_UNSCOPED_KEY = "unscoped_write"
+# Tables the conditional-GET routes (`not_modified_since_last_change`) serve from. Writes to
+# any other table (debit items, webhook events, payments, snapshots) leave their ETags valid.
+VERSIONED_TABLES = frozenset({"organizations", "loanees", "loans"})
+_DML_TARGET_RE = re.compile(r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(?:ONLY\s+)?([\w.\"]+)", re.IGNORECASE)
+
+
+def _record_write(session: Session, organization_id: UUID | None) -> None:
+    if organization_id is None:
+        session.info[_UNSCOPED_KEY] = True
+    else:
+        session.info.setdefault(_CHANGED_KEY, set()).add(organization_id)
+
+
+def _written_tables(statement) -> set[str]:
+    """Names of the tables a DML statement writes to; empty for anything else."""
+    # `select(Model).from_statement(insert(...))` wraps the DML in `.element`.
+    inner = getattr(statement, "element", statement)
+    if isinstance(inner, TextClause):
+        return {name.strip('"').rsplit(".", 1)[-1].lower() for name in _DML_TARGET_RE.findall(inner.text)}
+    if getattr(inner, "is_dml", False):
+        return {getattr(inner.table, "name", None)}
+    return set()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flushed_organizations(session: Session, flush_context) -> None:
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__tablename__", None) not in VERSIONED_TABLES:
+            continue
+        organization_id = obj.id if isinstance(obj, Organization) else getattr(obj, "organization_id", None)
+        if organization_id is not None:
+            _record_write(session, organization_id)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_statement_writes(state: ORMExecuteState):
+    if not _written_tables(state.statement) & VERSIONED_TABLES:
+        return None
+    result = state.invoke_statement()
+    # ORM results of `from_statement(...RETURNING)` carry no rowcount; count those as writes.
+    if getattr(result, "rowcount", None) != 0:
+        # Core DML does not say which organizations it touched; fall back to the request's.
+        _record_write(state.session, state.session.info.get("organization_id"))
+    return result
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_data_versions_after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, set())
+    unscoped = session.info.pop(_UNSCOPED_KEY, False)
+    if not changed and not unscoped:
+        return
+    bump_data_versions(changed, unscoped=unscoped)
+    # Writes made outside a request (tasks) are not pinned by `_pin_after_commit`.
+    for organization_id in changed - {session.info.get("organization_id")}:
+        pin_to_primary(organization_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_writes_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+    session.info.pop(_UNSCOPED_KEY, None)
+
+
+def open_read_session(organization_id: UUID | str | None = None) -> Session:
+    """Open a session on a healthy replica, falling back to the primary.
+
+    Falls back when no replicas are configured, the organization is pinned after a recent
+    write, or every replica fails its connection check.
+    """
+    if replica_router and not (organization_id is not None and is_pinned_to_primary(organization_id)):
+        for replica in replica_router.candidates():
+            db = ReadSessionLocal(bind=replica)
+            try:
+                db.connection()
+                return db
+            except OperationalError:
+                logger.warning("Read replica unavailable, trying next", exc_info=True)
+                db.close()
+                replica_router.mark_down(replica)
+    return SessionLocal()
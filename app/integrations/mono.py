@@ -1,12 +1,60 @@
 from __future__ import annotations
 
+import asyncio
+import hmac
 import httpx
+import time
 import uuid
+from app.core import rate_limit
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, ConcurrencyLimiter
 from app.core.config import settings
 
 
+WEBHOOK_SECRET_HEADER = "mono-webhook-secret"
+
+
+# Statuses worth retrying; any other 4xx is treated as permanent.
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429}
+
+
 class MonoError(RuntimeError):
-    pass
+    def __init__(self, message: str, *, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """Network errors, timeouts, throttling and 5xx are transient; other 4xx are not."""
+        if self.status_code is None:
+            return True
+        return self.status_code >= 500 or self.status_code in RETRYABLE_STATUS_CODES
+
+
+class MonoUnavailableError(MonoError):
+    """Call not attempted: the circuit is open or no capacity was free. Always retryable."""
+
+
+breaker = CircuitBreaker(
+    "mono",
+    failure_rate=settings.mono_breaker_failure_rate,
+    min_calls=settings.mono_breaker_min_calls,
+    window_seconds=settings.mono_breaker_window_seconds,
+    cooldown_seconds=settings.mono_breaker_cooldown_seconds,
+)
+concurrency = ConcurrencyLimiter(
+    "mono",
+    limit=settings.mono_max_concurrency,
+    lease_seconds=int(settings.mono_timeout_seconds) + 5,
+    max_wait_seconds=settings.mono_max_wait_seconds,
+)
+
+
+def verify_webhook_secret(received: str | None) -> bool:
+    """Constant-time check of the secret Mono sends with every webhook delivery."""
+    expected = settings.mono_webhook_secret
+    if not expected or not received:
+        return False
+    return hmac.compare_digest(received.encode(), expected.encode())
 
 
 def _require_config() -> tuple[str, str]:
@@ -15,6 +63,48 @@ def _require_config() -> tuple[str, str]:
     return settings.mono_base_url.rstrip("/"), settings.mono_secret_key
 
 
+async def _wait_for_rate_limit() -> None:
+    """Block until the shared request budget allows another call, up to `mono_max_wait_seconds`."""
+    deadline = time.monotonic() + settings.mono_max_wait_seconds
+    while True:
+        result = rate_limit.hit(
+            "provider:mono",
+            capacity=max(1, int(settings.mono_requests_per_second)),
+            refill_per_second=settings.mono_requests_per_second,
+        )
+        if result is None or result.allowed:
+            return
+        if time.monotonic() + result.retry_after > deadline:
+            raise MonoUnavailableError("Mono request rate limit reached")
+        await asyncio.sleep(result.retry_after)
+
+
+async def _post(url: str, *, headers: dict, payload: dict) -> httpx.Response:
+    """POST to Mono behind the shared circuit breaker, rate limit and concurrency cap.
+
+    Transport errors and 5xx count as failures towards tripping the breaker; 4xx do not,
+    since they describe the request rather than Mono's health.
+    """
+    try:
+        probe = breaker.before_call()
+    except CircuitOpenError as exc:
+        raise MonoUnavailableError(str(exc)) from exc
+    try:
+        await _wait_for_rate_limit()
+        async with concurrency.slot():
+            async with httpx.AsyncClient(timeout=settings.mono_timeout_seconds) as client:
+                resp = await client.post(url, headers=headers, json=payload)
+    except TimeoutError as exc:
+        raise MonoUnavailableError(str(exc)) from exc
+    except httpx.TransportError as exc:
+        breaker.record(failed=True, probe=probe)
+        raise MonoError(f"Mono request failed: {exc}") from exc
+    breaker.record(failed=resp.status_code >= 500, probe=probe)
+    if resp.status_code >= 400:
+        raise MonoError(resp.text, status_code=resp.status_code)
+    return resp
+
+
 async def create_mandate_link(*, customer_email: str, customer_name: str) -> str:
     base, secret = _require_config()
     url = f"{base}/dd/mandates/link"
@@ -25,10 +115,7 @@ async def create_mandate_link(*, customer_email: str, customer_name: str) -> str
             "name": customer_name,
         }
     }
-    async with httpx.AsyncClient(timeout=20) as client:
-        resp = await client.post(url, headers=headers, json=payload)
-    if resp.status_code >= 400:
-        raise MonoError(resp.text)
+    resp = await _post(url, headers=headers, payload=payload)
     data = resp.json()
     link = data.get("link") or data.get("url")
     if not link:
@@ -39,14 +126,13 @@ async def create_mandate_link(*, customer_email: str, customer_name: str) -> str
 async def charge_mandate(*, mandate_reference: str, amount_minor: int, idempotency_key: str | None = None) -> dict:
     base, secret = _require_config()
     url = f"{base}/dd/mandates/{mandate_reference}/charge"
+    idempotency_key = idempotency_key or str(uuid.uuid4())
     headers = {
         "Authorization": f"Bearer {secret}",
         "Content-Type": "application/json",
-        "Idempotency-Key": idempotency_key or str(uuid.uuid4()),
+        "Idempotency-Key": idempotency_key,
     }
-    payload = {"amount": amount_minor}
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(url, headers=headers, json=payload)
-    if resp.status_code >= 400:
-        raise MonoError(resp.text)
+    # The reference comes back on settlement webhooks and identifies the schedule item.
+    payload = {"amount": amount_minor, "reference": idempotency_key}
+    resp = await _post(url, headers=headers, payload=payload)
     return resp.json()
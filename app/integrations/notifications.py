@@ -0,0 +1,134 @@
+"""Pluggable email and SMS delivery backends.
+
+Backends are picked by name from settings (`notification_email_backend`,
+`notification_sms_backend`). Each one sends a whole batch and reports, per message,
+whether it went out, so callers can release deduplication keys for the ones that did not.
+
+- "file": appends messages as JSON lines under `notification_file_dir` (local development).
+- "smtp": sends over one SMTP connection per batch. Point it at a debugging server
+  (`python -m aiosmtpd -n -l localhost:1025`) to inspect mail locally.
+- "http": posts SMS to a provider's JSON API (`sms_api_url`, `sms_api_key`, `sms_sender_id`).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import smtplib
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from functools import lru_cache
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutboundMessage:
+    channel: str  # "email" or "sms"
+    to: str
+    body: str
+    subject: str | None = None
+    # Caller's identifier for the message (e.g. the loan id), echoed in logs and files.
+    reference: str | None = None
+
+
+class NotificationError(RuntimeError):
+    pass
+
+
+class NotificationBackend(ABC):
+    channel: str
+
+    @abstractmethod
+    def send_batch(self, messages: list[OutboundMessage]) -> list[bool]:
+        """Send every message; return one success flag per message, in order."""
+
+
+class FileBackend(NotificationBackend):
+    _lock = threading.Lock()
+
+    def __init__(self, channel: str, directory: str):
+        self.channel = channel
+        self.path = os.path.join(directory, f"{channel}.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+    def send_batch(self, messages: list[OutboundMessage]) -> list[bool]:
+        sent_at = datetime.now(timezone.utc).isoformat()
+        lines = "".join(json.dumps({**asdict(m), "sent_at": sent_at}) + "\n" for m in messages)
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+        return [True] * len(messages)
+
+
+class SmtpBackend(NotificationBackend):
+    channel = "email"
+
+    # The server turned down this message; the connection is still usable for the next one.
+    _MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+    def send_batch(self, messages: list[OutboundMessage]) -> list[bool]:
+        results: list[bool] = []
+        try:
+            with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout_seconds) as smtp:
+                if settings.smtp_use_tls:
+                    smtp.starttls()
+                if settings.smtp_username:
+                    smtp.login(settings.smtp_username, settings.smtp_password or "")
+                for message in messages:
+                    email = EmailMessage()
+                    email["From"] = settings.notification_email_from
+                    email["To"] = message.to
+                    email["Subject"] = message.subject or ""
+                    email.set_content(message.body)
+                    try:
+                        smtp.send_message(email)
+                        results.append(True)
+                    except self._MESSAGE_ERRORS as exc:
+                        logger.warning("Email %s to %s refused: %s", message.reference, message.to, exc)
+                        results.append(False)
+        except (smtplib.SMTPException, OSError) as exc:
+            # Connection lost or refused: messages already sent stay sent, the rest are reported unsent.
+            logger.warning("SMTP connection failed after %d of %d emails: %s", len(results), len(messages), exc)
+        return results + [False] * (len(messages) - len(results))
+
+
+class HttpSmsBackend(NotificationBackend):
+    channel = "sms"
+
+    def send_batch(self, messages: list[OutboundMessage]) -> list[bool]:
+        if not settings.sms_api_url or not settings.sms_api_key:
+            raise NotificationError("SMS provider is not configured")
+        results = []
+        headers = {"Authorization": f"Bearer {settings.sms_api_key}"}
+        with httpx.Client(timeout=settings.sms_timeout_seconds, headers=headers) as client:
+            for message in messages:
+                payload = {"to": message.to, "from": settings.sms_sender_id, "sms": message.body}
+                try:
+                    resp = client.post(settings.sms_api_url, json=payload)
+                    ok = resp.status_code < 400
+                    if not ok:
+                        logger.warning("SMS %s rejected (%s): %s", message.reference, resp.status_code, resp.text)
+                except httpx.TransportError as exc:
+                    logger.warning("SMS %s failed: %s", message.reference, exc)
+                    ok = False
+                results.append(ok)
+        return results
+
+
+@lru_cache(maxsize=None)
+def get_backend(channel: str) -> NotificationBackend:
+    name = settings.notification_email_backend if channel == "email" else settings.notification_sms_backend
+    if name == "file":
+        return FileBackend(channel, settings.notification_file_dir)
+    if channel == "email" and name == "smtp":
+        return SmtpBackend()
+    if channel == "sms" and name == "http":
+        return HttpSmsBackend()
+    raise NotificationError(f"Unknown {channel} backend: {name}")
@@ -2,20 +2,21 @@ from __future__ import annotations
 
 import hashlib
 from functools import lru_cache
-from typing import Any, Callable, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
 import anyio
-from supabase import Client, create_client
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 
 def _require_storage_config() -> tuple[str, str]:
     if not settings.supabase_url:
         raise RuntimeError("SUPABASE_URL not configured")
     if not settings.supabase_anon_key:
         raise RuntimeError("SUPABASE_ANON_KEY not configured")
-    print( settings.supabase_url, settings.supabase_anon_key)
     return settings.supabase_url.strip(), settings.supabase_anon_key.strip()    
 
 
@@ -31,11 +32,19 @@ async def _run_in_thread(func: Callable[[], T]) -> T:
 
 
 @lru_cache(maxsize=1)
-def _get_supabase_client() -> Client:
+def _get_supabase_client() -> "Client":
+    # The SDK pulls in several HTTP/realtime clients; import it on first use, not at app startup.
+    from supabase import create_client
+
     base, anon_key = _require_storage_config()
     return create_client(base, anon_key)
 
 
+def preload_client() -> None:
+    """Import the SDK and build the client ahead of the first upload (startup warmup)."""
+    _get_supabase_client()
+
+
 def _normalize_object_path(object_path: str) -> str:
     return object_path.lstrip("/")
 
@@ -58,6 +67,25 @@ async def upload_object(*, bucket: str, object_path: str, content: bytes, conten
             raise RuntimeError(f"Supabase upload failed: {error}")
 
 
+async def upload_file(*, bucket: str, object_path: str, file_path: str, content_type: str | None) -> None:
+    """Upload a local file by path so large objects (e.g. exports) are never held in memory."""
+    client = _get_supabase_client()
+    storage = client.storage.from_(bucket)
+    path = _normalize_object_path(object_path)
+    options: dict[str, Any] = {"upsert": "true"}
+    if content_type:
+        options["content-type"] = content_type
+
+    def _upload() -> Any:
+        return storage.upload(path, file_path, file_options=options)
+
+    result = await _run_in_thread(_upload)
+    if isinstance(result, dict):
+        error = result.get("error")
+        if error:
+            raise RuntimeError(f"Supabase upload failed: {error}")
+
+
 async def create_signed_url(*, bucket: str, object_path: str, expires_in: int = 60) -> str:
     client = _get_supabase_client()
     storage = client.storage.from_(bucket)
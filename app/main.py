@@ -1,40 +1,80 @@
+"""API entry point. Build the app with `create_app()` (uvicorn: `app.main:create_app --factory`).
+
+Routers, Settings and the database engines are imported inside the factory, so importing
+this module stays cheap and nothing is constructed until a server process asks for an app.
+"""
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import Response
-from app.api.v1.routes import user as organization_router
-from app.api.v1.routes.auth import router as auth_router
-from app.api.v1.routes.loan import router as loan_router
-from app.api.v1.routes.loanee import router as loanee_router
-from fastapi.security import HTTPBearer
-
-from app.core.idempotency import (
-    IDEMPOTENCY_HEADER,
-    IDEMPOTENT_METHODS,
-    load_cached_response,
-    store_cached_response,
-)
-from app.core.config import settings
-# from app.api.v1.routes.direct_debit import router as dd_router
-
-app = FastAPI()
-
-security = HTTPBearer()
-
-origins = (
-    [origin.strip() for origin in settings.cors_allow_origins.split(",")]
-    if settings.cors_allow_origins
-    else ["http://localhost:5173", "http://127.0.0.1:5173"]
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"] ,
-    allow_headers=["*"],
-)
 
 
+def create_app() -> FastAPI:
+    """Build the API. Connections are warmed up in `lifespan` before the app reports ready."""
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import ORJSONResponse
+
+    from app.api.v1.routes import user as organization_router
+    from app.api.v1.routes.analytics import router as analytics_router
+    from app.api.v1.routes.auth import router as auth_router
+    from app.api.v1.routes.direct_debit import router as dd_router
+    from app.api.v1.routes.export import router as export_router
+    from app.api.v1.routes.health import router as health_router
+    from app.api.v1.routes.loan import router as loan_router
+    from app.api.v1.routes.loanee import router as loanee_router
+    from app.api.v1.routes.reconciliation import router as reconciliation_router
+    from app.api.v1.routes.search import router as search_router
+    from app.api.v1.routes.webhooks import router as webhooks_router
+    from app.core.compression import CompressionMiddleware
+    from app.core.config import settings
+    from app.core.lifespan import lifespan
+    from app.core.middleware import ResponseHeadersMiddleware
+
+    app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+    origins = (
+        [origin.strip() for origin in settings.cors_allow_origins.split(",")]
+        if settings.cors_allow_origins
+        else ["http://localhost:5173", "http://127.0.0.1:5173"]
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"] ,
+        allow_headers=["*"],
+        expose_headers=["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "Retry-After"],
+    )
+    app.add_middleware(ResponseHeadersMiddleware)
+    if settings.compression_enabled:
+        # Added last so it is outermost and compresses the final body and headers.
+        app.add_middleware(CompressionMiddleware)
+
+    @app.get("/")
+    async def read_root():
+        return {"message": "Hello, World!"}
+
+    # Probes live outside /api/v1 and skip auth and rate limiting.
+    app.include_router(health_router)
+    app.include_router(organization_router.router, prefix="/api/v1")
+    app.include_router(auth_router, prefix="/api/v1")
+    app.include_router(loan_router, prefix="/api/v1")
+    app.include_router(loanee_router, prefix="/api/v1")
+    app.include_router(reconciliation_router, prefix="/api/v1")
+    app.include_router(search_router, prefix="/api/v1")
+    app.include_router(export_router, prefix="/api/v1")
+    app.include_router(analytics_router, prefix="/api/v1")
+    app.include_router(webhooks_router, prefix="/api/v1")
+    app.include_router(dd_router, prefix="/api/v1")
+    return app
+
+
+# from app.core.idempotency import (
+#     IDEMPOTENCY_HEADER,
+#     IDEMPOTENT_METHODS,
+#     load_cached_response,
+#     store_cached_response,
+# )
+#
 # @app.middleware("http")
 # async def idempotency_middleware(request: Request, call_next):
 #     if request.method not in IDEMPOTENT_METHODS:
@@ -70,13 +110,3 @@ app.add_middleware(
 #         response_body=response_body,
 #     )
 #     return new_response
-
-@app.get("/")
-async def read_root():
-    return {"message": "Hello, World!"}
-
-app.include_router(organization_router.router, prefix="/api/v1")
-app.include_router(auth_router, prefix="/api/v1")
-app.include_router(loan_router, prefix="/api/v1")
-app.include_router(loanee_router, prefix="/api/v1")
-# app.include_router(dd_router, prefix="/api/v1")
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Run the API under uvicorn with the runtime profile from Settings.
+
+Usage: python -m app.server
+
+uvloop and httptools are used when installed (they are in requirements.txt), falling back
+to uvicorn's pure-Python loop/parser otherwise. See docs/server_runtime.md for sizing.
+"""
+from __future__ import annotations
+
+import importlib.util
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=settings.server_workers,
+        loop="uvloop" if _available("uvloop") else "asyncio",
+        http="httptools" if _available("httptools") else "h11",
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        limit_concurrency=settings.server_limit_concurrency,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+        # Give in-flight requests time to finish while /health/ready reports 503.
+        timeout_graceful_shutdown=30,
+    )
+
+
+if __name__ == "__main__":
+    main()
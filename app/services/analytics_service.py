@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models.analytics import PortfolioCohortSnapshot, PortfolioDailySnapshot
+
+
+# Snapshots are keyed by UTC calendar day.
+_DAILY_COLUMNS = (
+    "loans_count",
+    "open_loans_count",
+    "outstanding_amount",
+    "defaulted_count",
+    "defaulted_amount",
+    "disbursed_count",
+    "disbursed_amount",
+    "collected_count",
+    "collected_amount",
+    "new_defaults_count",
+    "current_count",
+    "current_amount",
+    "past_due_1_30_count",
+    "past_due_1_30_amount",
+    "past_due_31_60_count",
+    "past_due_31_60_amount",
+    "past_due_61_90_count",
+    "past_due_61_90_amount",
+    "past_due_90_plus_count",
+    "past_due_90_plus_amount",
+)
+_COHORT_COLUMNS = ("loans_count", "principal_amount", "paid_count", "defaulted_count", "defaulted_amount")
+
+
+def _bucket(name: str, condition: str) -> str:
+    return (
+        f"count(*) FILTER (WHERE status <> 'paid' AND {condition}) AS {name}_count, "
+        f"coalesce(sum(total_payable) FILTER (WHERE status <> 'paid' AND {condition}), 0) AS {name}_amount"
+    )
+
+
+def _upsert_set(columns: tuple[str, ...]) -> str:
+    return ", ".join(f"{c} = EXCLUDED.{c}" for c in columns + ("refreshed_at",))
+
+
+# One pass over loans, plus the day's partitions of payments and audit_logs (the created_at
+# range lets Postgres prune to a single partition), grouped per organization and upserted.
+_DAILY_SQL = f"""
+INSERT INTO portfolio_daily_snapshots (organization_id, snapshot_date, {", ".join(_DAILY_COLUMNS)}, refreshed_at)
+SELECT
+    o.id,
+    :day,
+    coalesce(l.loans_count, 0),
+    coalesce(l.open_loans_count, 0),
+    coalesce(l.outstanding_amount, 0),
+    coalesce(l.defaulted_count, 0),
+    coalesce(l.defaulted_amount, 0),
+    coalesce(l.disbursed_count, 0),
+    coalesce(l.disbursed_amount, 0),
+    coalesce(p.collected_count, 0),
+    coalesce(p.collected_amount, 0),
+    coalesce(a.new_defaults_count, 0),
+    coalesce(l.current_count, 0),
+    coalesce(l.current_amount, 0),
+    coalesce(l.past_due_1_30_count, 0),
+    coalesce(l.past_due_1_30_amount, 0),
+    coalesce(l.past_due_31_60_count, 0),
+    coalesce(l.past_due_31_60_amount, 0),
+    coalesce(l.past_due_61_90_count, 0),
+    coalesce(l.past_due_61_90_amount, 0),
+    coalesce(l.past_due_90_plus_count, 0),
+    coalesce(l.past_due_90_plus_amount, 0),
+    now()
+FROM organizations o
+LEFT JOIN (
+    SELECT
+        organization_id,
+        count(*) AS loans_count,
+        count(*) FILTER (WHERE status <> 'paid') AS open_loans_count,
+        coalesce(sum(total_payable) FILTER (WHERE status <> 'paid'), 0) AS outstanding_amount,
+        count(*) FILTER (WHERE status = 'defaulted') AS defaulted_count,
+        coalesce(sum(total_payable) FILTER (WHERE status = 'defaulted'), 0) AS defaulted_amount,
+        count(*) FILTER (WHERE created_at >= :day_start AND created_at < :day_end) AS disbursed_count,
+        coalesce(sum(amount) FILTER (WHERE created_at >= :day_start AND created_at < :day_end), 0) AS disbursed_amount,
+        {_bucket("current", "due_date >= :day")},
+        {_bucket("past_due_1_30", "due_date BETWEEN :day - 30 AND :day - 1")},
+        {_bucket("past_due_31_60", "due_date BETWEEN :day - 60 AND :day - 31")},
+        {_bucket("past_due_61_90", "due_date BETWEEN :day - 90 AND :day - 61")},
+        {_bucket("past_due_90_plus", "due_date < :day - 90")}
+    FROM loans
+    -- Loans created after the day (e.g. when rebuilding a past snapshot) are not part of it.
+    WHERE created_at < :day_end AND {{org_filter}}
+    GROUP BY organization_id
+) l ON l.organization_id = o.id
+LEFT JOIN (
+    SELECT organization_id, count(*) AS collected_count, sum(amount) AS collected_amount
+    FROM payments
+    WHERE created_at >= :day_start AND created_at < :day_end AND {{org_filter}}
+    GROUP BY organization_id
+) p ON p.organization_id = o.id
+LEFT JOIN (
+    SELECT organization_id, count(*) AS new_defaults_count
+    FROM audit_logs
+    WHERE created_at >= :day_start AND created_at < :day_end AND to_status = 'defaulted' AND {{org_filter}}
+    GROUP BY organization_id
+) a ON a.organization_id = o.id
+WHERE {{org_filter_o}}
+ON CONFLICT (organization_id, snapshot_date) DO UPDATE SET {_upsert_set(_DAILY_COLUMNS)}
+"""
+
+_COHORT_SQL = f"""
+INSERT INTO portfolio_cohort_snapshots (organization_id, snapshot_date, cohort_month, {", ".join(_COHORT_COLUMNS)}, refreshed_at)
+SELECT
+    organization_id,
+    :day,
+    date_trunc('month', created_at AT TIME ZONE 'UTC')::date,
+    count(*),
+    sum(amount),
+    count(*) FILTER (WHERE status = 'paid'),
+    count(*) FILTER (WHERE status = 'defaulted'),
+    coalesce(sum(total_payable) FILTER (WHERE status = 'defaulted'), 0),
+    now()
+FROM loans
+WHERE created_at < :day_end AND {{org_filter}}
+GROUP BY organization_id, 3
+ON CONFLICT (organization_id, snapshot_date, cohort_month) DO UPDATE SET {_upsert_set(_COHORT_COLUMNS)}
+"""
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def refresh_snapshots(db: Session, *, day: date, organization_id: UUID | None = None) -> None:
+    """Recompute and upsert the daily and cohort snapshots for `day` (all organizations by default).
+
+    Safe to run repeatedly: today's rows are refreshed in place during the day and the nightly
+    run finalises yesterday once all of its payments have landed.
+    """
+    day_start, day_end = _day_bounds(day)
+    params = {"day": day, "day_start": day_start, "day_end": day_end}
+    if organization_id is None:
+        org_filter, org_filter_o = "TRUE", "TRUE"
+    else:
+        org_filter, org_filter_o = "organization_id = :org_id", "o.id = :org_id"
+        params["org_id"] = organization_id
+    db.execute(text(_DAILY_SQL.format(org_filter=org_filter, org_filter_o=org_filter_o)), params)
+    db.execute(text(_COHORT_SQL.format(org_filter=org_filter)), params)
+    db.commit()
+
+
+class AnalyticsService:
+    """Read portfolio analytics from the snapshot tables with primary-key range scans."""
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def daily(self, *, organization_id: UUID, date_from: date, date_to: date) -> list[PortfolioDailySnapshot]:
+        return (
+            self._db.query(PortfolioDailySnapshot)
+            .filter(PortfolioDailySnapshot.organization_id == organization_id)
+            .filter(PortfolioDailySnapshot.snapshot_date.between(date_from, date_to))
+            .order_by(PortfolioDailySnapshot.snapshot_date)
+            .all()
+        )
+
+    def latest_daily(self, *, organization_id: UUID, as_of: date) -> PortfolioDailySnapshot | None:
+        return (
+            self._db.query(PortfolioDailySnapshot)
+            .filter(PortfolioDailySnapshot.organization_id == organization_id)
+            .filter(PortfolioDailySnapshot.snapshot_date <= as_of)
+            .order_by(PortfolioDailySnapshot.snapshot_date.desc())
+            .first()
+        )
+
+    def cohorts(self, *, organization_id: UUID, as_of: date) -> list[PortfolioCohortSnapshot]:
+        """Cohort rows from the latest snapshot taken on or before `as_of`."""
+        latest = (
+            self._db.query(PortfolioCohortSnapshot.snapshot_date)
+            .filter(PortfolioCohortSnapshot.organization_id == organization_id)
+            .filter(PortfolioCohortSnapshot.snapshot_date <= as_of)
+            .order_by(PortfolioCohortSnapshot.snapshot_date.desc())
+            .limit(1)
+            .scalar()
+        )
+        if latest is None:
+            return []
+        return (
+            self._db.query(PortfolioCohortSnapshot)
+            .filter(PortfolioCohortSnapshot.organization_id == organization_id)
+            .filter(PortfolioCohortSnapshot.snapshot_date == latest)
+            .order_by(PortfolioCohortSnapshot.cohort_month)
+            .all()
+        )
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Per-item retry schedule for debit charges: exponential backoff with +/- `jitter` spread.
+
+    The delay after attempt n is `base * 2**(n-1)` seconds, capped at `max_delay_seconds`.
+    Jitter keeps items that failed together (e.g. during a provider outage) from all
+    retrying in the same scheduler tick.
+    """
+
+    max_attempts: int
+    base_delay_seconds: int
+    max_delay_seconds: int
+    jitter: float = 0.2
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=settings.debit_max_attempts,
+            base_delay_seconds=settings.debit_retry_base_seconds,
+            max_delay_seconds=settings.debit_retry_max_seconds,
+        )
+
+    def backoff(self, attempts: int) -> timedelta:
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** max(attempts - 1, 0))
+        return timedelta(seconds=delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def next_attempt_at(self, attempts: int, *, retryable: bool, now: datetime | None = None) -> datetime | None:
+        """When to try again after `attempts` failed attempts, or None if the item is dead."""
+        if not retryable or attempts >= self.max_attempts:
+            return None
+        return (now or datetime.now(timezone.utc)) + self.backoff(attempts)
+
+    def sql_params(self) -> dict:
+        """Bind parameters for SQL that applies the same policy (see `NEXT_ATTEMPT_SQL`)."""
+        return {
+            "max_attempts": self.max_attempts,
+            "base_delay": self.base_delay_seconds,
+            "max_delay": self.max_delay_seconds,
+            "jitter": self.jitter,
+        }
+
+
+# SQL form of `RetryPolicy.next_attempt_at`; format `attempts` with the SQL expression for
+# the number of failed attempts (e.g. `i.attempts + 1` while recording a failure).
+NEXT_ATTEMPT_SQL = (
+    "now() + make_interval(secs => "
+    "least(:max_delay, :base_delay * power(2, greatest({attempts} - 1, 0))) "
+    "* (1 - :jitter + random() * 2 * :jitter))"
+)
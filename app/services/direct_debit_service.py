@@ -1,23 +1,32 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal
 import uuid
 
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.models.loan import DirectDebitMandate, Loan, Payment
 from app.db.models.debit import (
     DebitScheduleItem,
     RecurringDebitSchedule,
     ScheduleItemStatus,
 )
-from app.integrations.mono import charge_mandate
+from app.integrations.mono import MonoError, MonoUnavailableError, charge_mandate
+from app.services.debit_retry import RetryPolicy
+from app.services.schedule_service import from_cents, split_cents, to_cents
+
+
+SETTLED_CHARGE_STATUSES = {"successful", "success"}
+FAILED_CHARGE_STATUSES = {"failed", "declined"}
 
 
 class DirectDebitService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, *, retry_policy: RetryPolicy | None = None):
         self._db = db
+        self._retry_policy = retry_policy or RetryPolicy.from_settings()
 
     def create_schedule(
         self,
@@ -29,14 +38,11 @@ class DirectDebitService:
     ) -> RecurringDebitSchedule:
         org_id = loan.organization_id
         total = Decimal(loan.total_payable)
-        if number_of_debits <= 1:
-            schedule_type = "single"
-            per = total
-            number_of_debits = 1
-        else:
-            schedule_type = "multiple"
-            # split with last catching remainder cents
-            per = (total / number_of_debits).quantize(Decimal("0.01"))
+        number_of_debits = max(1, number_of_debits)
+        schedule_type = "single" if number_of_debits == 1 else "multiple"
+        # split in integer cents with the last debit catching the remainder
+        amounts = [from_cents(c) for c in split_cents(to_cents(total), number_of_debits)]
+        per = amounts[0]
 
         sched = RecurringDebitSchedule(
             organization_id=org_id,
@@ -51,18 +57,20 @@ class DirectDebitService:
         self._db.flush()
 
         start = first_due_date or date.today()
-        remaining = total
-        for i in range(number_of_debits):
-            amt = per if i < number_of_debits - 1 else remaining
-            remaining -= amt
-            item = DebitScheduleItem(
-                schedule_id=sched.id,
-                due_date=start + timedelta(weeks=i),
-                amount=amt,
-                status=ScheduleItemStatus.pending,
-                idempotency_key=str(uuid.uuid4()),
-            )
-            self._db.add(item)
+        self._db.execute(
+            insert(DebitScheduleItem),
+            [
+                {
+                    "schedule_id": sched.id,
+                    "due_date": start + timedelta(weeks=i),
+                    "next_attempt_at": datetime.combine(start + timedelta(weeks=i), time.min, tzinfo=timezone.utc),
+                    "amount": amt,
+                    "status": ScheduleItemStatus.pending,
+                    "idempotency_key": str(uuid.uuid4()),
+                }
+                for i, amt in enumerate(amounts)
+            ],
+        )
 
         self._db.commit()
         self._db.refresh(sched)
@@ -71,6 +79,7 @@ class DirectDebitService:
     async def execute_item(self, *, item: DebitScheduleItem) -> DebitScheduleItem:
         # lock item in processing state
         item.status = ScheduleItemStatus.processing
+        item.claimed_at = datetime.now(timezone.utc)
         self._db.add(item)
         self._db.commit()
         self._db.refresh(item)
@@ -80,35 +89,116 @@ class DirectDebitService:
         mandate = self._db.query(DirectDebitMandate).get(sched.mandate_id)
 
         amount_minor = int(Decimal(item.amount) * 100)
+        attempt = item.attempts + 1
         try:
+            # One key per attempt: a retry is a new charge, a duplicate send of the same attempt is not.
             resp = await charge_mandate(
                 mandate_reference=mandate.mandate_reference,
                 amount_minor=amount_minor,
-                idempotency_key=item.idempotency_key,
+                idempotency_key=f"{item.idempotency_key}.{attempt}",
             )
             txn_ref = str(resp.get("id") or resp.get("reference") or "")
-            item.provider_txn_ref = txn_ref
-            item.status = ScheduleItemStatus.paid
-            item.attempts += 1
-
-            # create payment record
-            payment = Payment(
-                organization_id=sched.organization_id,
-                loan_id=loan.id,
-                amount=item.amount,
-                reference=txn_ref or "mono-dd",
-                source="direct_debit",
+            charge_status = str(resp.get("status", "")).lower()
+            if charge_status in FAILED_CHARGE_STATUSES:
+                # e.g. a re-sent key whose charge was declined while we waited for its webhook.
+                raise MonoError(f"Charge {charge_status}: {resp.get('message') or txn_ref}")
+            if charge_status not in SETTLED_CHARGE_STATUSES:
+                # Settlement arrives later as a Mono webhook (app/services/webhook_service.py).
+                # The attempt stays open, so if the webhook never comes the reaper re-sends the
+                # same key and Mono answers with this charge instead of making a new one.
+                item.provider_txn_ref = txn_ref
+                item.next_attempt_at = None
+                self._db.add(item)
+                self._db.commit()
+                self._db.refresh(item)
+                return item
+
+            # Conditional, since the settlement webhook may have marked the item paid (and
+            # recorded its payment) while the charge call was in flight.
+            settled = (
+                self._db.query(DebitScheduleItem)
+                .filter(DebitScheduleItem.id == item.id)
+                .filter(DebitScheduleItem.status == ScheduleItemStatus.processing)
+                .update(
+                    {
+                        DebitScheduleItem.status: ScheduleItemStatus.paid,
+                        DebitScheduleItem.attempts: attempt,
+                        DebitScheduleItem.provider_txn_ref: txn_ref,
+                        DebitScheduleItem.next_attempt_at: None,
+                    },
+                    synchronize_session=False,
+                )
             )
-            self._db.add(payment)
-            self._db.add(item)
+            if settled:
+                # create payment record
+                payment = Payment(
+                    organization_id=sched.organization_id,
+                    loan_id=loan.id,
+                    amount=item.amount,
+                    reference=txn_ref or "mono-dd",
+                    source="direct_debit",
+                )
+                self._db.add(payment)
             self._db.commit()
             self._db.refresh(item)
             return item
+        except MonoUnavailableError as exc:
+            # Never reached Mono (circuit open / no capacity): try again later without using an attempt.
+            self.release_item(item=item, error=str(exc))
+            return item
         except Exception as exc:  # noqa: BLE001 - capture integration errors
-            item.attempts += 1
-            item.status = ScheduleItemStatus.failed
+            # Only MonoError carries a classification; anything else is treated as transient.
+            retryable = exc.retryable if isinstance(exc, MonoError) else True
+            item.attempts = attempt
             item.last_error = str(exc)
+            item.next_attempt_at = self._retry_policy.next_attempt_at(attempt, retryable=retryable)
+            item.status = ScheduleItemStatus.failed if item.next_attempt_at else ScheduleItemStatus.dead
             self._db.add(item)
             self._db.commit()
             self._db.refresh(item)
             return item
+
+    def release_item(self, *, item: DebitScheduleItem, error: str | None = None) -> DebitScheduleItem:
+        """Return a claimed item to the scheduler untouched, due again after the breaker cooldown."""
+        item.status = ScheduleItemStatus.pending if item.attempts == 0 else ScheduleItemStatus.failed
+        item.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=settings.mono_breaker_cooldown_seconds)
+        item.claimed_at = None
+        if error:
+            item.last_error = error
+        self._db.add(item)
+        self._db.commit()
+        self._db.refresh(item)
+        return item
+
+    def get_item(self, *, organization_id, item_id) -> DebitScheduleItem | None:
+        return (
+            self._db.query(DebitScheduleItem)
+            .join(RecurringDebitSchedule, RecurringDebitSchedule.id == DebitScheduleItem.schedule_id)
+            .filter(RecurringDebitSchedule.organization_id == organization_id)
+            .filter(DebitScheduleItem.id == item_id)
+            .first()
+        )
+
+    def dead_letter_items(self, *, organization_id, limit: int = 100, offset: int = 0) -> list[dict]:
+        """Items whose retries are exhausted, most recent first (from the debit_items_dead_letter view)."""
+        rows = self._db.execute(
+            text(
+                "SELECT * FROM debit_items_dead_letter WHERE organization_id = :org "
+                "ORDER BY dead_since DESC LIMIT :limit OFFSET :offset"
+            ),
+            {"org": organization_id, "limit": limit, "offset": offset},
+        )
+        return [dict(row._mapping) for row in rows]
+
+    def requeue_item(self, *, item: DebitScheduleItem) -> DebitScheduleItem:
+        """Give a dead item a fresh set of attempts, starting now."""
+        item.status = ScheduleItemStatus.pending
+        item.attempts = 0
+        # A new key, or Mono would answer the first new attempt with the old failed charge.
+        item.idempotency_key = str(uuid.uuid4())
+        item.next_attempt_at = datetime.now(timezone.utc)
+        item.claimed_at = None
+        self._db.add(item)
+        self._db.commit()
+        self._db.refresh(item)
+        return item
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.core.redis import get_redis
+from app.db.crud.loan import loans_query
+from app.db.models.loan import Loan, Loanee, Payment
+from app.db.schemas.export import (
+    ExportDataset,
+    ExportFormat,
+    LoaneeExportFilters,
+    LoanExportFilters,
+    PaymentExportFilters,
+)
+from app.db.session import open_read_session
+
+
+YIELD_PER = 1000
+FLUSH_BYTES = 64 * 1024
+JOB_TTL_SECONDS = 60 * 60 * 24
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+FILTER_MODELS = {
+    ExportDataset.loans: LoanExportFilters,
+    ExportDataset.loanees: LoaneeExportFilters,
+    ExportDataset.payments: PaymentExportFilters,
+}
+
+_LOAN_COLUMNS = (
+    Loan.id,
+    Loan.loanee_id,
+    Loan.amount,
+    Loan.loan_term_weeks,
+    Loan.surcharge,
+    Loan.penalty,
+    Loan.due_date,
+    Loan.status,
+    Loan.auto_debit_enabled,
+    Loan.total_payable,
+    Loan.is_document_uploaded,
+    Loan.created_at,
+    Loan.updated_at,
+)
+_LOANEE_COLUMNS = (
+    Loanee.id,
+    Loanee.full_name,
+    Loanee.email,
+    Loanee.phone_number,
+    Loanee.address,
+    Loanee.created_at,
+    Loanee.updated_at,
+)
+_PAYMENT_COLUMNS = (
+    Payment.id,
+    Payment.loan_id,
+    Payment.amount,
+    Payment.reference,
+    Payment.source,
+    Payment.created_at,
+)
+
+
+def _loans(db: Session, organization_id: UUID, filters: LoanExportFilters) -> Query:
+    q = loans_query(db, organization_id=str(organization_id), **filters.model_dump())
+    return q.with_entities(*_LOAN_COLUMNS).order_by(Loan.created_at.desc(), Loan.id.desc())
+
+
+def _loanees(db: Session, organization_id: UUID, filters: LoaneeExportFilters) -> Query:
+    q = db.query(*_LOANEE_COLUMNS).filter(Loanee.organization_id == organization_id)
+    if filters.email:
+        q = q.filter(func.lower(Loanee.email) == filters.email.lower())
+    return q.order_by(Loanee.created_at.desc(), Loanee.id.desc())
+
+
+def _payments(db: Session, organization_id: UUID, filters: PaymentExportFilters) -> Query:
+    q = db.query(*_PAYMENT_COLUMNS).filter(Payment.organization_id == organization_id)
+    if filters.loan_id is not None:
+        q = q.filter(Payment.loan_id == filters.loan_id)
+    if filters.created_from is not None:
+        q = q.filter(Payment.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        q = q.filter(Payment.created_at < filters.created_to + timedelta(days=1))
+    return q.order_by(Payment.created_at.desc(), Payment.id.desc())
+
+
+_QUERIES = {
+    ExportDataset.loans: (_loans, _LOAN_COLUMNS),
+    ExportDataset.loanees: (_loanees, _LOANEE_COLUMNS),
+    ExportDataset.payments: (_payments, _PAYMENT_COLUMNS),
+}
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _encode_csv(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(v) for v in row])
+        if buf.tell() >= FLUSH_BYTES:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def _encode_ndjson(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    chunk: list[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps({c: (None if v is None else _cell(v)) for c, v in zip(columns, row)})
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= FLUSH_BYTES:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk, size = [], 0
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+def parse_filters(dataset: ExportDataset, raw: dict[str, Any]):
+    return FILTER_MODELS[dataset].model_validate(raw)
+
+
+def iter_export(
+    db: Session,
+    *,
+    dataset: ExportDataset,
+    organization_id: UUID,
+    filters,
+    fmt: ExportFormat,
+    counter: list[int] | None = None,
+) -> Iterator[bytes]:
+    """Encode a dataset as CSV/NDJSON chunks using a server-side cursor.
+
+    Rows are fetched `YIELD_PER` at a time as plain tuples (no ORM identity map), so memory
+    stays flat regardless of result size. `counter`, when given, receives the row count.
+    """
+    build, column_attrs = _QUERIES[dataset]
+    columns = [c.key for c in column_attrs]
+    rows = build(db, organization_id, filters).yield_per(YIELD_PER)
+    if counter is not None:
+        rows = _counting(rows, counter)
+    encode = _encode_csv if fmt == ExportFormat.csv else _encode_ndjson
+    yield from encode(columns, rows)
+
+
+def _counting(rows: Iterable[tuple], counter: list[int]) -> Iterator[tuple]:
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+
+def stream_export(
+    *,
+    dataset: ExportDataset,
+    organization_id: UUID,
+    filters,
+    fmt: ExportFormat,
+) -> Iterator[bytes]:
+    """Same as `iter_export` but owns its (read) session, so it outlives the request dependency scope."""
+    db = open_read_session(organization_id)
+    try:
+        yield from iter_export(db, dataset=dataset, organization_id=organization_id, filters=filters, fmt=fmt)
+    finally:
+        db.close()
+
+
+def export_filename(dataset: ExportDataset, fmt: ExportFormat) -> str:
+    return f"{dataset.value}-{date.today().isoformat()}.{fmt.value}"
+
+
+# Background export jobs: state lives in a Redis hash keyed by job id.
+
+def _job_key(job_id: str) -> str:
+    return f"export_job:{job_id}"
+
+
+def create_export_job(*, organization_id: UUID, dataset: ExportDataset, fmt: ExportFormat) -> str:
+    job_id = uuid.uuid4().hex
+    key = _job_key(job_id)
+    r = get_redis()
+    r.hset(
+        key,
+        mapping={
+            "organization_id": str(organization_id),
+            "dataset": dataset.value,
+            "format": fmt.value,
+            "status": "queued",
+        },
+    )
+    r.expire(key, JOB_TTL_SECONDS)
+    return job_id
+
+
+def update_export_job(job_id: str, **fields: Any) -> None:
+    get_redis().hset(_job_key(job_id), mapping={k: str(v) for k, v in fields.items()})
+
+
+def get_export_job(job_id: str) -> dict[str, str] | None:
+    raw = get_redis().hgetall(_job_key(job_id))
+    if not raw:
+        return None
+    return {k.decode(): v.decode() for k, v in raw.items()}
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from decimal import Decimal, InvalidOperation
+from typing import IO, Iterable, Iterator
+from uuid import UUID
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.db.models.ids import uuid7
+from app.db.models.loan import AuditLog, Loan, Loanee, LoanStatus, Payment
+from app.db.schemas.reconciliation import MatchStatus
+
+
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}")
+_COLUMN_ALIASES = {
+    "reference": ("reference", "ref", "narration", "description"),
+    "amount": ("amount", "credit", "value"),
+    "name": ("name", "payer", "payer_name", "full_name"),
+    "email": ("email", "payer_email"),
+}
+_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class StatementLine:
+    line_number: int
+    reference: str | None
+    amount: Decimal | None
+    name: str | None
+    email: str | None
+
+
+@dataclass(frozen=True)
+class _OpenLoan:
+    loan_id: UUID
+    loanee_id: UUID
+    amount_cents: int
+    status: LoanStatus
+
+
+@dataclass
+class LineMatch:
+    line_number: int
+    reference: str | None
+    amount: Decimal | None
+    name: str | None
+    email: str | None
+    status: MatchStatus
+    matched_by: str | None = None
+    loan_id: UUID | None = None
+    loanee_id: UUID | None = None
+    reason: str | None = None
+    # Status the loan had when the index was built; used for the audit trail on posting.
+    from_status: LoanStatus | None = None
+
+
+@dataclass
+class ReconciliationResult:
+    results: list[LineMatch] = field(default_factory=list)
+    posted: int = 0
+
+    @property
+    def total_lines(self) -> int:
+        return len(self.results)
+
+    @property
+    def matched(self) -> int:
+        return sum(1 for r in self.results if r.status == MatchStatus.matched)
+
+    @property
+    def unmatched(self) -> int:
+        return self.total_lines - self.matched
+
+
+def _normalize_name(value: str | None) -> str | None:
+    if not value:
+        return None
+    return " ".join(value.lower().split()) or None
+
+
+def _normalize_email(value: str | None) -> str | None:
+    if not value:
+        return None
+    return value.strip().lower() or None
+
+
+def _to_cents(amount: Decimal) -> int:
+    return int((amount * 100).to_integral_value())
+
+
+def _pick(row: dict[str, str], key: str) -> str | None:
+    for alias in _COLUMN_ALIASES[key]:
+        value = row.get(alias)
+        if value is not None and value.strip():
+            return value.strip()
+    return None
+
+
+def parse_statement_csv(stream: IO[bytes]) -> Iterator[StatementLine]:
+    """Stream a statement CSV row by row without reading the whole file into memory.
+
+    Header names are matched case-insensitively against a few common bank export aliases
+    (e.g. `ref`/`narration` for `reference`, `credit` for `amount`).
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [h.strip().lower() for h in header]
+    for line_number, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        row = dict(zip(columns, values))
+        raw_amount = _pick(row, "amount")
+        amount: Decimal | None = None
+        if raw_amount is not None:
+            try:
+                amount = Decimal(raw_amount.replace(",", "")).quantize(Decimal("0.01"))
+            except InvalidOperation:
+                amount = None
+        yield StatementLine(
+            line_number=line_number,
+            reference=_pick(row, "reference"),
+            amount=amount,
+            name=_pick(row, "name"),
+            email=_pick(row, "email"),
+        )
+
+
+class ReconciliationService:
+    """Match bank statement lines against open loans and post confirmed matches in bulk.
+
+    Open loans for the organization are loaded once into in-memory hash indexes
+    (by loan id, loanee email and normalized loanee name), so matching is O(1) per line
+    regardless of statement size.
+    """
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def _build_indexes(
+        self, *, organization_id: UUID
+    ) -> tuple[dict[str, _OpenLoan], dict[str, list[_OpenLoan]], dict[str, list[_OpenLoan]]]:
+        by_loan_id: dict[str, _OpenLoan] = {}
+        by_email: dict[str, list[_OpenLoan]] = {}
+        by_name: dict[str, list[_OpenLoan]] = {}
+        rows = (
+            self._db.query(
+                Loan.id,
+                Loan.loanee_id,
+                Loan.total_payable,
+                Loan.status,
+                Loanee.full_name,
+                Loanee.email,
+            )
+            .join(Loanee, Loan.loanee_id == Loanee.id)
+            .filter(Loan.organization_id == organization_id)
+            .filter(Loan.status != LoanStatus.paid)
+            .yield_per(_CHUNK_SIZE)
+        )
+        for loan_id, loanee_id, total_payable, status, full_name, email in rows:
+            entry = _OpenLoan(
+                loan_id=loan_id,
+                loanee_id=loanee_id,
+                amount_cents=_to_cents(Decimal(total_payable)),
+                status=status,
+            )
+            by_loan_id[loan_id.hex] = entry
+            email_key = _normalize_email(email)
+            if email_key:
+                by_email.setdefault(email_key, []).append(entry)
+            name_key = _normalize_name(full_name)
+            if name_key:
+                by_name.setdefault(name_key, []).append(entry)
+        return by_loan_id, by_email, by_name
+
+    def _posted_references(self, *, organization_id: UUID, references: set[str]) -> set[str]:
+        found: set[str] = set()
+        refs = list(references)
+        for start in range(0, len(refs), _CHUNK_SIZE):
+            chunk = refs[start : start + _CHUNK_SIZE]
+            rows = (
+                self._db.query(Payment.reference)
+                .filter(Payment.organization_id == organization_id)
+                .filter(Payment.reference.in_(chunk))
+                .all()
+            )
+            found.update(r for (r,) in rows)
+        return found
+
+    def reconcile(self, *, organization_id: UUID, lines: Iterable[StatementLine]) -> ReconciliationResult:
+        """Match lines as they are read, `_CHUNK_SIZE` at a time; only the per-line results are kept."""
+        by_loan_id, by_email, by_name = self._build_indexes(organization_id=organization_id)
+
+        result = ReconciliationResult()
+        seen_references: set[str] = set()
+        claimed_loans: set[UUID] = set()
+
+        lines = iter(lines)
+        while chunk := list(islice(lines, _CHUNK_SIZE)):
+            references = {line.reference for line in chunk if line.reference}
+            already_posted = self._posted_references(organization_id=organization_id, references=references)
+            for line in chunk:
+                self._match_line(
+                    line,
+                    result=result,
+                    already_posted=already_posted,
+                    seen_references=seen_references,
+                    claimed_loans=claimed_loans,
+                    by_loan_id=by_loan_id,
+                    by_email=by_email,
+                    by_name=by_name,
+                )
+        return result
+
+    def _match_line(
+        self,
+        line: StatementLine,
+        *,
+        result: ReconciliationResult,
+        already_posted: set[str],
+        seen_references: set[str],
+        claimed_loans: set[UUID],
+        by_loan_id: dict[str, _OpenLoan],
+        by_email: dict[str, list[_OpenLoan]],
+        by_name: dict[str, list[_OpenLoan]],
+    ) -> None:
+        match = LineMatch(
+            line_number=line.line_number,
+            reference=line.reference,
+            amount=line.amount,
+            name=line.name,
+            email=line.email,
+            status=MatchStatus.unmatched,
+        )
+        result.results.append(match)
+
+        if line.amount is None or line.amount <= 0:
+            match.status = MatchStatus.invalid
+            match.reason = "Missing or non-positive amount"
+            return
+        if line.reference:
+            if line.reference in already_posted:
+                match.status = MatchStatus.duplicate
+                match.reason = "Reference already posted as a payment"
+                return
+            if line.reference in seen_references:
+                match.status = MatchStatus.duplicate
+                match.reason = "Reference repeated in statement"
+                return
+            seen_references.add(line.reference)
+
+        cents = _to_cents(line.amount)
+        candidates: list[_OpenLoan] = []
+        matched_by: str | None = None
+
+        uuid_match = _UUID_RE.search(line.reference or "")
+        if uuid_match:
+            entry = by_loan_id.get(uuid_match.group(0).replace("-", "").lower())
+            if entry:
+                candidates, matched_by = [entry], "reference"
+        if not candidates:
+            email_key = _normalize_email(line.email)
+            if email_key and email_key in by_email:
+                candidates, matched_by = by_email[email_key], "email"
+        if not candidates:
+            name_key = _normalize_name(line.name)
+            if name_key and name_key in by_name:
+                candidates, matched_by = by_name[name_key], "name"
+        if not candidates:
+            match.reason = "No open loan found for reference, email or name"
+            return
+
+        exact = [c for c in candidates if c.amount_cents == cents and c.loan_id not in claimed_loans]
+        match.matched_by = matched_by
+        if not exact:
+            match.status = MatchStatus.amount_mismatch
+            match.loanee_id = candidates[0].loanee_id
+            match.reason = "Amount does not equal total payable of any open loan"
+            return
+        if len(exact) > 1:
+            match.status = MatchStatus.ambiguous
+            match.loanee_id = exact[0].loanee_id
+            match.reason = f"{len(exact)} open loans match this amount"
+            return
+
+        entry = exact[0]
+        claimed_loans.add(entry.loan_id)
+        match.status = MatchStatus.matched
+        match.loan_id = entry.loan_id
+        match.loanee_id = entry.loanee_id
+        match.from_status = entry.status
+
+    def post_matches(self, *, organization_id: UUID, result: ReconciliationResult) -> int:
+        """Mark matched loans paid, then insert payments and audit logs for them, in one transaction.
+
+        Loans are flipped with UPDATE ... RETURNING first, and payments and audits are written
+        only for the returned ids: a loan marked paid concurrently since `reconcile` ran is
+        skipped rather than getting a second payment.
+        """
+        matches = [m for m in result.results if m.status == MatchStatus.matched]
+        if not matches:
+            return 0
+
+        loan_ids = [m.loan_id for m in matches]
+        paid: set[UUID] = set()
+        for start in range(0, len(loan_ids), _CHUNK_SIZE):
+            rows = self._db.execute(
+                update(Loan)
+                .where(Loan.organization_id == organization_id)
+                .where(Loan.id.in_(loan_ids[start : start + _CHUNK_SIZE]))
+                .where(Loan.status != LoanStatus.paid)
+                .values(status=LoanStatus.paid)
+                .returning(Loan.id)
+                .execution_options(synchronize_session=False)
+            )
+            paid.update(rows.scalars())
+
+        posted = [m for m in matches if m.loan_id in paid]
+        for m in matches:
+            if m.loan_id not in paid:
+                m.status = MatchStatus.duplicate
+                m.reason = "Loan was marked paid while the statement was being reconciled"
+        if not posted:
+            self._db.commit()
+            result.posted = 0
+            return 0
+
+        payments = [
+            {
+                "id": uuid7(),
+                "organization_id": organization_id,
+                "loan_id": m.loan_id,
+                "amount": m.amount,
+                "reference": m.reference or f"statement-line-{m.line_number}",
+                "source": "bank_statement",
+            }
+            for m in posted
+        ]
+        audits = [
+            {
+                "id": uuid7(),
+                "organization_id": organization_id,
+                "loan_id": m.loan_id,
+                "action": "loan_status_transition",
+                "from_status": m.from_status,
+                "to_status": LoanStatus.paid,
+                "message": f"Reconciled from bank statement line {m.line_number}",
+            }
+            for m in posted
+        ]
+        self._db.execute(insert(Payment), payments)
+        self._db.execute(insert(AuditLog), audits)
+        self._db.commit()
+        result.posted = len(posted)
+        return result.posted
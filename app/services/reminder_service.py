@@ -0,0 +1,210 @@
+"""Repayment reminders for loans falling due in `reminder_days_before` days.
+
+The daily job (app/tasks/notifications.py) lists, per organization and reminder offset,
+the open loans due on the target date through `ix_loans_org_due_date_status`, and fans
+them out as batches of `reminder_batch_size` loan ids. Each batch is then:
+
+1. loaded in one query (loan, loanee contact details, organization name, amount outstanding);
+2. deduplicated per loan, channel and day with Redis SET NX, so a re-run or redelivered
+   batch never reminds anyone twice;
+3. rendered from the templates in app/templates/reminders (compiled once per process);
+4. sent through the configured backends in chunks paced by a shared token bucket, so
+   every notification worker together stays under the provider's rate.
+
+Messages a backend reports as not sent have their dedup key released for the next run.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from uuid import UUID
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.integrations.notifications import OutboundMessage, get_backend
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "reminders"
+_DEDUP_TTL_SECONDS = 2 * 24 * 60 * 60
+
+# Equality on organization_id and due_date plus a status list: served by ix_loans_org_due_date_status.
+_DUE_LOAN_IDS_SQL = text(
+    """
+    SELECT id FROM loans
+    WHERE organization_id = :organization_id
+      AND due_date = :due_date
+      AND status IN ('not_due', 'due')
+    """
+)
+
+_REMINDER_ROWS_SQL = text(
+    """
+    SELECT
+        l.id AS loan_id,
+        l.due_date,
+        l.total_payable - coalesce(p.paid, 0) AS amount_due,
+        le.full_name AS loanee_name,
+        le.email,
+        le.phone_number,
+        o.name AS organization_name
+    FROM loans AS l
+    JOIN loanees AS le ON le.id = l.loanee_id
+    JOIN organizations AS o ON o.id = l.organization_id
+    LEFT JOIN LATERAL (
+        SELECT sum(amount) AS paid FROM payments WHERE loan_id = l.id
+    ) AS p ON true
+    WHERE l.id = ANY(CAST(:loan_ids AS uuid[]))
+      AND l.status IN ('not_due', 'due')
+    """
+)
+
+
+@dataclass(frozen=True)
+class ReminderResult:
+    sent: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+@lru_cache(maxsize=1)
+def _environment() -> Environment:
+    # Plain-text templates: no HTML escaping, and a missing variable is an error rather than a blank.
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        autoescape=False,
+        undefined=StrictUndefined,
+        keep_trailing_newline=False,
+    )
+
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> Template:
+    return _environment().get_template(name)
+
+
+def reminder_targets(today: date) -> dict[date, int]:
+    """Due dates to remind about today, mapped to how many days ahead they are."""
+    return {today + timedelta(days=n): n for n in sorted(set(settings.reminder_days_before))}
+
+
+def due_loan_ids(db: Session, *, organization_id: UUID, due_date: date) -> list[str]:
+    rows = db.execute(_DUE_LOAN_IDS_SQL, {"organization_id": organization_id, "due_date": due_date})
+    return [str(loan_id) for loan_id in rows.scalars()]
+
+
+def format_amount(amount: Decimal) -> str:
+    return f"{settings.reminder_currency} {amount:,.2f}"
+
+
+def _dedup_key(channel: str, loan_id: str, day: date) -> str:
+    return f"reminder:{day.isoformat()}:{channel}:{loan_id}"
+
+
+def _claim(keys: list[str]) -> list[bool]:
+    """SET NX every key in one round trip; True where this caller claimed it first."""
+    pipe = get_redis().pipeline(transaction=False)
+    for key in keys:
+        pipe.set(key, 1, nx=True, ex=_DEDUP_TTL_SECONDS)
+    return [bool(ok) for ok in pipe.execute()]
+
+
+def _release(keys: list[str]) -> None:
+    if keys:
+        get_redis().delete(*keys)
+
+
+def _throttle(channel: str, count: int) -> None:
+    """Wait until the shared per-channel budget allows `count` more messages."""
+    rate = settings.notification_rate_per_second
+    while True:
+        result = rate_limit.hit(
+            f"notifications:{channel}",
+            capacity=max(1, int(rate)),
+            refill_per_second=rate,
+            cost=count,
+        )
+        if result is None or result.allowed:
+            return
+        time.sleep(result.retry_after)
+
+
+def _render(row, *, days_before: int) -> dict[str, OutboundMessage]:
+    context = {
+        "loanee_name": row.loanee_name,
+        "organization_name": row.organization_name,
+        "amount_due": format_amount(row.amount_due),
+        "due_date": row.due_date,
+        "days_before": days_before,
+    }
+    loan_id = str(row.loan_id)
+    messages = {}
+    if row.email:
+        messages["email"] = OutboundMessage(
+            channel="email",
+            to=row.email,
+            subject=_template("loan_reminder_subject.txt").render(context).strip(),
+            body=_template("loan_reminder_email.txt").render(context),
+            reference=loan_id,
+        )
+    if row.phone_number:
+        messages["sms"] = OutboundMessage(
+            channel="sms",
+            to=row.phone_number,
+            body=_template("loan_reminder_sms.txt").render(context).strip(),
+            reference=loan_id,
+        )
+    return messages
+
+
+def _deliver(channel: str, messages: list[OutboundMessage], keys: list[str]) -> tuple[int, int]:
+    backend = get_backend(channel)
+    chunk_size = max(1, int(settings.notification_rate_per_second))
+    sent = failed = 0
+    for start in range(0, len(messages), chunk_size):
+        chunk = messages[start : start + chunk_size]
+        chunk_keys = keys[start : start + chunk_size]
+        _throttle(channel, len(chunk))
+        try:
+            results = backend.send_batch(chunk)
+        except Exception:  # noqa: BLE001 - release the whole chunk for the next run
+            logger.exception("Sending %d %s reminders failed", len(chunk), channel)
+            results = [False] * len(chunk)
+        _release([key for key, ok in zip(chunk_keys, results) if not ok])
+        sent += sum(results)
+        failed += len(results) - sum(results)
+    return sent, failed
+
+
+def send_reminders(db: Session, *, loan_ids: list[str], days_before: int, today: date | None = None) -> ReminderResult:
+    """Render and send reminders for one batch of loans; safe to run more than once."""
+    today = today or datetime.now(timezone.utc).date()
+    rows = db.execute(_REMINDER_ROWS_SQL, {"loan_ids": loan_ids}).all()
+
+    outgoing: dict[str, list[tuple[str, OutboundMessage]]] = {"email": [], "sms": []}
+    for row in rows:
+        for channel, message in _render(row, days_before=days_before).items():
+            outgoing[channel].append((_dedup_key(channel, message.reference, today), message))
+
+    sent = failed = skipped = 0
+    for channel, pending in outgoing.items():
+        if not pending:
+            continue
+        claimed = _claim([key for key, _ in pending])
+        fresh = [item for item, ok in zip(pending, claimed) if ok]
+        skipped += len(pending) - len(fresh)
+        if fresh:
+            channel_sent, channel_failed = _deliver(channel, [m for _, m in fresh], [k for k, _ in fresh])
+            sent += channel_sent
+            failed += channel_failed
+    return ReminderResult(sent=sent, skipped=skipped, failed=failed)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.db.models.ids import uuid7
+from app.db.models.loan import InterestMethod, Loan, LoanInstalment, RepaymentFrequency
+
+
+_PERIODS_PER_YEAR = {
+    RepaymentFrequency.weekly: 52,
+    RepaymentFrequency.monthly: 12,
+}
+_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class ScheduleTerms:
+    """Inputs for one repayment schedule. Money is in integer cents; `annual_rate` is a fraction (0.24 = 24%)."""
+
+    principal_cents: int
+    fees_cents: int
+    annual_rate: Decimal
+    instalments: int
+    frequency: RepaymentFrequency
+    interest_method: InterestMethod
+    start_date: date
+
+
+@dataclass(frozen=True)
+class Instalment:
+    sequence: int
+    due_date: date
+    principal_cents: int
+    interest_cents: int
+    fees_cents: int
+    balance_after_cents: int
+
+    @property
+    def amount_cents(self) -> int:
+        return self.principal_cents + self.interest_cents + self.fees_cents
+
+
+def to_cents(amount: Decimal) -> int:
+    return int((Decimal(amount) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def split_cents(total_cents: int, parts: int) -> list[int]:
+    """Split `total_cents` into `parts` equal shares; the last share absorbs the remainder so the sum is exact."""
+    if parts < 1:
+        raise ValueError("parts must be at least 1")
+    base = total_cents // parts
+    return [base] * (parts - 1) + [total_cents - base * (parts - 1)]
+
+
+def _add_months(start: date, months: int) -> date:
+    index = start.year * 12 + (start.month - 1) + months
+    year, month = index // 12, index % 12 + 1
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def due_dates(start: date, frequency: RepaymentFrequency, count: int) -> list[date]:
+    """Due dates for `count` instalments, the first one period after `start`."""
+    if frequency == RepaymentFrequency.weekly:
+        return [start + timedelta(weeks=i) for i in range(1, count + 1)]
+    return [_add_months(start, i) for i in range(1, count + 1)]
+
+
+def _round(value: Decimal) -> int:
+    return int(value.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def build_schedule(terms: ScheduleTerms) -> list[Instalment]:
+    """Generate the instalments for one loan in integer cents.
+
+    Flat interest charges `rate * principal * term` up front and spreads it evenly.
+    Reducing balance uses a level payment and charges interest on the outstanding
+    principal each period. In both cases the final instalment clears the remaining
+    principal, so the instalments always sum exactly to principal + interest + fees.
+    """
+    n = terms.instalments
+    if n < 1:
+        raise ValueError("instalments must be at least 1")
+    if terms.principal_cents < 0 or terms.fees_cents < 0 or terms.annual_rate < 0:
+        raise ValueError("principal, fees and rate must not be negative")
+
+    periods = _PERIODS_PER_YEAR[terms.frequency]
+    rate = Decimal(terms.annual_rate) / periods
+    fees = split_cents(terms.fees_cents, n)
+    dates = due_dates(terms.start_date, terms.frequency, n)
+
+    if terms.interest_method == InterestMethod.flat or rate == 0:
+        principal = split_cents(terms.principal_cents, n)
+        interest = split_cents(_round(terms.principal_cents * rate * n), n)
+    else:
+        factor = (1 + rate) ** n
+        payment = _round(terms.principal_cents * rate * factor / (factor - 1))
+        principal, interest = [], []
+        balance = terms.principal_cents
+        for i in range(n):
+            period_interest = _round(balance * rate)
+            period_principal = balance if i == n - 1 else min(balance, payment - period_interest)
+            principal.append(period_principal)
+            interest.append(period_interest)
+            balance -= period_principal
+
+    schedule = []
+    balance = terms.principal_cents
+    for i in range(n):
+        balance -= principal[i]
+        schedule.append(
+            Instalment(
+                sequence=i + 1,
+                due_date=dates[i],
+                principal_cents=principal[i],
+                interest_cents=interest[i],
+                fees_cents=fees[i],
+                balance_after_cents=balance,
+            )
+        )
+    return schedule
+
+
+def _rows(organization_id: UUID, loan_id: UUID, schedule: Iterable[Instalment]) -> list[dict]:
+    return [
+        {
+            "id": uuid7(),
+            "organization_id": organization_id,
+            "loan_id": loan_id,
+            "sequence": item.sequence,
+            "due_date": item.due_date,
+            "principal": from_cents(item.principal_cents),
+            "interest": from_cents(item.interest_cents),
+            "fees": from_cents(item.fees_cents),
+            "amount": from_cents(item.amount_cents),
+            "balance_after": from_cents(item.balance_after_cents),
+        }
+        for item in schedule
+    ]
+
+
+class RepaymentScheduleService:
+    """Build repayment schedules from loan terms and persist them with bulk inserts."""
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def terms_for_loan(
+        self,
+        loan: Loan,
+        *,
+        frequency: RepaymentFrequency,
+        interest_method: InterestMethod,
+        annual_rate: Decimal,
+        instalments: int | None = None,
+        start_date: date | None = None,
+    ) -> ScheduleTerms:
+        """Derive schedule terms from a loan: surcharge and penalty (total_payable - amount) are spread as fees."""
+        weeks = loan.loan_term_weeks
+        if instalments is None:
+            instalments = weeks if frequency == RepaymentFrequency.weekly else max(1, round(weeks * 12 / 52))
+        principal_cents = to_cents(loan.amount)
+        return ScheduleTerms(
+            principal_cents=principal_cents,
+            fees_cents=max(0, to_cents(loan.total_payable) - principal_cents),
+            annual_rate=annual_rate,
+            instalments=instalments,
+            frequency=frequency,
+            interest_method=interest_method,
+            start_date=start_date or loan.due_date - timedelta(weeks=weeks),
+        )
+
+    def replace_schedules(self, *, organization_id: UUID, schedules: Sequence[tuple[UUID, list[Instalment]]]) -> int:
+        """Replace the stored schedules of the given loans in one transaction. Returns the number of rows written."""
+        loan_ids = [loan_id for loan_id, _ in schedules]
+        for start in range(0, len(loan_ids), _CHUNK_SIZE):
+            self._db.execute(
+                delete(LoanInstalment)
+                .where(LoanInstalment.organization_id == organization_id)
+                .where(LoanInstalment.loan_id.in_(loan_ids[start : start + _CHUNK_SIZE]))
+                .execution_options(synchronize_session=False)
+            )
+        rows = [row for loan_id, schedule in schedules for row in _rows(organization_id, loan_id, schedule)]
+        for start in range(0, len(rows), _CHUNK_SIZE):
+            self._db.execute(insert(LoanInstalment), rows[start : start + _CHUNK_SIZE])
+        self._db.commit()
+        return len(rows)
+
+    def generate_for_loans(
+        self,
+        *,
+        organization_id: UUID,
+        loans: Iterable[Loan],
+        frequency: RepaymentFrequency,
+        interest_method: InterestMethod,
+        annual_rate: Decimal,
+        instalments: int | None = None,
+    ) -> dict[UUID, list[Instalment]]:
+        schedules = {
+            loan.id: build_schedule(
+                self.terms_for_loan(
+                    loan,
+                    frequency=frequency,
+                    interest_method=interest_method,
+                    annual_rate=annual_rate,
+                    instalments=instalments,
+                )
+            )
+            for loan in loans
+        }
+        self.replace_schedules(organization_id=organization_id, schedules=list(schedules.items()))
+        return schedules
+
+    def list_instalments(self, *, organization_id: UUID, loan_id: UUID) -> list[LoanInstalment]:
+        return (
+            self._db.query(LoanInstalment)
+            .filter(LoanInstalment.organization_id == organization_id)
+            .filter(LoanInstalment.loan_id == loan_id)
+            .order_by(LoanInstalment.sequence)
+            .all()
+        )
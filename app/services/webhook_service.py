@@ -0,0 +1,271 @@
+"""Mono webhook ingestion: the API appends raw deliveries to a Redis stream, a worker applies them.
+
+The HTTP handler only verifies the secret and runs one XADD, so bursts never tie up API
+workers. `drain_mono_webhooks` reads the stream through a consumer group in batches and,
+in one transaction per batch:
+
+1. records each event id in `mono_webhook_events` (ON CONFLICT DO NOTHING), so only events
+   seen for the first time go further;
+2. settles or fails the matching `debit_schedule_items` and inserts a `payments` row for
+   every item that actually moved to paid.
+
+Entries are XACKed only after the commit. A crash in between redelivers them (entries idle
+for longer than `CLAIM_IDLE_MS` are re-claimed) and step 1 skips them, so nothing is lost
+or applied twice. When a batch fails, its events are retried one per transaction so a single
+bad event cannot hold back the rest; an entry delivered `MAX_DELIVERIES` times without being
+applied is moved to the `DEAD_LETTER_KEY` stream for inspection instead of being retried forever.
+
+The debit tables are updated with set-based SQL so a batch costs one statement per event
+type rather than one per event.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.models.webhook import MonoWebhookEvent
+from app.services.debit_retry import NEXT_ATTEMPT_SQL, RetryPolicy
+
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "webhooks:mono"
+GROUP = "mono-webhook-appliers"
+BATCH_SIZE = 500
+MAX_BATCHES = 50
+CLAIM_IDLE_MS = 60_000
+MAX_DELIVERIES = 5
+DEAD_LETTER_KEY = "webhooks:mono:dead"
+
+DEBIT_SUCCESS_EVENTS = {"events.mandates.debit.successful"}
+DEBIT_FAILED_EVENTS = {"events.mandates.debit.failed"}
+
+
+@dataclass(frozen=True)
+class MonoEvent:
+    stream_id: bytes
+    event_id: str
+    event_type: str
+    # `<item idempotency key>.<attempt>`, echoed back by Mono as the debit reference.
+    reference: str | None
+    # Mono's transaction id.
+    txn_ref: str | None
+    reason: str | None
+    payload: dict[str, Any]
+
+
+def enqueue_webhook(body: bytes) -> None:
+    """Append a verified delivery to the stream; the stream is trimmed to roughly `webhook_stream_maxlen`."""
+    get_redis().xadd(
+        STREAM_KEY,
+        {"body": body},
+        maxlen=settings.webhook_stream_maxlen,
+        approximate=True,
+    )
+
+
+def parse_event(stream_id: bytes, body: bytes) -> MonoEvent | None:
+    try:
+        payload = json.loads(body)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    event_type = str(payload.get("event") or payload.get("type") or "unknown")
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    data_id = payload.get("id") or data.get("id")
+    # Identify the event by type + object id so redeliveries of the same event collapse.
+    event_id = f"{event_type}:{data_id}" if data_id else hashlib.sha256(body).hexdigest()
+    return MonoEvent(
+        stream_id=stream_id,
+        event_id=event_id,
+        event_type=event_type,
+        reference=data.get("reference"),
+        txn_ref=str(data_id) if data_id else None,
+        reason=data.get("message") or data.get("reason") or data.get("status"),
+        payload=payload,
+    )
+
+
+_SETTLE_SQL = text(
+    """
+    WITH settled AS (
+        UPDATE debit_schedule_items AS i
+        SET status = 'paid',
+            provider_txn_ref = coalesce(e.txn_ref, i.provider_txn_ref),
+            updated_at = now()
+        FROM unnest(CAST(:refs AS text[]), CAST(:txn_refs AS text[])) AS e(ref, txn_ref)
+        WHERE (i.idempotency_key = split_part(e.ref, '.', 1) OR i.provider_txn_ref = e.txn_ref)
+          AND i.status <> 'paid'
+        RETURNING i.schedule_id, i.amount, i.provider_txn_ref
+    )
+    INSERT INTO payments (organization_id, loan_id, amount, reference, source)
+    SELECT s.organization_id, s.loan_id, settled.amount, coalesce(settled.provider_txn_ref, 'mono-dd'), 'direct_debit'
+    FROM settled
+    JOIN recurring_debit_schedules AS s ON s.id = settled.schedule_id
+    """
+)
+
+# A declined charge closes the attempt and is retried on the same backoff schedule as a
+# synchronous failure.
+_FAIL_SQL = text(
+    f"""
+    UPDATE debit_schedule_items AS i
+    SET attempts = i.attempts + 1,
+        status = CASE WHEN i.attempts + 1 >= :max_attempts THEN 'dead' ELSE 'failed' END,
+        next_attempt_at = CASE
+            WHEN i.attempts + 1 >= :max_attempts THEN NULL
+            ELSE {NEXT_ATTEMPT_SQL.format(attempts="i.attempts + 1")}
+        END,
+        last_error = e.reason,
+        provider_txn_ref = coalesce(e.txn_ref, i.provider_txn_ref),
+        updated_at = now()
+    FROM unnest(CAST(:refs AS text[]), CAST(:txn_refs AS text[]), CAST(:reasons AS text[])) AS e(ref, txn_ref, reason)
+    WHERE (
+            -- Only the open attempt: a late event for an attempt already closed is ignored.
+            (i.idempotency_key = split_part(e.ref, '.', 1) AND split_part(e.ref, '.', 2) = (i.attempts + 1)::text)
+            OR (e.ref IS NULL AND i.provider_txn_ref = e.txn_ref)
+        )
+      AND i.status NOT IN ('paid', 'dead')
+    """
+)
+
+
+def apply_events(db: Session, events: list[MonoEvent]) -> int:
+    """Apply a batch in one transaction. Returns how many events were new."""
+    if not events:
+        return 0
+    unique = {e.event_id: e for e in events}
+    inserted = db.execute(
+        insert(MonoWebhookEvent)
+        .values(
+            [
+                {"event_id": e.event_id, "event_type": e.event_type, "payload": e.payload}
+                for e in unique.values()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["event_id"])
+        .returning(MonoWebhookEvent.event_id)
+    ).scalars()
+    new = [unique[event_id] for event_id in inserted]
+
+    settled = [e for e in new if e.event_type in DEBIT_SUCCESS_EVENTS]
+    failed = [e for e in new if e.event_type in DEBIT_FAILED_EVENTS]
+    if settled:
+        db.execute(
+            _SETTLE_SQL,
+            {"refs": [e.reference for e in settled], "txn_refs": [e.txn_ref for e in settled]},
+        )
+    if failed:
+        db.execute(
+            _FAIL_SQL,
+            {
+                "refs": [e.reference for e in failed],
+                "txn_refs": [e.txn_ref for e in failed],
+                "reasons": [e.reason for e in failed],
+                **RetryPolicy.from_settings().sql_params(),
+            },
+        )
+    db.commit()
+    return len(new)
+
+
+def ensure_group(r: "redis.Redis[bytes]") -> None:
+    try:
+        r.xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+    except redis.ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+def _dead_letter_exhausted(r: "redis.Redis[bytes]") -> int:
+    """Move idle entries delivered `MAX_DELIVERIES` times to the dead-letter stream. Returns how many."""
+    pending = r.xpending_range(STREAM_KEY, GROUP, min="-", max="+", count=BATCH_SIZE)
+    exhausted = [
+        p["message_id"]
+        for p in pending
+        if p["times_delivered"] >= MAX_DELIVERIES and p["time_since_delivered"] >= CLAIM_IDLE_MS
+    ]
+    for stream_id in exhausted:
+        entries = r.xrange(STREAM_KEY, min=stream_id, max=stream_id)
+        # The entry may already have been trimmed off the stream; it is acknowledged either way.
+        body = entries[0][1].get(b"body", b"") if entries else b""
+        r.xadd(
+            DEAD_LETTER_KEY,
+            {"body": body, "stream_id": stream_id},
+            maxlen=settings.webhook_stream_maxlen,
+            approximate=True,
+        )
+        r.xack(STREAM_KEY, GROUP, stream_id)
+    if exhausted:
+        logger.error("Moved %d Mono webhook deliveries to %s after %d attempts", len(exhausted), DEAD_LETTER_KEY, MAX_DELIVERIES)
+    return len(exhausted)
+
+
+def _read_batch(r: "redis.Redis[bytes]", consumer: str) -> list[tuple[bytes, dict]]:
+    # Entries another consumer took but never acknowledged (it crashed) come first.
+    claimed = r.xautoclaim(STREAM_KEY, GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, start_id="0-0", count=BATCH_SIZE)
+    entries = [e for e in claimed[1] if e and e[1]]
+    if entries:
+        return entries
+    response = r.xreadgroup(GROUP, consumer, {STREAM_KEY: ">"}, count=BATCH_SIZE)
+    return response[0][1] if response else []
+
+
+def _apply_one_by_one(db: Session, events: list[MonoEvent]) -> tuple[int, list[bytes]]:
+    """Apply each event in its own transaction. Returns events applied and the stream ids that succeeded."""
+    applied, done = 0, []
+    for event in events:
+        try:
+            applied += apply_events(db, [event])
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to apply Mono webhook %s; it will be redelivered", event.event_id)
+            continue
+        done.append(event.stream_id)
+    return applied, done
+
+
+def drain_mono_webhooks(db: Session, *, consumer: str) -> int:
+    """Apply queued deliveries until the stream is empty (or MAX_BATCHES). Returns events applied."""
+    r = get_redis()
+    ensure_group(r)
+    _dead_letter_exhausted(r)
+    applied = 0
+    for _ in range(MAX_BATCHES):
+        entries = _read_batch(r, consumer)
+        if not entries:
+            break
+        events, unparseable = [], []
+        for stream_id, fields in entries:
+            event = parse_event(stream_id, fields.get(b"body"))
+            if event is None:
+                unparseable.append(stream_id)
+            else:
+                events.append(event)
+        if unparseable:
+            logger.warning("Dropping %d unparseable Mono webhook deliveries", len(unparseable))
+        try:
+            applied += apply_events(db, events)
+            done = [event.stream_id for event in events]
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to apply Mono webhook batch; retrying its events one by one")
+            batch_applied, done = _apply_one_by_one(db, events) if len(events) > 1 else (0, [])
+            applied += batch_applied
+        if unparseable or done:
+            r.xack(STREAM_KEY, GROUP, *unparseable, *done)
+        if len(done) < len(events):
+            # The rest stay pending and come back through XAUTOCLAIM after CLAIM_IDLE_MS.
+            break
+    return applied
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+
+from app.core.celery_worker import celery_app
+from app.db.session import SessionLocal
+from app.services.analytics_service import refresh_snapshots, utc_today
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def refresh_portfolio_snapshots(day: str | None = None):
+    """Upsert portfolio snapshots for `day` (ISO date, default today UTC) for every organization."""
+    target = date.fromisoformat(day) if day else utc_today()
+    db = SessionLocal()
+    try:
+        refresh_snapshots(db, day=target)
+    finally:
+        db.close()
+    logger.info("Refreshed portfolio snapshots for %s", target)
+
+
+@celery_app.task
+def finalize_portfolio_snapshots():
+    """Nightly: recompute yesterday once its payments are all in, then start today's row."""
+    refresh_portfolio_snapshots((utc_today() - timedelta(days=1)).isoformat())
+    refresh_portfolio_snapshots()
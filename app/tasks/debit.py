@@ -1,36 +1,96 @@
 from __future__ import annotations
 
-from datetime import date
+import asyncio
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 
 from app.core.celery_worker import celery_app
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.db.models.debit import DebitScheduleItem, ScheduleItemStatus
+from app.integrations.mono import breaker as mono_breaker
 from app.services.direct_debit_service import DirectDebitService
 
+BATCH_SIZE = 100
+
 
 def _db() -> Session:
     return SessionLocal()
 
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
-def process_due_debits(self):
+def claim_due_items(db: Session, *, limit: int = BATCH_SIZE) -> list[DebitScheduleItem]:
+    """Claim pending or failed items whose next attempt is due, oldest first.
+
+    The filter matches the partial index ix_debit_items_next_attempt_at_eligible. Rows are
+    locked with SKIP LOCKED and moved to `processing` before the lock is released, so
+    concurrent schedulers never charge the same item.
+    """
+    items = (
+        db.query(DebitScheduleItem)
+        .filter(DebitScheduleItem.status.in_([ScheduleItemStatus.pending, ScheduleItemStatus.failed]))
+        .filter(DebitScheduleItem.next_attempt_at <= datetime.now(timezone.utc))
+        .order_by(DebitScheduleItem.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    now = datetime.now(timezone.utc)
+    for item in items:
+        item.status = ScheduleItemStatus.processing
+        item.claimed_at = now
+    db.commit()
+    return items
+
+
+def release_stale_claims(db: Session, *, timeout_seconds: int | None = None) -> int:
+    """Hand back items left in `processing` for longer than the claim timeout. Returns how many.
+
+    That happens when a scheduler dies mid-batch, or when Mono accepted a charge but its
+    settlement webhook never arrived. The attempt count is left as is, so the next run
+    re-sends the same idempotency key: Mono returns the charge it already made (if any)
+    rather than debiting the customer again.
+    """
+    timeout = timeout_seconds or settings.debit_claim_timeout_seconds
+    released = (
+        db.query(DebitScheduleItem)
+        .filter(DebitScheduleItem.status == ScheduleItemStatus.processing)
+        .filter(DebitScheduleItem.claimed_at < datetime.now(timezone.utc) - timedelta(seconds=timeout))
+        .update(
+            {
+                DebitScheduleItem.status: case(
+                    (DebitScheduleItem.attempts == 0, ScheduleItemStatus.pending),
+                    else_=ScheduleItemStatus.failed,
+                ),
+                DebitScheduleItem.next_attempt_at: datetime.now(timezone.utc),
+                DebitScheduleItem.claimed_at: None,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return released
+
+
+@celery_app.task
+def process_due_debits():
+    """Charge every item that is due, retrying failures per item (see app/services/debit_retry.py)."""
     db = _db()
     try:
-        today = date.today()
-        items = (
-            db.query(DebitScheduleItem)
-            .filter(DebitScheduleItem.due_date <= today)
-            .filter(DebitScheduleItem.status == ScheduleItemStatus.pending)
-            .limit(100)
-            .all()
-        )
         service = DirectDebitService(db)
-        for item in items:
-            # We call async function via loop.run_until_complete in a quick-and-dirty way if needed
-            import asyncio
-
-            asyncio.get_event_loop().run_until_complete(service.execute_item(item=item))
+        release_stale_claims(db)
+        items = claim_due_items(db)
+        loop = asyncio.new_event_loop()
+        try:
+            for index, item in enumerate(items):
+                loop.run_until_complete(service.execute_item(item=item))
+                if mono_breaker.is_open():
+                    # Fail fast during an outage: hand the rest back instead of queueing on Mono.
+                    for rest in items[index + 1 :]:
+                        service.release_item(item=rest, error="Mono circuit open")
+                    break
+        finally:
+            loop.close()
     finally:
         db.close()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from uuid import UUID
+
+from app.core.celery_worker import celery_app
+from app.core.config import settings
+from app.db.schemas.export import ExportDataset, ExportFormat
+from app.db.session import open_read_session
+from app.integrations.supabase_storage import upload_file
+from app.services.export_service import (
+    MEDIA_TYPES,
+    iter_export,
+    parse_filters,
+    update_export_job,
+)
+
+
+@celery_app.task(bind=True, max_retries=0)
+def export_dataset(self, job_id: str, organization_id: str, dataset: str, fmt: str, filters: dict):
+    """Write an export to a temp file, upload it to storage and record the object path on the job."""
+    dataset_ = ExportDataset(dataset)
+    fmt_ = ExportFormat(fmt)
+    update_export_job(job_id, status="running")
+    db = open_read_session(organization_id)
+    fd, path = tempfile.mkstemp(suffix=f".{fmt_.value}")
+    try:
+        counter = [0]
+        with os.fdopen(fd, "wb") as fh:
+            for chunk in iter_export(
+                db,
+                dataset=dataset_,
+                organization_id=UUID(organization_id),
+                filters=parse_filters(dataset_, filters),
+                fmt=fmt_,
+                counter=counter,
+            ):
+                fh.write(chunk)
+        object_path = f"exports/{organization_id}/{job_id}.{fmt_.value}"
+        asyncio.run(
+            upload_file(
+                bucket=settings.supabase_storage_bucket,
+                object_path=object_path,
+                file_path=path,
+                content_type=MEDIA_TYPES[fmt_],
+            )
+        )
+        update_export_job(job_id, status="done", rows=counter[0], object_path=object_path)
+    except Exception as exc:  # noqa: BLE001 - surface any failure on the job record
+        update_export_job(job_id, status="failed", error=str(exc))
+        raise
+    finally:
+        db.close()
+        os.unlink(path)
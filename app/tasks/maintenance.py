@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import logging
+
+from app.core.celery_worker import celery_app
+from app.db.partitions import PARTITIONED_TABLES, ensure_partitions
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def ensure_table_partitions():
+    """Keep monthly partitions created ahead of time for the append-only tables."""
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            for name in ensure_partitions(conn, table):
+                logger.info("Created partition %s", name)
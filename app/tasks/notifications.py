@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timezone
+
+import redis
+
+from app.core.celery_worker import celery_app
+from app.core.config import settings
+from app.db.models.organization import Organization
+from app.db.session import SessionLocal
+from app.services.reminder_service import due_loan_ids, reminder_targets, send_reminders
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def schedule_loan_reminders(day: str | None = None):
+    """Fan out reminder batches for every organization's loans due in `reminder_days_before` days."""
+    today = date.fromisoformat(day) if day else datetime.now(timezone.utc).date()
+    batch_size = settings.reminder_batch_size
+    batches = 0
+    db = SessionLocal()
+    try:
+        organization_ids = db.query(Organization.id).all()
+        for due_date, days_before in reminder_targets(today).items():
+            for (organization_id,) in organization_ids:
+                loan_ids = due_loan_ids(db, organization_id=organization_id, due_date=due_date)
+                for start in range(0, len(loan_ids), batch_size):
+                    send_loan_reminders.delay(loan_ids[start : start + batch_size], days_before, today.isoformat())
+                    batches += 1
+    finally:
+        db.close()
+    logger.info("Queued %d reminder batches for %s", batches, today)
+    return batches
+
+
+@celery_app.task(autoretry_for=(redis.RedisError,), max_retries=3, default_retry_delay=60)
+def send_loan_reminders(loan_ids: list[str], days_before: int, day: str):
+    """Send one batch of reminders; already-sent ones are skipped, so retries are safe."""
+    db = SessionLocal()
+    try:
+        result = send_reminders(db, loan_ids=loan_ids, days_before=days_before, today=date.fromisoformat(day))
+    finally:
+        db.close()
+    return {"sent": result.sent, "skipped": result.skipped, "failed": result.failed}
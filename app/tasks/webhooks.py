@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import logging
+import socket
+
+from redis.exceptions import LockNotOwnedError
+
+from app.core.celery_worker import celery_app
+from app.core.redis import get_redis
+from app.db.session import SessionLocal
+from app.services.webhook_service import drain_mono_webhooks
+
+logger = logging.getLogger(__name__)
+
+_LOCK_KEY = "lock:drain_mono_webhooks"
+_LOCK_TTL_SECONDS = 120
+
+
+@celery_app.task
+def apply_mono_webhooks():
+    """Apply queued Mono webhook deliveries in batches; only one drain runs at a time."""
+    lock = get_redis().lock(_LOCK_KEY, timeout=_LOCK_TTL_SECONDS, blocking=False)
+    if not lock.acquire():
+        return 0
+    db = SessionLocal()
+    try:
+        applied = drain_mono_webhooks(db, consumer=socket.gethostname())
+    finally:
+        db.close()
+        try:
+            lock.release()
+        except LockNotOwnedError:
+            # The drain outlived the lock TTL, so another drain may have started meanwhile.
+            # Both are safe together (events are deduplicated), just not efficient.
+            logger.warning("Mono webhook drain lock expired before the drain finished")
+    if applied:
+        logger.info("Applied %d Mono webhook events", applied)
+    return applied
@@ -0,0 +1,117 @@
+"""CPU time vs bytes saved for each response encoding and level, at typical page sizes.
+
+Usage: python scripts/bench_compression.py [--pages 50,100,500] [--repeat 20]
+
+Builds `LoanResponse` listings and `LoaneeWithLoansResponse` pages of the given sizes with
+realistic-looking values, encodes them exactly as the routes do (app.core.serialization),
+then compresses each body with gzip, brotli and zstd at several levels. Reports the
+compressed size, ratio and median compression time, so the levels in Settings
+(`compression_*`) can be chosen from numbers measured on the deployment hardware. Needs no
+database; brotli/zstd rows are skipped if their packages are not installed.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, ".")
+
+from app.core.compression import _Brotli, _Gzip, _Zstd, brotli, zstandard  # noqa: E402
+from app.core.serialization import encode_models  # noqa: E402
+from app.db.models.loan import LoanStatus  # noqa: E402
+from app.db.schemas.loan import LoanResponse, LoaneeWithLoansResponse  # noqa: E402
+
+LEVELS = {
+    "gzip": (_Gzip, [1, 6, 9]),
+    "br": (_Brotli, [1, 4, 6, 11]),
+    "zstd": (_Zstd, [1, 3, 6, 12]),
+}
+
+
+def _loan(rng: random.Random, loanee_id: uuid.UUID) -> SimpleNamespace:
+    amount = Decimal(rng.randrange(10_000, 2_000_000)) / 100
+    surcharge = (amount * Decimal("0.05")).quantize(Decimal("0.01"))
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(20_000_000))
+    return SimpleNamespace(
+        id=uuid.UUID(int=rng.getrandbits(128)),
+        loanee_id=loanee_id,
+        amount=amount,
+        loan_term_weeks=rng.choice([4, 8, 12, 26, 52]),
+        surcharge=surcharge,
+        penalty=Decimal("0.00"),
+        due_date=date(2026, 1, 1) + timedelta(days=rng.randrange(400)),
+        status=rng.choice(list(LoanStatus)),
+        auto_debit_enabled=rng.random() < 0.3,
+        total_payable=amount + surcharge,
+        created_at=created,
+        updated_at=created,
+    )
+
+
+def _loanee(rng: random.Random, n: int) -> SimpleNamespace:
+    loanee_id = uuid.UUID(int=rng.getrandbits(128))
+    created = datetime(2025, 6, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(20_000_000))
+    return SimpleNamespace(
+        id=loanee_id,
+        full_name=f"Loanee {n} {rng.choice(['Adeyemi', 'Okafor', 'Bello', 'Eze', 'Ibrahim'])}",
+        email=f"loanee{n}@example.com",
+        phone_number=f"080{rng.randrange(10**8):08d}",
+        address=f"{rng.randrange(1, 200)} {rng.choice(['Allen Avenue', 'Broad Street', 'Marina Road'])}, Lagos",
+        created_at=created,
+        updated_at=created,
+        loans=[_loan(rng, loanee_id) for _ in range(rng.randrange(1, 6))],
+    )
+
+
+def payloads(sizes: list[int]) -> list[tuple[str, bytes]]:
+    rng = random.Random(42)
+    bodies = []
+    for size in sizes:
+        loanees = [_loanee(rng, n) for n in range(size)]
+        loans = [_loan(rng, loanees[n % len(loanees)].id) for n in range(size)]
+        bodies.append((f"loans x{size}", encode_models(loans, LoanResponse)))
+        bodies.append((f"with-loans x{size}", encode_models(loanees, LoaneeWithLoansResponse)))
+    return bodies
+
+
+def measure(factory, body: bytes, repeat: int) -> tuple[int, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressor = factory()
+        out = compressor.compress(body) + compressor.finish()
+        timings.append(time.perf_counter() - started)
+    return len(out), statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="50,100,500", help="comma-separated page sizes")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    available = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    print(f"{'payload':<18} {'encoding':<9} {'level':>5} {'bytes':>9} {'ratio':>6} {'ms':>8} {'MB/s':>8}")
+    for name, body in payloads([int(size) for size in args.pages.split(",")]):
+        print(f"{name:<18} {'identity':<9} {'-':>5} {len(body):>9} {1.0:>6.2f} {0.0:>8.2f} {'-':>8}")
+        for encoding, (cls, levels) in LEVELS.items():
+            if not available[encoding]:
+                continue
+            for level in levels:
+                size, seconds = measure(lambda: cls(level), body, args.repeat)
+                print(
+                    f"{name:<18} {encoding:<9} {level:>5} {size:>9} {len(body) / size:>6.2f} "
+                    f"{seconds * 1000:>8.2f} {len(body) / seconds / 1e6:>8.1f}"
+                )
+        print()
+
+
+if __name__ == "__main__":
+    main()
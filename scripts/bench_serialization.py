@@ -0,0 +1,80 @@
+"""Per-row serialisation cost of a loan listing page: FastAPI default path vs. the fast path.
+
+Usage: python scripts/bench_serialization.py [rows] [repeats]
+
+"before" mirrors what FastAPI does for `response_model=list[LoanResponse]` when an endpoint
+returns ORM objects (validate, dump to JSON-compatible Python, `json.dumps`). "after" is
+`app.core.serialization.encode_models`. "cached" is returning pre-encoded bytes.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+sys.path.insert(0, ".")
+
+from app.core.serialization import encode_models  # noqa: E402
+from app.db.models.loan import LoanStatus  # noqa: E402
+from app.db.schemas.loan import LoanResponse  # noqa: E402
+
+
+def _rows(n: int) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            loanee_id=uuid.uuid4(),
+            amount=Decimal("150000.00"),
+            loan_term_weeks=12,
+            surcharge=Decimal("5.00"),
+            penalty=Decimal("0.00"),
+            due_date=date.today(),
+            status=LoanStatus.due,
+            auto_debit_enabled=False,
+            total_payable=Decimal("157500.00"),
+            created_at=now,
+            updated_at=now,
+        )
+        for _ in range(n)
+    ]
+
+
+def _before(items: list, adapter: TypeAdapter) -> bytes:
+    validated = adapter.validate_python(items, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _bench(label: str, fn, rows: int, repeats: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    per_row_us = (time.perf_counter() - start) / repeats / rows * 1e6
+    print(f"{label:<8} {per_row_us:8.2f} us/row  {per_row_us * rows / 1000:8.2f} ms/page")
+    return per_row_us
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    items = _rows(rows)
+    adapter = TypeAdapter(list[LoanResponse])
+    cached = encode_models(items, LoanResponse)
+
+    print(f"{rows} rows x {repeats} repeats")
+    before = _bench("before", lambda: _before(items, adapter), rows, repeats)
+    after = _bench("after", lambda: encode_models(items, LoanResponse), rows, repeats)
+    _bench("cached", lambda: bytes(cached), rows, repeats)
+    print(f"speedup  {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Closed-loop HTTP load against a running API, for comparing server runtime profiles.
+
+Usage: python scripts/bench_server.py URL [--concurrency 64] [--duration 30] [--header "Authorization: Bearer ..."]
+
+Keeps `concurrency` requests in flight for `duration` seconds and reports throughput,
+latency percentiles and errors. Run it from a separate machine (or at least separate
+cores) from the server, and read `/health/runtime` afterwards to see whether the
+threadpool or the database pool was the limit. See docs/server_runtime.md.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, url: str, deadline: float, latencies: list[float], errors: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            resp = await client.get(url)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(1)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(url: str, *, concurrency: int, duration: float, headers: dict[str, str]) -> None:
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(_worker(client, url, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(f"url          {url}")
+    print(f"concurrency  {concurrency}")
+    print(f"requests     {len(latencies)} ok, {len(errors)} failed in {elapsed:.1f}s")
+    print(f"throughput   {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        print(f"latency ms   mean {statistics.mean(latencies) * 1000:.1f}  "
+              f"p50 {_percentile(latencies, 0.50) * 1000:.1f}  "
+              f"p95 {_percentile(latencies, 0.95) * 1000:.1f}  "
+              f"p99 {_percentile(latencies, 0.99) * 1000:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--header", action="append", default=[], help='e.g. "Authorization: Bearer <token>"')
+    args = parser.parse_args()
+    headers = dict(h.split(":", 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+    asyncio.run(run(args.url, concurrency=args.concurrency, duration=args.duration, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
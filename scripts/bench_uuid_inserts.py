@@ -0,0 +1,62 @@
+"""Insert throughput and index size for UUIDv4 vs UUIDv7 primary keys.
+
+Usage: python scripts/bench_uuid_inserts.py [rows] [batch]
+
+Runs against the database configured in .env (use a scratch database, e.g. the
+`app-test-db` service in docker-compose.yml). Each variant inserts into its own unlogged
+table with a UUID primary key and a loans-like payload, then reports rows/s, primary-key
+index size, and the share of index blocks served from shared buffers during the run.
+"""
+from __future__ import annotations
+
+import sys
+import time
+import uuid
+
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, ".")
+
+from app.db.models.ids import uuid7  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+
+def _run(cursor, name: str, make_id, rows: int, batch: int) -> None:
+    table = f"bench_uuid_{name}"
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(
+        f"CREATE UNLOGGED TABLE {table} (id uuid PRIMARY KEY, organization_id uuid, amount numeric(12,2), note text)"
+    )
+    # No pg_stat_reset() (superuser only): the table is new, so its index counters start at zero.
+    org = uuid.uuid4()
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        values = [(str(make_id()), str(org), 1000, "x" * 32) for _ in range(min(batch, rows - offset))]
+        execute_values(cursor, f"INSERT INTO {table} VALUES %s", values, page_size=batch)
+    elapsed = time.perf_counter() - start
+    cursor.execute(
+        "SELECT pg_relation_size(indexrelid), idx_blks_hit, idx_blks_read "
+        "FROM pg_statio_user_indexes WHERE relname = %s",
+        (table,),
+    )
+    size, hit, read = cursor.fetchone()
+    hit_rate = hit / (hit + read) if (hit + read) else 1.0
+    print(f"{name}: {rows / elapsed:10.0f} rows/s  pk index {size / 1024 / 1024:7.1f} MiB  idx hit rate {hit_rate:6.2%}")
+    cursor.execute(f"DROP TABLE {table}")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    raw = engine.raw_connection()
+    try:
+        raw.autocommit = True
+        cursor = raw.cursor()
+        _run(cursor, "v4", uuid.uuid4, rows, batch)
+        _run(cursor, "v7", uuid7, rows, batch)
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
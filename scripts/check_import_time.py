@@ -0,0 +1,62 @@
+"""Measure how long importing `app.main` and building the app takes; fail over a budget.
+
+Usage: python scripts/check_import_time.py [--budget-ms 2000] [--top 15] [--module app.main] [--factory create_app]
+
+Runs the import, then the factory (pass `--factory ""` to time the import alone), in a fresh
+interpreter with `-X importtime`. Prints the slowest modules by cumulative time and exits
+non-zero when the total is over budget, so a heavy import that sneaks onto the startup path
+shows up in CI. Needs the same environment variables as the API (the factory builds Settings).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str, factory: str = "") -> list[tuple[int, int, int, str]]:
+    """(self us, cumulative us, depth, module name) for every module the import loaded."""
+    code = f"import {module}" + (f"; {module}.{factory}()" if factory else "")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"{code} failed")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--factory", default="create_app", help="function of --module to call after importing it")
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = measure(args.module, args.factory)
+    # Top-level imports (depth 0) add up to the whole import.
+    total_ms = sum(cumulative for _, cumulative, depth, _ in rows if depth == 0) / 1000
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, _, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    label = f"{args.module}.{args.factory}()" if args.factory else f"import {args.module}"
+    print(f"\n{label}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    return 0 if total_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
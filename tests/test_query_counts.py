@@ -0,0 +1,103 @@
+"""Round trips made by the CRUD paths that were rewritten to answer in a single query."""
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.db.crud import document as document_crud
+from app.db.crud import loan as loan_crud
+from app.db.crud import loanee as loanee_crud
+from app.db.models.loan import Loan, LoanDocument, Loanee
+from app.db.models.organization import Organization
+from app.db.schemas.loan import LoanCreate
+
+
+@pytest.fixture
+def seeded(db):
+    suffix = uuid.uuid4().hex[:12]
+    organization = Organization(
+        name="Query count", slug=f"query-count-{suffix}", email=f"org-{suffix}@example.com", password="not-a-hash"
+    )
+    loanee = Loanee(organization=organization, full_name="Ada Obi", email="Ada.Obi@Example.com")
+    loan = Loan(
+        organization=organization,
+        loanee=loanee,
+        amount=Decimal("1000.00"),
+        loan_term_weeks=4,
+        due_date=date(2026, 12, 1),
+        total_payable=Decimal("1050.00"),
+    )
+    document = LoanDocument(
+        organization=organization, loanee=loanee, loan=loan, document_type="id_card", uri="query-count/id", bucket="documents"
+    )
+    db.add_all([organization, loanee, loan, document])
+    db.flush()
+    return organization, loanee, loan, document
+
+
+def test_list_documents_for_existing_loan_is_one_query(db, seeded, count_queries):
+    organization, _, loan, document = seeded
+    with count_queries() as statements:
+        documents = document_crud.list_documents_for_existing_loan(db, organization_id=organization.id, loan_id=loan.id)
+    assert [d.id for d in documents] == [document.id]
+    assert len(statements) == 1
+
+
+def test_list_documents_for_missing_loan_is_one_query(db, seeded, count_queries):
+    organization, _, _, _ = seeded
+    with count_queries() as statements:
+        documents = document_crud.list_documents_for_existing_loan(db, organization_id=organization.id, loan_id=uuid.uuid4())
+    assert documents is None
+    assert len(statements) == 1
+
+
+def test_find_loan_document_is_one_query(db, seeded, count_queries):
+    organization, _, loan, document = seeded
+    with count_queries() as statements:
+        found = document_crud.find_loan_document(
+            db, organization_id=organization.id, loan_id=loan.id, document_id=document.id
+        )
+        missing = document_crud.find_loan_document(
+            db, organization_id=organization.id, loan_id=loan.id, document_id=uuid.uuid4()
+        )
+    assert found == (True, document)
+    assert missing == (True, None)
+    assert len(statements) == 2
+
+
+def test_list_documents_for_loanee_email_is_one_query(db, seeded, count_queries):
+    organization, _, _, document = seeded
+    with count_queries() as statements:
+        documents = document_crud.list_documents_for_loanee_email(
+            db, organization_id=organization.id, email="ada.obi@example.com"
+        )
+    assert [d.id for d in documents] == [document.id]
+    assert len(statements) == 1
+
+
+def test_list_loans_for_loanee_email_is_one_query(db, seeded, count_queries):
+    organization, _, loan, _ = seeded
+    with count_queries() as statements:
+        loans = loanee_crud.list_loans_for_loanee_email(db, organization_id=organization.id, email="ADA.OBI@example.com")
+    assert [l.id for l in loans] == [loan.id]
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize("email", ["ada.obi@example.com", "new.borrower@example.com"])
+def test_create_loan_round_trips(db, seeded, count_queries, email):
+    organization, loanee, _, _ = seeded
+    payload = LoanCreate(
+        full_name="Ada Obi",
+        email=email,
+        amount=Decimal("500.00"),
+        loan_term_weeks=4,
+        due_date=date(2026, 12, 1),
+    )
+    with count_queries() as statements:
+        created = loan_crud.create_loan(db, payload, total_payable=Decimal("525.00"), organization=organization)
+    # Upsert of the loanee, INSERT of the loan, then the refresh after the single commit.
+    assert len(statements) == 3
+    assert (created.loanee_id == loanee.id) == (email == "ada.obi@example.com")
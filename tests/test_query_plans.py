@@ -0,0 +1,274 @@
+"""Query plans of the CRUD read functions on a seeded tenant, under EXPLAIN (ANALYZE, BUFFERS).
+
+Seeds TENANTS organizations: one large tenant with LARGE_TENANT_LOANEES loanees and smaller
+ones with a tenth of that, three loans per loanee and a document for about half of the loans.
+The seed is written and ANALYZEd inside the module's transaction, so it is rolled back when
+the module finishes and never touches other data in the database.
+
+Every read function in app/db/crud is called against the large tenant (list_loans with each
+combination of filters). The SELECTs it issues are captured and explained; a case fails when
+a plan seq-scans one of LARGE_TABLES or touches more shared buffers (hit + read, 8 KiB each)
+than its budget, and the failure shows the plan in text form.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Iterator
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.db.crud import document as document_crud
+from app.db.crud import loan as loan_crud
+from app.db.crud import loanee as loanee_crud
+from app.db.crud import organization as organization_crud
+from app.db.crud import search as search_crud
+from app.db.models.loan import LoanStatus
+
+SEED_PREFIX = "plan-check-"
+TENANTS = 10
+LARGE_TENANT_LOANEES = 5000
+DEFAULT_BUDGET = 2000
+# organizations is a page or two here, where a seq scan is the right plan.
+LARGE_TABLES = {"loanees", "loans", "loan_documents"}
+
+SEED_STATEMENTS = [
+    "SELECT setseed(0.42)",
+    """
+    INSERT INTO organizations (id, name, slug, email, password)
+    SELECT uuid_generate_v7(), 'Plan check ' || n, :prefix || n, :prefix || n || '@example.com', 'not-a-hash'
+    FROM generate_series(1, :tenants) AS n
+    """,
+    """
+    INSERT INTO loanees (id, organization_id, full_name, email, phone_number, address)
+    SELECT
+        uuid_generate_v7(), o.id, 'Loanee ' || g, 'loanee' || g || '@example.com',
+        '080' || lpad(g::text, 8, '0'), g || ' Plan Check Street'
+    FROM organizations AS o
+    CROSS JOIN LATERAL generate_series(
+        1, CASE WHEN o.slug = :prefix || '1' THEN :loanees ELSE :loanees / 10 END
+    ) AS g
+    WHERE o.slug LIKE :prefix || '%'
+    """,
+    """
+    INSERT INTO loans (
+        id, organization_id, loanee_id, amount, loan_term_weeks, surcharge, penalty, due_date,
+        status, auto_debit_enabled, total_payable, is_document_uploaded
+    )
+    SELECT
+        uuid_generate_v7(), l.organization_id, l.id, 100000, (ARRAY[4, 8, 12, 26, 52])[1 + floor(random() * 5)::int],
+        5000, 0, current_date + (floor(random() * 365)::int - 180),
+        (ARRAY['not_due', 'due', 'paid', 'defaulted'])[1 + floor(random() * 4)::int]::loan_status,
+        false, 105000, random() < 0.5
+    FROM loanees AS l
+    JOIN organizations AS o ON o.id = l.organization_id
+    CROSS JOIN generate_series(1, 3)
+    WHERE o.slug LIKE :prefix || '%'
+    """,
+    """
+    INSERT INTO loan_documents (id, organization_id, loanee_id, loan_id, document_type, uri, bucket)
+    SELECT uuid_generate_v7(), l.organization_id, l.loanee_id, l.id, 'id_card', 'plan-check/' || l.id, 'documents'
+    FROM loans AS l
+    JOIN organizations AS o ON o.id = l.organization_id
+    WHERE o.slug LIKE :prefix || '%' AND l.is_document_uploaded
+    """,
+    "ANALYZE organizations, loanees, loans, loan_documents",
+]
+
+
+@dataclass
+class Sample:
+    """Ids from the large tenant for the cases to look up."""
+
+    organization_id: Any
+    organization_email: str
+    organization_slug: str
+    loanee_id: Any
+    loanee_email: str
+    loan_id: Any
+    document_id: Any
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[Session, Sample], object]
+    budget: int | None = None
+
+
+@pytest.fixture(scope="module")
+def sample(module_db) -> Sample:
+    params = {"prefix": SEED_PREFIX, "tenants": TENANTS, "loanees": LARGE_TENANT_LOANEES}
+    for statement in SEED_STATEMENTS:
+        module_db.execute(text(statement), params)
+    row = module_db.execute(
+        text(
+            """
+            SELECT o.id, o.email, o.slug, d.loanee_id, e.email, d.loan_id, d.id
+            FROM organizations AS o
+            JOIN loan_documents AS d ON d.organization_id = o.id
+            JOIN loanees AS e ON e.id = d.loanee_id
+            WHERE o.slug = :slug
+            LIMIT 1
+            """
+        ),
+        {"slug": f"{SEED_PREFIX}1"},
+    ).one()
+    return Sample(*row)
+
+
+def _list_loans_cases() -> list[Case]:
+    today = date.today()
+    filters: dict[str, Callable[[Sample], dict]] = {
+        "status": lambda s: {"status": LoanStatus.defaulted},
+        "payment_due": lambda s: {"payment_due": True},
+        "due_range": lambda s: {"due_from": today, "due_to": today + timedelta(days=30)},
+        "term": lambda s: {"loan_term_weeks": 12},
+        "email": lambda s: {"loanee_email": s.loanee_email.upper()},
+    }
+    cases = []
+    for size in range(len(filters) + 1):
+        for names in itertools.combinations(filters, size):
+
+            def run(db, s, names=names):
+                kwargs = {key: value for name in names for key, value in filters[name](s).items()}
+                return loan_crud.list_loans(db, organization_id=s.organization_id, **kwargs)
+
+            cases.append(Case(f"list_loans[{'+'.join(names) or 'no filters'}]", run))
+    return cases
+
+
+CASES = [
+    Case("get_organization", lambda db, s: organization_crud.get_organization(db, s.organization_id)),
+    Case("get_organization_by_email", lambda db, s: organization_crud.get_organization_by_email(db, s.organization_email)),
+    Case("get_organization_by_slug", lambda db, s: organization_crud.get_organization_by_slug(db, s.organization_slug)),
+    Case("get_loan", lambda db, s: loan_crud.get_loan(db, s.loan_id)),
+    *_list_loans_cases(),
+    # OFFSET paging reads every skipped row, so a deep page costs about one buffer per row.
+    Case("list_loans[deep page]", lambda db, s: loan_crud.list_loans(db, organization_id=s.organization_id, offset=5000), budget=15000),
+    Case(
+        "list_loans_for_organization_email",
+        lambda db, s: loan_crud.list_loans_for_organization_email(db, organization_email=s.organization_email),
+    ),
+    Case("list_loans_for_organization_id", lambda db, s: loan_crud.list_loans_for_organization_id(db, organization_id=s.organization_id)),
+    Case("list_loanees", lambda db, s: loanee_crud.list_loanees(db, organization_id=s.organization_id)),
+    Case("get_loanee", lambda db, s: loanee_crud.get_loanee(db, organization_id=s.organization_id, loanee_id=s.loanee_id)),
+    Case(
+        "get_loanee_by_email",
+        lambda db, s: loanee_crud.get_loanee_by_email(db, organization_id=s.organization_id, email=s.loanee_email),
+    ),
+    Case(
+        "list_loans_for_loanee",
+        lambda db, s: loanee_crud.list_loans_for_loanee(db, organization_id=s.organization_id, loanee_id=s.loanee_id),
+    ),
+    Case(
+        "list_loans_for_loanee_email",
+        lambda db, s: loanee_crud.list_loans_for_loanee_email(db, organization_id=s.organization_id, email=s.loanee_email),
+    ),
+    Case("list_loanees_with_loans", lambda db, s: loanee_crud.list_loanees_with_loans(db, organization_id=s.organization_id)),
+    Case(
+        "list_loanees_with_loans[capped]",
+        lambda db, s: loanee_crud.list_loanees_with_loans(db, organization_id=s.organization_id, loans_per_loanee=2),
+    ),
+    Case(
+        "list_loanees_with_loan_totals",
+        lambda db, s: loanee_crud.list_loanees_with_loan_totals(db, organization_id=s.organization_id),
+    ),
+    Case(
+        "list_documents_for_loanee",
+        lambda db, s: document_crud.list_documents_for_loanee(db, organization_id=s.organization_id, loanee_id=s.loanee_id),
+    ),
+    Case(
+        "list_documents_for_loanee_email",
+        lambda db, s: document_crud.list_documents_for_loanee_email(db, organization_id=s.organization_id, email=s.loanee_email),
+    ),
+    Case(
+        "list_documents_for_existing_loan",
+        lambda db, s: document_crud.list_documents_for_existing_loan(db, organization_id=s.organization_id, loan_id=s.loan_id),
+    ),
+    Case(
+        "get_document",
+        lambda db, s: document_crud.get_document(
+            db, organization_id=s.organization_id, loanee_id=s.loanee_id, document_id=s.document_id
+        ),
+    ),
+    Case(
+        "find_loan_document",
+        lambda db, s: document_crud.find_loan_document(
+            db, organization_id=s.organization_id, loan_id=s.loan_id, document_id=s.document_id
+        ),
+    ),
+    # Trigram/full-text matching reads more pages than an equality lookup.
+    Case("search_loanees", lambda db, s: search_crud.search_loanees(db, organization_id=s.organization_id, q="Loanee 4242"), budget=20000),
+    Case("search_loans", lambda db, s: search_crud.search_loans(db, organization_id=s.organization_id, q="Loanee 4242"), budget=20000),
+]
+
+
+@contextmanager
+def captured_selects(db: Session) -> Iterator[list[tuple[str, Any]]]:
+    """Record the (statement, parameters) of every SELECT the session runs inside the block."""
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+def explain(db: Session, statement: str, parameters: Any, *, fmt: str = "JSON") -> Any:
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT {fmt}) {statement}", parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if fmt == "JSON":
+        plan = rows[0][0]
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+    return "\n".join(row[0] for row in rows)
+
+
+def _walk(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def problems(plan: dict, budget: int) -> list[str]:
+    root = plan["Plan"]
+    found = [
+        f"seq scan on {node['Relation Name']}"
+        for node in _walk(root)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES
+    ]
+    # Buffer counts on a node include its children, so the root holds the statement's total.
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    if buffers > budget:
+        found.append(f"{buffers} buffers > budget {budget}")
+    return found
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_query_plan(module_db, sample, case):
+    with captured_selects(module_db) as statements:
+        case.run(module_db, sample)
+    assert statements, "no SELECT was captured"
+
+    failures = []
+    for n, (statement, parameters) in enumerate(statements, start=1):
+        found = problems(explain(module_db, statement, parameters), case.budget or DEFAULT_BUDGET)
+        if found:
+            plan = explain(module_db, statement, parameters, fmt="TEXT")
+            failures.append(f"query {n}: {'; '.join(found)}\n{statement}\n{parameters}\n{plan}")
+    assert not failures, "\n\n".join(failures)